@@ -15,7 +15,8 @@ class MemoryState(TypedDict):
 
 
 # --------- Setup Embedding + LLM + VectorStore ---------
-embedder = LocalEmbeddingModel()  # Your local embedding model
+EMBEDDING_CACHE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".cache", "embeddings"))
+embedder = LocalEmbeddingModel(cache_dir=EMBEDDING_CACHE_DIR)  # Your local embedding model (re-added messages hit the cache)
 llm = ChatOllama(model="gemma:2b")  # Your local LLM
 vectorstore = FAISS.from_texts(["User asked about pricing"], embedder)  # Dummy init
 
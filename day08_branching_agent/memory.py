@@ -9,11 +9,13 @@ from langchain_community.docstore.in_memory import InMemoryDocstore
 from langchain.schema import Document
 from embeddings.local_embedding_model import LocalEmbeddingModel
 
+EMBEDDING_CACHE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".cache", "embeddings"))
+
 
 class MemoryManager:
     def __init__(self, index_path="faiss_index"):
         self.index_path = index_path
-        self.embedder = LocalEmbeddingModel()
+        self.embedder = LocalEmbeddingModel(cache_dir=EMBEDDING_CACHE_DIR)
         self.vectorstore = self._load_or_create_vectortore()
 
     def _load_or_create_vectortore(self):
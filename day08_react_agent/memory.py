@@ -10,10 +10,12 @@ from langchain.embeddings.base import Embeddings
 from embeddings.local_embedding_model import LocalEmbeddingModel
 from typing import List
 
+EMBEDDING_CACHE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".cache", "embeddings"))
+
 class MemoryManager:
     def __init__(self, save_path: str = "day08_react_agent/faiss_index/"):
         self.save_path = save_path
-        self.embedding_model: Embeddings = LocalEmbeddingModel()
+        self.embedding_model: Embeddings = LocalEmbeddingModel(cache_dir=EMBEDDING_CACHE_DIR)
         self.vectorstore = self._load_or_create_vectorstore()
 
     def _load_or_create_vectorstore(self):
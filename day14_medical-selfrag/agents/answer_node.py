@@ -1,8 +1,6 @@
 from langchain_core.messages import HumanMessage
-from langchain_ollama import ChatOllama
 from state.selfrag_state import SelfRAGState
-
-llm = ChatOllama(model="gemma:2b", temperature=0.3)
+from agents.llm import get_llm
 
 def answer_node(state: SelfRAGState) -> SelfRAGState:
     question = state.question
@@ -23,7 +21,7 @@ If the context is insufficient, respond with "I don't know" or "Not enough infor
 """
 
     try:
-        response = llm.invoke([HumanMessage(content=prompt)])
+        response = get_llm().invoke([HumanMessage(content=prompt)])
         final_answer = response.content
     except Exception as e:
         final_answer = f"Error generating answer: {str(e)}"
@@ -1,10 +1,8 @@
 from langchain_core.messages import HumanMessage
-from langchain_ollama import ChatOllama
 from state.selfrag_state import SelfRAGState
+from agents.llm import get_llm
 import json
 
-llm = ChatOllama(model="gemma:2b", temperature=0.3)
-
 def corrector_node(state: SelfRAGState) -> SelfRAGState:
     question = state.question
     docs = state.retrieved_docs
@@ -36,7 +34,7 @@ Respond ONLY in this JSON format:
 """
 
     try:
-        response = llm.invoke([HumanMessage(content=prompt)]).content
+        response = get_llm().invoke([HumanMessage(content=prompt)]).content
         parsed = json.loads(response)
 
         corrected_query = parsed.get("corrected_query", question).strip()
@@ -1,11 +1,9 @@
 from typing import Literal
 from langchain_core.messages import HumanMessage
-from langchain_ollama import ChatOllama
 from state.selfrag_state import SelfRAGState
+from agents.llm import get_llm
 import json
 
-llm = ChatOllama(model="gemma:2b", temperature=0.3)
-
 def grading_node(state: SelfRAGState) -> SelfRAGState:
     question = state.question
     docs = state.retrieved_docs
@@ -33,7 +31,7 @@ Respond in JSON format:
 """
     
     try:
-        response = llm.invoke([HumanMessage(content=prompt)])
+        response = get_llm().invoke([HumanMessage(content=prompt)])
         parsed = json.loads(response.content)
         grade = parsed.get("grade", "incorrect").strip().lower()
         feedback = parsed.get("feedback", "No feedback.").strip()
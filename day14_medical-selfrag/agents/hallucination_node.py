@@ -1,10 +1,8 @@
 from langchain_core.messages import HumanMessage
-from langchain_ollama import ChatOllama
 from state.selfrag_state import SelfRAGState
+from agents.llm import get_llm
 import json
 
-llm = ChatOllama(model="gemma:2b", temperature=0.3)
-
 def hallucination_node(state: SelfRAGState) -> SelfRAGState:
     answer = state.answer
     context = state.final_context
@@ -27,7 +25,7 @@ Respond only in this JSON format:
 """
 
     try:
-        response = llm.invoke([HumanMessage(content=prompt)])
+        response = get_llm().invoke([HumanMessage(content=prompt)])
         parsed = json.loads(response.content)
         hallucinated = parsed.get("hallucinations", [])
     except Exception:
@@ -0,0 +1,10 @@
+from functools import lru_cache
+
+@lru_cache(maxsize=None)
+def get_llm(model: str = "gemma:2b", temperature: float = 0.3):
+    """
+    Shared ChatOllama client, created on first use so importing an agent
+    module stays cheap.
+    """
+    from langchain_ollama import ChatOllama
+    return ChatOllama(model=model, temperature=temperature)
@@ -0,0 +1,87 @@
+"""
+Compare the list-of-floats FAISS build (FAISS.from_documents) with the NumPy
+path (retrieval.faiss_store.faiss_from_documents) on the medical corpus.
+
+The corpus is encoded once up front; both paths then get the same vectors, so
+the numbers isolate the cost of the list round-trip rather than model time.
+
+    python benchmarks/bench_array_ingest.py --repeat 200
+"""
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import argparse
+import time
+import tracemalloc
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_community.vectorstores import FAISS
+from embeddings.local_embedding_model import LocalEmbeddingModel
+from ingest.ingest_faiss import load_documents, split_documents
+from retrieval.faiss_store import faiss_from_documents
+
+
+class PrecomputedEmbeddings(Embeddings):
+    """Serves vectors computed beforehand, in list form (old API) or array form (new API)."""
+
+    def __init__(self, vectors: np.ndarray) -> None:
+        self.vectors = vectors
+
+    def embed_documents(self, texts):
+        return self.vectors[: len(texts)].tolist()
+
+    def embed_documents_array(self, texts):
+        return self.vectors[: len(texts)]
+
+    def embed_query(self, text):
+        return self.vectors[0].tolist()
+
+
+def measure(build, trace: bool):
+    if trace:
+        tracemalloc.start()
+    start = time.perf_counter()
+    index = build()
+    elapsed = time.perf_counter() - start
+    peak = 0
+    if trace:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    del index
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark list vs NumPy FAISS ingestion")
+    parser.add_argument("--repeat", type=int, default=100, help="Replicate the corpus N times to simulate a large ingest")
+    parser.add_argument("--model", type=str, default="sentence-transformers/all-MiniLM-L6-v2")
+    args = parser.parse_args()
+
+    chunks = split_documents(load_documents())
+    print(f"🧩 {len(chunks)} chunks x {args.repeat} = {len(chunks) * args.repeat} vectors")
+
+    model = LocalEmbeddingModel(args.model)
+    start = time.perf_counter()
+    base = model.embed_documents_array([c.page_content for c in chunks])
+    print(f"🧠 Encoded base corpus in {time.perf_counter() - start:.2f}s (shared by both paths)")
+
+    docs = [Document(page_content=c.page_content, metadata=c.metadata) for _ in range(args.repeat) for c in chunks]
+    vectors = np.ascontiguousarray(np.tile(base, (args.repeat, 1)))
+    embeddings = PrecomputedEmbeddings(vectors)
+
+    paths = {
+        "FAISS.from_documents (lists)": lambda: FAISS.from_documents(docs, embeddings),
+        "faiss_from_documents (ndarray)": lambda: faiss_from_documents(docs, embeddings),
+    }
+    print(f"\n{'path':<34}{'wall s':>10}{'peak MiB':>12}")
+    for name, build in paths.items():
+        # Timing and tracing are separate runs: tracemalloc slows down every
+        # boxed-float allocation and would inflate the list path's wall time.
+        elapsed, _ = measure(build, trace=False)
+        _, peak = measure(build, trace=True)
+        print(f"{name:<34}{elapsed:>10.3f}{peak / 2**20:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
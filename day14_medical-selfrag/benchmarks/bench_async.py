@@ -0,0 +1,67 @@
+"""
+Async query throughput: LangChain's default aembed_query (one task per call on
+the loop's unbounded default executor) versus LocalEmbeddingModel's bounded
+executor at several sizes, with N concurrent callers.
+
+    python benchmarks/bench_async.py --concurrency 64 --torch-threads 2
+"""
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import argparse
+import asyncio
+import time
+from langchain_core.embeddings import Embeddings
+from embeddings.async_executor import default_async_threads
+from embeddings.local_embedding_model import LocalEmbeddingModel
+
+QUERIES = [
+    "What is hypertension?",
+    "What are symptoms of high blood pressure?",
+    "How is stage 2 hypertension treated?",
+    "What causes secondary hypertension?",
+    "Which lifestyle changes lower blood pressure?",
+]
+
+
+async def run(embed, total, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        async with semaphore:
+            await embed(f"{QUERIES[i % len(QUERIES)]} ({i})")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    return total / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark async embedding throughput")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--total", type=int, default=512)
+    parser.add_argument("--torch-threads", type=int, default=None, help="Call torch.set_num_threads first")
+    parser.add_argument("--model", type=str, default="sentence-transformers/all-MiniLM-L6-v2")
+    args = parser.parse_args()
+
+    if args.torch_threads:
+        import torch
+        torch.set_num_threads(args.torch_threads)
+
+    base = LocalEmbeddingModel(args.model)
+    base.embed_query("warm-up")
+    default_size = default_async_threads(base.backend)
+    print(f"🧵 cores={os.cpu_count()}, default async threads={default_size}, concurrency={args.concurrency}\n")
+    print(f"{'mode':<34}{'queries/s':>10}")
+
+    rate = asyncio.run(run(lambda q: Embeddings.aembed_query(base, q), args.total, args.concurrency))
+    print(f"{'langchain default executor':<34}{rate:>10.1f}")
+
+    for size in sorted({1, default_size, 2 * default_size, 4 * default_size}):
+        model = LocalEmbeddingModel(args.model, async_threads=size)
+        rate = asyncio.run(run(model.aembed_query, args.total, args.concurrency))
+        print(f"{f'bounded executor ({size} threads)':<34}{rate:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
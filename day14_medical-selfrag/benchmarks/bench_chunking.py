@@ -0,0 +1,51 @@
+"""
+Chunk count, encoder truncation rate and embed time of the 512-character
+splitter versus token-budget chunking with the embedding model's tokenizer.
+
+    python benchmarks/bench_chunking.py --overlap-tokens 0 32 64
+"""
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import argparse
+import time
+import ingest.ingest_faiss as ingest_faiss
+from embeddings.local_embedding_model import LocalEmbeddingModel
+from ingest.token_splitter import TokenSplitter, token_stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare character and token-budget chunking")
+    parser.add_argument("--overlap-tokens", type=int, nargs="+", default=[32])
+    parser.add_argument("--data-dir", type=str, default=ingest_faiss.DATA_DIR)
+    parser.add_argument("--model", type=str, default="sentence-transformers/all-MiniLM-L6-v2")
+    args = parser.parse_args()
+
+    ingest_faiss.DATA_DIR = os.path.abspath(args.data_dir)
+    docs = ingest_faiss.load_documents()
+    model = LocalEmbeddingModel(args.model)
+    tokenizer, max_len = model.model.tokenizer, model.model.max_seq_length
+
+    splitters = {f"chars {ingest_faiss.CHUNK_SIZE}/{ingest_faiss.CHUNK_OVERLAP}": None}
+    for overlap in args.overlap_tokens:
+        splitters[f"tokens, overlap {overlap}"] = TokenSplitter.from_model(model.model, overlap)
+
+    print(f"📄 {len(docs)} documents, encoder max_seq_length={max_len}\n")
+    print(f"{'splitter':<24}{'chunks':>8}{'truncated':>11}{'mean tok':>10}{'split ms':>10}{'embed s':>9}")
+    for name, splitter in splitters.items():
+        start = time.perf_counter()
+        chunks = ingest_faiss.split_documents(docs, splitter)
+        split_ms = (time.perf_counter() - start) * 1000
+        texts = [c.page_content for c in chunks]
+        stats = token_stats(texts, tokenizer, max_len)
+        start = time.perf_counter()
+        model.embed_documents_array(texts)
+        embed_s = time.perf_counter() - start
+        print(
+            f"{name:<24}{stats['chunks']:>8}{stats['truncation_rate']:>11.1%}"
+            f"{stats['mean_tokens']:>10.0f}{split_ms:>10.1f}{embed_s:>9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
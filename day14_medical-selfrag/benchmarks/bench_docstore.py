@@ -0,0 +1,93 @@
+"""
+Startup cost of the pickled docstore (index.pkl) versus docstore.sqlite:
+load time, first-query time and peak RSS of a fresh interpreter that loads
+the index with load_vectorstore and runs one search (Linux only: peak RSS
+is VmHWM).
+
+The index is built from synthetic chunks (random text of --chars characters
+with PyPDFLoader-like metadata) so the corpus size is not limited by the
+bundled documents. Both formats share the same index.faiss.
+
+    python benchmarks/bench_docstore.py --n 200000 --runs 3
+"""
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import argparse
+import statistics
+import subprocess
+import tempfile
+import numpy as np
+from langchain_core.documents import Document
+from retrieval.faiss_store import faiss_from_vectors, save_vectorstore
+from tests.helpers import LookupEmbeddings
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Runs in the child; prints "<load seconds> <query seconds> <peak RSS KiB>". VmHWM is read from
+# /proc rather than rusage, whose ru_maxrss keeps the pre-exec high-water mark of the forked parent.
+CHILD = """
+import sys, time
+import numpy as np
+sys.path.insert(0, {root!r})
+from retrieval.faiss_store import load_vectorstore
+start = time.perf_counter()
+store = load_vectorstore({folder!r}, None)
+loaded = time.perf_counter()
+store.similarity_search_by_vector(np.ones({dim}, dtype=np.float32), k=4)
+queried = time.perf_counter()
+hwm = next(line.split()[1] for line in open("/proc/self/status") if line.startswith("VmHWM"))
+print(loaded - start, queried - loaded, hwm)
+"""
+
+
+def synthetic_docs(n, chars, seed=0):
+    rng = np.random.default_rng(seed)
+    alphabet = np.array(list("abcdefghijklmnopqrstuvwxyz     "))
+    docs = []
+    for i in range(n):
+        text = "".join(rng.choice(alphabet, chars))
+        metadata = {"source": f"/data/medical_docs/file_{i // 200}.pdf", "page": i % 200, "producer": "pdf"}
+        docs.append(Document(page_content=text, metadata=metadata))
+    return docs
+
+
+def run_once(folder, dim):
+    code = CHILD.format(root=ROOT, folder=folder, dim=dim)
+    proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"loading {folder} failed:\n{proc.stderr}")
+    load_s, query_s, hwm_kib = map(float, proc.stdout.split())
+    return load_s, query_s, hwm_kib / 1024
+
+
+def dir_mib(folder):
+    return sum(os.path.getsize(os.path.join(folder, f)) for f in os.listdir(folder)) / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pickled vs SQLite docstore startup")
+    parser.add_argument("--n", type=int, default=200_000)
+    parser.add_argument("--chars", type=int, default=512)
+    parser.add_argument("--dim", type=int, default=64)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    docs = synthetic_docs(args.n, args.chars)
+    vectors = np.random.default_rng(1).normal(size=(args.n, args.dim)).astype(np.float32)
+    store = faiss_from_vectors(docs, vectors, LookupEmbeddings())
+    print(f"🧩 {args.n} chunks of {args.chars} chars, dim={args.dim}\n")
+    print(f"{'docstore':<10}{'on disk MiB':>12}{'load s':>9}{'query ms':>10}{'peak RSS MiB':>14}")
+    with tempfile.TemporaryDirectory() as root:
+        for docstore in ("pickle", "sqlite"):
+            folder = os.path.join(root, docstore)
+            save_vectorstore(store, folder, docstore=docstore)
+            results = [run_once(folder, args.dim) for _ in range(args.runs)]
+            load = statistics.median(r[0] for r in results)
+            query = statistics.median(r[1] for r in results) * 1000
+            rss = statistics.median(r[2] for r in results)
+            print(f"{docstore:<10}{dir_mib(folder):>12.1f}{load:>9.2f}{query:>10.2f}{rss:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Retry loops per question with FAISS alone, BM25 alone and hybrid (RRF)
+retrieval, on a labeled question set.
+
+Each question is labeled with phrases, one of which a relevant chunk
+contains. The Self-RAG loop is replayed with that label as the grader:
+retrieval that returns a relevant chunk is graded correct, anything else
+sends the question through the corrector and back to retrieval, up to
+nodes.router.MAX_RETRIES times. "loops/question" is the mean number of
+those corrector -> rerun_retrieval loops, each costing two LLM calls in the
+real graph.
+
+By default the corrector keeps the query unchanged, so a miss costs all
+MAX_RETRIES loops; `--corrector llm` rewrites it with the real corrector
+node instead (needs Ollama). The bundled corpus only has a few chunks, so
+split it finer and retrieve fewer to make misses possible:
+
+    python benchmarks/bench_hybrid.py --chunk-size 200 --k 2
+    python benchmarks/bench_hybrid.py --data-dir /path/to/corpus --questions labeled.jsonl
+
+A --questions file has one {"question": ..., "expect": [phrase, ...]} per line.
+"""
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import argparse
+import json
+import time
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+import ingest.ingest_faiss as ingest_faiss
+from embeddings.local_embedding_model import LocalEmbeddingModel
+from nodes.router import MAX_RETRIES
+from retrieval.faiss_store import faiss_from_documents
+from retrieval.hybrid import build_bm25, hybrid_search, lookup
+
+# Drug classes, readings and abbreviations, where MiniLM is weakest, plus plain questions.
+LABELED = [
+    ("Does 130/80 mmHg count as hypertension?", ["130/80"]),
+    ("Some guidelines use 140/90 mm Hg instead?", ["140/90"]),
+    ("What does a BP of 112/78 mean?", ["112/78"]),
+    ("Is 120-129 systolic with diastolic <80 elevated?", ["120–129"]),
+    ("What is a normal BP reading?", ["Normal: <"]),
+    ("Are ACE inhibitors used to treat hypertension?", ["ACE inhibitors"]),
+    ("beta-blockers or diuretics for high BP", ["beta-blockers"]),
+    ("What is the DASH diet?", ["DASH"]),
+    ("renin angiotensin aldosterone system and BP", ["renin"]),
+    ("RAAS overactivity", ["renin"]),
+    ("Is essential hypertension 90-95% of cases?", ["90–95%"]),
+    ("Secondary hypertension share 5-10%", ["5–10%"]),
+    ("Which endocrine disorders cause secondary hypertension?", ["endocrine", "hormonal"]),
+    ("Can hypertension cause aneurysms?", ["Aneurysms"]),
+    ("Why is high blood pressure called a silent killer?", ["silent killer"]),
+    ("Does hypertension cause vision loss?", ["vision loss"]),
+    ("Does smoking raise blood pressure?", ["smoking"]),
+    ("What are the risk factors for hypertension?", ["risk factors"]),
+    ("Which organs does sustained high BP damage?", ["damages heart"]),
+    ("How is hypertension managed?", ["Management"]),
+]
+
+
+def load_questions(path):
+    if path is None:
+        return LABELED
+    with open(path, "r", encoding="utf-8") as f:
+        return [(row["question"], row["expect"]) for row in map(json.loads, f) if row]
+
+
+def relevant(texts, expect):
+    return any(phrase.lower() in text.lower() for text in texts for phrase in expect)
+
+
+def llm_corrector(query, texts):
+    from agents.corrector_node import corrector_node
+    from state.selfrag_state import SelfRAGState
+
+    state = SelfRAGState(question=query, retrieved_docs=texts, feedback="The retrieved docs do not answer the question.")
+    return corrector_node(state).question
+
+
+def replay(search, question, expect, correct):
+    """(corrector loops, answered) for one question under the labeled grader."""
+    query, loops = question, 0
+    while True:
+        texts = search(query)
+        if relevant(texts, expect):
+            return loops, True
+        if loops >= MAX_RETRIES:
+            return loops, False
+        loops += 1
+        query = correct(query, texts) if correct else query
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark retry loops with dense, BM25 and hybrid retrieval")
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--chunk-size", type=int, default=ingest_faiss.CHUNK_SIZE)
+    parser.add_argument("--data-dir", type=str, default=ingest_faiss.DATA_DIR)
+    parser.add_argument("--questions", type=str, default=None, help="JSONL labeled question set")
+    parser.add_argument("--model", type=str, default=ingest_faiss.EMBEDDING_MODEL)
+    parser.add_argument("--corrector", choices=("none", "llm"), default="none")
+    args = parser.parse_args()
+
+    ingest_faiss.DATA_DIR = os.path.abspath(args.data_dir)
+    splitter = RecursiveCharacterTextSplitter(chunk_size=args.chunk_size, chunk_overlap=ingest_faiss.CHUNK_OVERLAP)
+    chunks = ingest_faiss.split_documents(ingest_faiss.load_documents(), splitter)
+    store = faiss_from_documents(chunks, LocalEmbeddingModel(args.model), ids=[str(i) for i in range(len(chunks))])
+    sparse, _, _ = build_bm25(store)
+    questions = load_questions(args.questions)
+    correct = llm_corrector if args.corrector == "llm" else None
+    print(f"🧩 {len(chunks)} chunks, {len(questions)} labeled questions, k={args.k}, "
+          f"max {MAX_RETRIES} retries, corrector: {args.corrector}\n")
+
+    modes = {
+        "faiss": lambda q: [doc.page_content for doc in store.similarity_search(q, k=args.k)],
+        "bm25": lambda q: [lookup(store, id_).page_content for id_, _ in sparse.search(q, k=args.k)],
+        "hybrid": lambda q: [doc.page_content for doc in hybrid_search(store, sparse, q, k=args.k)],
+    }
+    for search in modes.values():
+        search("warm up")
+    print(f"{'mode':<8}{'first-try hits':>16}{'loops/question':>16}{'unanswered':>12}{'ms/search':>11}")
+    for name, search in modes.items():
+        start = time.perf_counter()
+        searches = 0
+        results = []
+        for question, expect in questions:
+            results.append(replay(search, question, expect, correct))
+            searches += results[-1][0] + 1
+        ms = (time.perf_counter() - start) * 1000 / searches
+        first_try = sum(loops == 0 and answered for loops, answered in results) / len(results)
+        loops = sum(loops for loops, _ in results) / len(results)
+        unanswered = sum(not answered for _, answered in results)
+        print(f"{name:<8}{first_try:>16.0%}{loops:>16.2f}{unanswered:>12}{ms:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Tokens/sec of embed_documents on the medical corpus with and without
+token-budget length bucketing.
+
+    python benchmarks/bench_length_bucketing.py --repeat 20 --max-batch-tokens 8192
+"""
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import argparse
+import random
+import time
+import numpy as np
+from embeddings.local_embedding_model import LocalEmbeddingModel
+from ingest.ingest_faiss import load_documents, split_documents
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark length-bucketed batching")
+    parser.add_argument("--repeat", type=int, default=10, help="Replicate the corpus N times")
+    parser.add_argument("--max-batch-tokens", type=int, default=8192)
+    parser.add_argument("--model", type=str, default="sentence-transformers/all-MiniLM-L6-v2")
+    args = parser.parse_args()
+
+    texts = [c.page_content for c in split_documents(load_documents())] * args.repeat
+    # Mix short and long chunks the way a multi-file ingest does.
+    random.Random(0).shuffle(texts)
+
+    modes = {
+        "item batches (batch_size=32)": None,
+        f"token budget ({args.max_batch_tokens})": args.max_batch_tokens,
+    }
+    model = LocalEmbeddingModel(args.model)
+    tokens = int(model.token_lengths(texts).sum())
+    print(f"🧩 {len(texts)} chunks, {tokens} tokens\n")
+    print(f"{'mode':<32}{'wall s':>10}{'tokens/s':>12}")
+
+    reference = None
+    for name, budget in modes.items():
+        model = LocalEmbeddingModel(args.model, max_batch_tokens=budget)
+        model.embed_documents_array(texts[:32])  # warm-up
+        start = time.perf_counter()
+        vectors = model.embed_documents_array(texts)
+        elapsed = time.perf_counter() - start
+        print(f"{name:<32}{elapsed:>10.2f}{tokens / elapsed:>12.0f}")
+
+        if reference is None:
+            reference = vectors
+        elif not np.allclose(reference, vectors, atol=1e-4):
+            print("⚠️  bucketed results differ from the reference order")
+
+
+if __name__ == "__main__":
+    main()
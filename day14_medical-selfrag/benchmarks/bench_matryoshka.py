@@ -0,0 +1,81 @@
+"""
+Recall@k and latency of truncated-dimension coarse search, with and without
+re-ranking on full vectors, against exact full-dimension search.
+
+all-MiniLM-L6-v2 is not Matryoshka-trained, so recall without re-ranking drops
+quickly as dims shrink; the oversampled re-rank is what recovers it.
+
+    python benchmarks/bench_matryoshka.py --dims 32 64 128 192 --oversample 4 10
+"""
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import argparse
+import time
+import numpy as np
+import ingest.ingest_faiss as ingest_faiss
+from benchmarks.bench_precision import QUESTIONS, recall_at_k
+from embeddings.local_embedding_model import LocalEmbeddingModel
+from retrieval.faiss_store import faiss_from_vectors
+from retrieval.index_factory import index_nbytes
+from retrieval.matryoshka import MatryoshkaFAISS, truncate
+
+
+def search_positions(store, queries, k):
+    """FAISS positions of the top-k docs for each query, plus ms/query."""
+    position_of = {doc_id: pos for pos, doc_id in store.index_to_docstore_id.items()}
+    found = []
+    start = time.perf_counter()
+    for query in queries:
+        hits = store.similarity_search_with_score_by_vector(query.tolist(), k=k)
+        found.append([position_of[doc.id] for doc, _ in hits])
+    return np.array(found), (time.perf_counter() - start) * 1000 / len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate truncated-dimension indexing with re-ranking")
+    parser.add_argument("--dims", type=int, nargs="+", default=[32, 64, 128, 192])
+    parser.add_argument("--oversample", type=int, nargs="+", default=[4, 10])
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--data-dir", type=str, default=ingest_faiss.DATA_DIR)
+    parser.add_argument("--model", type=str, default="sentence-transformers/all-MiniLM-L6-v2")
+    args = parser.parse_args()
+
+    import faiss
+
+    ingest_faiss.DATA_DIR = os.path.abspath(args.data_dir)
+    docs = ingest_faiss.split_documents(ingest_faiss.load_documents())
+    texts = [d.page_content for d in docs]
+    model = LocalEmbeddingModel(args.model)
+    vectors = model.embed_documents_array(texts)
+    queries_text = QUESTIONS + [t[:120] for t in texts[:: max(1, len(texts) // 50)]]
+    queries = np.stack([model.embed_query_array(q) for q in queries_text])
+    k = min(args.k, len(texts))
+    full_dim = vectors.shape[1]
+
+    exact = faiss_from_vectors(docs, vectors, model)
+    truth, exact_ms = search_positions(exact, queries, k)
+    print(f"🧩 {len(texts)} chunks, {len(queries)} queries, full dim={full_dim}, k={k}\n")
+    print(f"{'index':<26}{'index KiB':>10}{'recall@k':>10}{'ms/query':>10}")
+    print(f"{f'full {full_dim}d':<26}{index_nbytes(exact.index) / 1024:>10.1f}{1.0:>10.3f}{exact_ms:>10.3f}")
+
+    for dim in [d for d in args.dims if d < full_dim]:
+        coarse = faiss_from_vectors(docs, truncate(vectors, dim), model, index=faiss.IndexFlatL2(dim))
+        # Coarse-only baseline: search the truncated index with a truncated query.
+        found = []
+        start = time.perf_counter()
+        for query in queries:
+            _, ids = coarse.index.search(truncate(query[None, :], dim), k)
+            found.append(ids[0])
+        coarse_ms = (time.perf_counter() - start) * 1000 / len(queries)
+        size = index_nbytes(coarse.index) / 1024
+        print(f"{f'{dim}d, no re-rank':<26}{size:>10.1f}{recall_at_k(np.array(found), truth):>10.3f}{coarse_ms:>10.3f}")
+
+        for oversample in args.oversample:
+            store = MatryoshkaFAISS.wrap(coarse, vectors, dim, oversample)
+            found, ms = search_positions(store, queries, k)
+            print(f"{f'{dim}d, re-rank x{oversample}':<26}{size:>10.1f}{recall_at_k(found, truth):>10.3f}{ms:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Startup time and per-worker memory of --workers concurrent processes each
+loading the same saved index, read into memory versus memory-mapped
+(load_vectorstore(..., mmap=True), what FAISS_INDEX_MMAP=1 turns on in the
+retriever nodes).
+
+Every worker loads the index, runs --queries searches (a flat search touches
+every page), then reports its load time and memory from
+/proc/self/smaps_rollup while all workers are still alive:
+
+  USS  pages only this worker holds (what a new worker really costs)
+  PSS  its share of everything, shared pages split between their users
+
+Run at two sizes to see load time stop growing with the index:
+
+    python benchmarks/bench_mmap.py --n 100000 400000 --workers 4
+"""
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import argparse
+import json
+import statistics
+import subprocess
+import tempfile
+import numpy as np
+from langchain_core.documents import Document
+from retrieval.faiss_store import faiss_from_vectors, save_vectorstore
+from retrieval.index_factory import INDEX_TYPES, make_index
+from tests.helpers import LookupEmbeddings
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Runs in each worker; prints one JSON line, then holds its memory until stdin closes.
+CHILD = """
+import json, sys, time
+import numpy as np
+sys.path.insert(0, {root!r})
+from retrieval.faiss_store import load_vectorstore
+
+def smaps():
+    fields = {{}}
+    for line in open("/proc/self/smaps_rollup"):
+        parts = line.split()
+        if len(parts) == 3 and parts[2] == "kB":
+            fields[parts[0].rstrip(":")] = int(parts[1]) / 1024
+    return fields
+
+start = time.perf_counter()
+store = load_vectorstore({folder!r}, None, mmap={mmap})
+loaded = time.perf_counter() - start
+queries = np.random.default_rng(0).normal(size=({queries}, {dim})).astype(np.float32)
+for query in queries:
+    store.similarity_search_by_vector(query, k=4)
+m = smaps()
+print(json.dumps({{"load_s": loaded, "uss": m["Private_Clean"] + m["Private_Dirty"], "pss": m["Pss"], "rss": m["Rss"]}}), flush=True)
+sys.stdin.read()
+"""
+
+
+def run_workers(folder, mmap, workers, queries, dim):
+    code = CHILD.format(root=ROOT, folder=folder, mmap=mmap, queries=queries, dim=dim)
+    procs = [
+        subprocess.Popen([sys.executable, "-c", code], stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                         stderr=subprocess.DEVNULL, text=True)
+        for _ in range(workers)
+    ]
+    # Read every report before releasing anyone, so PSS is measured with all workers mapped.
+    reports = [json.loads(proc.stdout.readline()) for proc in procs]
+    for proc in procs:
+        proc.stdin.close()
+        proc.wait()
+    return reports
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark in-memory vs memory-mapped FAISS loading")
+    parser.add_argument("--n", type=int, nargs="+", default=[100_000, 400_000])
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--index-type", choices=INDEX_TYPES, default="flat")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--queries", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"🧩 {args.index_type}, dim={args.dim}, {args.workers} workers, {args.queries} queries each\n")
+    print(f"{'vectors':>9}{'index MiB':>11}{'mode':>8}{'load s':>9}{'USS MiB':>9}{'PSS MiB':>9}{'RSS MiB':>9}")
+    for n in args.n:
+        vectors = np.random.default_rng(1).normal(size=(n, args.dim)).astype(np.float32)
+        docs = [Document(page_content=str(i)) for i in range(n)]
+        index = make_index(args.index_type, args.dim, vectors)
+        store = faiss_from_vectors(docs, vectors, LookupEmbeddings(), index=index)
+        del vectors
+        with tempfile.TemporaryDirectory() as folder:
+            # docstore.sqlite, so the comparison is about the FAISS index alone.
+            save_vectorstore(store, folder, docstore="sqlite")
+            del store, index
+            size = os.path.getsize(os.path.join(folder, "index.faiss")) / 2**20
+            run_workers(folder, True, 1, 1, args.dim)  # warm the page cache for both modes
+            for mmap in (False, True):
+                reports = run_workers(folder, mmap, args.workers, args.queries, args.dim)
+                row = {key: statistics.median(r[key] for r in reports) for key in reports[0]}
+                mode = "mmap" if mmap else "read"
+                print(f"{n:>9}{size:>11.1f}{mode:>8}{row['load_s']:>9.3f}{row['uss']:>9.1f}{row['pss']:>9.1f}{row['rss']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Latency and throughput of the torch (SentenceTransformer.encode) backend
+versus the ONNX Runtime backends on the medical corpus.
+
+Export the model first (once, offline):
+
+    python -m embeddings.onnx_backend --model sentence-transformers/all-MiniLM-L6-v2 --quantize
+    python benchmarks/bench_onnx.py --repeat 10
+"""
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import argparse
+import statistics
+import time
+from embeddings.local_embedding_model import LocalEmbeddingModel
+from embeddings.model_registry import BACKENDS
+from ingest.ingest_faiss import load_documents, split_documents
+
+QUERIES = [
+    "What is hypertension?",
+    "What are symptoms of high blood pressure?",
+    "How is stage 2 hypertension treated?",
+    "What causes secondary hypertension?",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark torch vs ONNX Runtime embedding backends")
+    parser.add_argument("--repeat", type=int, default=10, help="Replicate the corpus N times for throughput")
+    parser.add_argument("--query-runs", type=int, default=50)
+    parser.add_argument("--model", type=str, default="sentence-transformers/all-MiniLM-L6-v2")
+    args = parser.parse_args()
+
+    texts = [c.page_content for c in split_documents(load_documents())] * args.repeat
+    print(f"🧩 {len(texts)} chunks for throughput, {args.query_runs} queries for latency\n")
+    print(f"{'backend':<12}{'p50 ms':>10}{'p95 ms':>10}{'docs/s':>10}")
+
+    for backend in BACKENDS:
+        try:
+            model = LocalEmbeddingModel(args.model, backend=backend)
+        except FileNotFoundError as e:
+            print(f"{backend:<12}  skipped: {e}")
+            continue
+
+        model.embed_query(QUERIES[0])  # warm-up
+        latencies = []
+        for i in range(args.query_runs):
+            start = time.perf_counter()
+            model.embed_query_array(QUERIES[i % len(QUERIES)])
+            latencies.append((time.perf_counter() - start) * 1000)
+        latencies.sort()
+
+        start = time.perf_counter()
+        model.embed_documents_array(texts)
+        rate = len(texts) / (time.perf_counter() - start)
+
+        p95 = latencies[int(0.95 * (len(latencies) - 1))]
+        print(f"{backend:<12}{statistics.median(latencies):>10.2f}{p95:>10.2f}{rate:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Recall@k versus memory and latency for the reduced-precision embedding modes
+and FAISS index types on data/medical_docs.
+
+Ground truth is exact float32 search. Use --data-dir to point at a larger
+corpus; the bundled one only has a few dozen chunks.
+
+    python benchmarks/bench_precision.py --k 5
+"""
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import argparse
+import time
+import numpy as np
+import ingest.ingest_faiss as ingest_faiss
+from embeddings.local_embedding_model import LocalEmbeddingModel
+from embeddings.quantization import dequantize_int8, int8_ranges
+from retrieval.index_factory import INDEX_TYPES, index_nbytes, make_index, tune_search_params
+
+QUESTIONS = [
+    "What is hypertension?",
+    "What blood pressure reading counts as stage 2 hypertension?",
+    "What are symptoms of high blood pressure?",
+    "How is hypertension treated?",
+    "What lifestyle changes lower blood pressure?",
+    "What causes secondary hypertension?",
+    "What organs are damaged by uncontrolled hypertension?",
+    "What is a hypertensive crisis?",
+    "How is blood pressure measured?",
+    "What is the pathophysiology of essential hypertension?",
+]
+
+
+def recall_at_k(found: np.ndarray, truth: np.ndarray) -> float:
+    hits = sum(len(set(f) & set(t)) for f, t in zip(found, truth))
+    return hits / truth.size
+
+
+def timed_search(index, queries, k):
+    start = time.perf_counter()
+    _, ids = index.search(queries, k)
+    return ids, (time.perf_counter() - start) * 1000 / len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark embedding precision and FAISS index types")
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--data-dir", type=str, default=ingest_faiss.DATA_DIR)
+    parser.add_argument("--model", type=str, default="sentence-transformers/all-MiniLM-L6-v2")
+    args = parser.parse_args()
+
+    import faiss
+
+    ingest_faiss.DATA_DIR = os.path.abspath(args.data_dir)
+    chunks = ingest_faiss.split_documents(ingest_faiss.load_documents())
+    texts = [c.page_content for c in chunks]
+    # Chunk openings double as queries so recall isn't judged on ten questions alone.
+    queries_text = QUESTIONS + [t[:120] for t in texts[:: max(1, len(texts) // 50)]]
+
+    model = LocalEmbeddingModel(args.model)
+    vectors = model.embed_documents_array(texts)
+    queries = np.stack([model.embed_query_array(q) for q in queries_text])
+    k = min(args.k, len(texts))
+    dim = vectors.shape[1]
+    print(f"🧩 {len(texts)} chunks, {len(queries)} queries, dim={dim}, k={k}\n")
+
+    exact = faiss.IndexFlatL2(dim)
+    exact.add(vectors)
+    truth, _ = timed_search(exact, queries, k)
+
+    print(f"{'mode':<22}{'bytes/vec':>10}{'index KiB':>11}{'recall@k':>10}{'ms/query':>10}")
+
+    # Embedding output precisions, searched exactly after decoding. The whole
+    # corpus is the calibration sample, however small the bundled one is.
+    model.int8_ranges = int8_ranges(vectors, min_samples=1)
+    int8_codes = model.embed_documents_array(texts, precision="int8")
+    decoded = {
+        "embed float16": model.embed_documents_array(texts, precision="float16").astype(np.float32),
+        "embed int8": dequantize_int8(int8_codes, model.int8_ranges),
+    }
+    for name, stored in decoded.items():
+        index = faiss.IndexFlatL2(dim)
+        index.add(np.ascontiguousarray(stored))
+        ids, ms = timed_search(index, queries, k)
+        per_vector = dim * (2 if "16" in name else 1)
+        print(f"{name:<22}{per_vector:>10}{'-':>11}{recall_at_k(ids, truth):>10.3f}{ms:>10.3f}")
+
+    # FAISS index types.
+    for index_type in INDEX_TYPES:
+        index = make_index(index_type, dim, vectors)
+        index.add(vectors)
+        # IVF/HNSW: the cheapest nprobe/efSearch reaching 0.95 recall, as ingest would pick.
+        tune_search_params(index, vectors, queries, k)
+        ids, ms = timed_search(index, queries, k)
+        size = index_nbytes(index)
+        print(f"{'faiss ' + index_type:<22}{size // len(texts):>10}{size / 1024:>11.1f}{recall_at_k(ids, truth):>10.3f}{ms:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
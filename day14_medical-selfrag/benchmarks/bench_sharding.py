@@ -0,0 +1,99 @@
+"""
+Build time, load time and single-query latency of one FAISS index versus N
+shards built in parallel processes and searched concurrently (ShardedFAISS).
+
+Uses synthetic clustered vectors so corpus size can go well past what the
+bundled documents give; recall@k is against exact search over all vectors.
+
+    python benchmarks/bench_sharding.py --n 1000000 --index-type ivf-flat --shards 1 2 4 8
+"""
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import argparse
+import tempfile
+import time
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from retrieval.faiss_store import faiss_from_index, load_vectorstore, save_vectorstore
+from retrieval.index_factory import INDEX_TYPES, TUNABLE_INDEX_TYPES, apply_search_params
+from retrieval.sharded import ShardedFAISS, build_shard_indexes, partition
+
+
+class NoEmbeddings(Embeddings):
+    """Queries are passed as vectors; nothing is embedded."""
+
+    def embed_documents(self, texts):
+        raise NotImplementedError
+
+    def embed_query(self, text):
+        raise NotImplementedError
+
+
+def synthetic(n, dim, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(max(1, n // 1000), dim)).astype(np.float32)
+    vectors = centers[rng.integers(0, len(centers), n)] + 0.5 * rng.normal(size=(n, dim)).astype(np.float32)
+    return vectors.astype(np.float32)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sharded FAISS build, load and search")
+    parser.add_argument("--n", type=int, default=200_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--index-type", choices=INDEX_TYPES, default="ivf-flat")
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--nprobe", type=int, default=16)
+    parser.add_argument("--ef-search", type=int, default=64)
+    args = parser.parse_args()
+
+    import faiss
+
+    vectors = synthetic(args.n, args.dim)
+    queries = vectors[np.random.default_rng(1).choice(args.n, args.queries, replace=False)]
+    queries = queries + 0.1 * np.random.default_rng(2).normal(size=queries.shape).astype(np.float32)
+    exact = faiss.IndexFlatL2(args.dim)
+    exact.add(vectors)
+    _, truth = exact.search(queries, args.k)
+    del exact
+
+    ids = [str(i) for i in range(args.n)]
+    docs = [Document(page_content=id_) for id_ in ids]
+    params = {}
+    if args.index_type in TUNABLE_INDEX_TYPES:
+        params = {"efSearch": args.ef_search} if args.index_type == "hnsw" else {"nprobe": args.nprobe}
+    print(f"🧩 {args.n} vectors, dim={args.dim}, {args.index_type} {params}, {args.queries} queries, k={args.k}\n")
+    print(f"{'shards':>6}{'build s':>9}{'load s':>8}{'ms/query':>10}{'recall@k':>10}")
+
+    for n_shards in args.shards:
+        parts = partition(ids, n_shards)
+        start = time.perf_counter()
+        indexes = build_shard_indexes([vectors[rows] for rows in parts], args.index_type)
+        build = time.perf_counter() - start
+        shards = []
+        for rows, index in zip(parts, indexes):
+            apply_search_params(index, params)
+            shards.append(faiss_from_index([docs[i] for i in rows], index, NoEmbeddings(), [ids[i] for i in rows]))
+        store = ShardedFAISS(shards, NoEmbeddings()) if n_shards > 1 else shards[0]
+
+        with tempfile.TemporaryDirectory() as folder:
+            save_vectorstore(store, folder)
+            start = time.perf_counter()
+            load_vectorstore(folder, NoEmbeddings())
+            load = time.perf_counter() - start
+
+        found = []
+        start = time.perf_counter()
+        for query in queries:
+            hits = store.similarity_search_with_score_by_vector(query, k=args.k)
+            found.append([int(doc.page_content) for doc, _ in hits])
+        ms = (time.perf_counter() - start) * 1000 / len(queries)
+        recall = np.mean([len(set(f) & set(t)) / args.k for f, t in zip(found, truth)])
+        print(f"{n_shards:>6}{build:>9.1f}{load:>8.2f}{ms:>10.3f}{recall:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
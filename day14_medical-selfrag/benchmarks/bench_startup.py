@@ -0,0 +1,53 @@
+"""
+Startup cost of the Self-RAG entry points: wall time and peak RSS of a fresh
+interpreter running
+
+  * medical_selfrag_runner.py --debug-only
+  * from graphs.medical_selfrag_graph import graph
+
+Each command runs --runs times; the median is reported.
+
+    python benchmarks/bench_startup.py --runs 5
+"""
+import sys, os
+import argparse
+import statistics
+import subprocess
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+COMMANDS = {
+    "runner --debug-only": [sys.executable, "medical_selfrag_runner.py", "--debug-only"],
+    "import graph": [sys.executable, "-c", "from graphs.medical_selfrag_graph import graph"],
+}
+
+
+def run_once(cmd):
+    start = time.perf_counter()
+    proc = subprocess.Popen(cmd, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    # wait4 gives this child's own rusage, unlike RUSAGE_CHILDREN which is cumulative.
+    _, status, usage = os.wait4(proc.pid, 0)
+    elapsed = time.perf_counter() - start
+    if os.waitstatus_to_exitcode(status) != 0:
+        raise RuntimeError(f"{' '.join(cmd)} exited with {os.waitstatus_to_exitcode(status)}")
+    # ru_maxrss is KiB on Linux and bytes on macOS.
+    rss_mib = usage.ru_maxrss / (2**20 if sys.platform == "darwin" else 2**10)
+    return elapsed, rss_mib
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Self-RAG startup time and RSS")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'command':<24}{'median s':>10}{'peak RSS MiB':>14}")
+    for name, cmd in COMMANDS.items():
+        results = [run_once(cmd) for _ in range(args.runs)]
+        elapsed = statistics.median(r[0] for r in results)
+        rss = statistics.median(r[1] for r in results)
+        print(f"{name:<24}{elapsed:>10.2f}{rss:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
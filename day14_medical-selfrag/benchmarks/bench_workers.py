@@ -0,0 +1,58 @@
+"""
+Report embedding throughput (docs/sec) for 1..N encoder worker processes on
+the medical corpus, replicated to a realistic ingest size.
+
+    python benchmarks/bench_workers.py --max-workers 32 --repeat 50
+"""
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import argparse
+import time
+import numpy as np
+from embeddings.local_embedding_model import LocalEmbeddingModel
+from ingest.ingest_faiss import load_documents, split_documents
+
+
+def worker_counts(max_workers):
+    n = 1
+    while n < max_workers:
+        yield n
+        n *= 2
+    yield max_workers
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark multi-process embedding scaling")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--repeat", type=int, default=20, help="Replicate the corpus N times")
+    parser.add_argument("--chunk-size", type=int, default=None, help="Texts per worker task")
+    parser.add_argument("--model", type=str, default="sentence-transformers/all-MiniLM-L6-v2")
+    args = parser.parse_args()
+
+    chunks = split_documents(load_documents())
+    texts = [c.page_content for c in chunks] * args.repeat
+    print(f"🧩 Encoding {len(texts)} chunks\n")
+    print(f"{'workers':>8}{'wall s':>10}{'docs/s':>10}{'speedup':>9}")
+
+    reference = None
+    baseline = None
+    for workers in worker_counts(args.max_workers):
+        with LocalEmbeddingModel(args.model, workers=workers, mp_chunk_size=args.chunk_size) as model:
+            # Keep process start-up and per-worker model loading out of the measurement.
+            model.embed_documents_array(texts[: 4 * workers])
+            start = time.perf_counter()
+            vectors = model.embed_documents_array(texts)
+            elapsed = time.perf_counter() - start
+
+        if reference is None:
+            reference = vectors
+        elif not np.allclose(reference, vectors, atol=1e-4):
+            print(f"⚠️  {workers} workers returned different vectors (order not preserved?)")
+        rate = len(texts) / elapsed
+        baseline = baseline or rate
+        print(f"{workers:>8}{elapsed:>10.2f}{rate:>10.1f}{rate / baseline:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Bounded thread pool for LocalEmbeddingModel's async methods.
+
+Each encode call already runs on torch's intra-op thread pool, which by
+default uses every core (see torch.get_num_threads / torch.set_num_threads).
+Running more encode calls at once than cores // intra-op threads only makes
+the calls fight over the same cores, so async callers are funneled through a
+small shared executor sized accordingly:
+
+    workers = max(1, os.cpu_count() // torch.get_num_threads())
+
+With torch's default (one thread per core) that is a single worker and
+concurrent awaits simply queue. To trade per-call latency for parallelism,
+lower the intra-op count first, e.g. torch.set_num_threads(2) on an 8-core
+host gives 4 executor workers. The size can also be forced with the
+LOCAL_EMBEDDING_ASYNC_THREADS env var or LocalEmbeddingModel(async_threads=N).
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict
+
+ASYNC_THREADS_ENV = "LOCAL_EMBEDDING_ASYNC_THREADS"
+
+_executors: Dict[int, ThreadPoolExecutor] = {}
+_executors_lock = threading.Lock()
+
+
+def intra_op_threads(backend: str) -> int:
+    if backend == "torch":
+        import torch
+        return max(1, torch.get_num_threads())
+    # ONNX Runtime's default intra-op pool also uses one thread per core.
+    return os.cpu_count() or 1
+
+
+def default_async_threads(backend: str = "torch") -> int:
+    configured = os.environ.get(ASYNC_THREADS_ENV)
+    if configured:
+        return max(1, int(configured))
+    return max(1, (os.cpu_count() or 1) // intra_op_threads(backend))
+
+
+def get_executor(max_workers: int) -> ThreadPoolExecutor:
+    """Process-wide executor per size, shared by every model instance."""
+    with _executors_lock:
+        executor = _executors.get(max_workers)
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="embedding-async")
+            _executors[max_workers] = executor
+        return executor
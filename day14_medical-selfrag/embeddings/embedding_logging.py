@@ -0,0 +1,162 @@
+"""
+Logging for the embedding hot path.
+
+Records go through a QueueHandler to a QueueListener thread that owns the
+stderr handler, so embed calls never block on the write. Instead of two
+lines per call the module keeps per-operation counters (calls, texts, ms) and
+a timer thread logs an aggregated summary LOCAL_EMBEDDING_LOG_SUMMARY_SECONDS
+after the first call of each window, whether or not more calls follow; a
+LOCAL_EMBEDDING_LOG_SAMPLE_RATE fraction of individual calls is still logged.
+
+Per-call logging for every call, written synchronously, only happens in debug
+mode: LOCAL_EMBEDDING_LOG_DEBUG=1 or configure_logging(debug=True).
+"""
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+
+SAMPLE_RATE_ENV = "LOCAL_EMBEDDING_LOG_SAMPLE_RATE"
+SUMMARY_SECONDS_ENV = "LOCAL_EMBEDDING_LOG_SUMMARY_SECONDS"
+DEBUG_ENV = "LOCAL_EMBEDDING_LOG_DEBUG"
+
+logger = logging.getLogger("LocalEmbeddingModel")
+formatter = logging.Formatter("[%(asctime)s] %(levelname)s: %(message)s")
+
+
+class StderrHandler(logging.StreamHandler):
+    """Writes to sys.stderr as it is at emit time, like logging.lastResort, so a replaced stream is never kept."""
+
+    def __init__(self) -> None:
+        logging.Handler.__init__(self)
+
+    @property
+    def stream(self):
+        return sys.stderr
+
+
+class CallStats:
+    """
+    Per-operation counters, flushed as one summary line per interval. A
+    window opens with the first call after a flush; a daemon thread, started
+    on first use, flushes it `interval` seconds later.
+    """
+
+    def __init__(self, interval: float) -> None:
+        self._interval = interval
+        self._lock = threading.Lock()
+        self._window_start: Optional[float] = None
+        self._counts: Dict[str, List[float]] = {}
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def interval(self) -> float:
+        return self._interval
+
+    @interval.setter
+    def interval(self, value: float) -> None:
+        self._interval = value
+        self._wake.set()
+
+    def record(self, op: str, texts: int, ms: float) -> None:
+        with self._lock:
+            if self._window_start is None:
+                self._window_start = time.monotonic()
+                self._wake.set()
+            counts = self._counts.setdefault(op, [0, 0, 0.0])
+            counts[0] += 1
+            counts[1] += texts
+            counts[2] += ms
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="embedding-log-summary", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                start = self._window_start
+            # Sleep until the open window is due, or until a call opens one.
+            self._wake.wait(None if start is None else max(0.0, start + self._interval - time.monotonic()))
+            self._wake.clear()
+            with self._lock:
+                due = self._window_start is not None and time.monotonic() - self._window_start >= self._interval
+            if due:
+                self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            counts, self._counts = self._counts, {}
+            elapsed = time.monotonic() - self._window_start if self._window_start is not None else 0.0
+            self._window_start = None
+        for op, (calls, texts, ms) in sorted(counts.items()):
+            logger.info(
+                f"{op}: {calls} calls, {texts} texts, {ms:.1f} ms total "
+                f"({ms / calls:.2f} ms/call) in the last {elapsed:.0f}s"
+            )
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_stats = CallStats(float(os.environ.get(SUMMARY_SECONDS_ENV, "60")))
+_sample_rate = float(os.environ.get(SAMPLE_RATE_ENV, "0.01"))
+_debug = os.environ.get(DEBUG_ENV, "") not in ("", "0", "false", "False")
+
+
+def configure_logging(
+    debug: Optional[bool] = None,
+    sample_rate: Optional[float] = None,
+    summary_seconds: Optional[float] = None,
+) -> None:
+    """(Re)install the handlers; arguments left as None keep their current value."""
+    global _listener, _sample_rate, _debug
+    if sample_rate is not None:
+        _sample_rate = sample_rate
+    if summary_seconds is not None:
+        _stats.interval = summary_seconds
+    if debug is not None:
+        _debug = debug
+
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    logger.handlers.clear()
+    logger.propagate = False
+
+    stream = StderrHandler()
+    stream.setFormatter(formatter)
+    if _debug:
+        logger.addHandler(stream)
+        logger.setLevel(logging.DEBUG)
+        return
+
+    records: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+    logger.addHandler(logging.handlers.QueueHandler(records))
+    logger.setLevel(logging.INFO)
+    _listener = logging.handlers.QueueListener(records, stream, respect_handler_level=True)
+    _listener.start()
+
+
+def log_call(op: str, model_name: str, texts: int, start: float) -> None:
+    """Account one embed call that began at perf_counter() == start."""
+    ms = (time.perf_counter() - start) * 1000
+    _stats.record(op, texts, ms)
+    if _debug:
+        logger.debug(f"{op}: embedded {texts} texts with model '{model_name}' in {ms:.1f} ms")
+    elif _sample_rate and random.random() < _sample_rate:
+        logger.info(f"{op} (sampled): embedded {texts} texts with model '{model_name}' in {ms:.1f} ms")
+
+
+def _shutdown() -> None:
+    _stats.flush()
+    if _listener is not None:
+        _listener.stop()
+
+
+configure_logging()
+atexit.register(_shutdown)
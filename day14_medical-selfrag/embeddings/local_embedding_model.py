@@ -1,42 +1,315 @@
-import logging
-from typing import List, Any, Dict
-from sentence_transformers import SentenceTransformer
+import asyncio
+import os
+import time
+from typing import List, Any, Callable, Dict, Optional
+import numpy as np
 from langchain_core.embeddings import Embeddings
+from embeddings.async_executor import default_async_threads, get_executor
+from embeddings.embedding_cache import EmbeddingCache, get_cache, text_key
+from embeddings.embedding_logging import log_call, logger
+from embeddings.micro_batcher import MicroBatcher, get_batcher
+from embeddings.quantization import MIN_CALIBRATION_SAMPLES, PRECISIONS, clipped_fraction, int8_ranges, to_precision
+from embeddings.model_registry import get_model, registry_stats
 
-# Set up logging
-logger = logging.getLogger("LocalEmbeddingModel")
-handler = logging.StreamHandler()
-formatter = logging.Formatter("[%(asctime)s] %(levelname)s: %(message)s")
-handler.setFormatter(formatter)
-if not logger.hasHandlers():
-    logger.addHandler(handler)
-logger.setLevel(logging.INFO)
+CACHE_DIR_ENV = "LOCAL_EMBEDDING_CACHE_DIR"
 
 class LocalEmbeddingModel(Embeddings):
     """
     Local embedding model wrapper using sentence-transformers.
     Compatible with LangChain vectorstores (FAISS, Chroma, etc).
     Supports batch embedding and single query embedding.
+
+    The underlying SentenceTransformer is fetched from a process-wide registry,
+    so creating many wrappers for the same (model_name, device) loads the
+    weights only once.
+
+    When `cache_dir` (or the LOCAL_EMBEDDING_CACHE_DIR env var) is set, vectors
+    are looked up in a persistent content-addressed cache first and only the
+    misses are encoded.
+
+    With `micro_batching=True`, concurrent embed_query/aembed_query calls are
+    queued and encoded together in one forward pass (up to `max_batch_size`
+    texts or `max_wait_ms` of waiting).
+
+    With `workers > 1`, large embed_documents calls are spread over a pool of
+    encoder processes (sentence-transformers' multi-process pool) in chunks of
+    `mp_chunk_size` texts; output order is preserved. The pool starts on first
+    use and is stopped by close() or when used as a context manager.
+
+    In-process embed_documents calls sort texts by token length and cut them
+    into batches of at most `max_batch_tokens` padded tokens, so short chunks
+    run in large batches and long ones in small batches. Results come back in
+    the caller's order. Set `max_batch_tokens=None` to use plain encode().
+
+    The *_array methods can return float16 or int8 (scalar-quantized) vectors
+    for compact storage. int8 codes use per-dimension ranges kept in
+    `int8_ranges`; set them with calibrate_int8() on a representative sample,
+    or the first int8 document batch calibrates them if it has at least
+    MIN_CALIBRATION_SAMPLES texts (smaller ones raise). Later values outside
+    the ranges are clipped, with a warning. Queries are quantized with the
+    same ranges.
+
+    `backend="onnx"` (or "onnx-int8") runs the model through ONNX Runtime on
+    CPU instead of torch; export it once with `python -m embeddings.onnx_backend`.
+
+    aembed_documents/aembed_query run on a shared executor of `async_threads`
+    workers (default: cores // torch intra-op threads), so many concurrent
+    graph runs queue for the model instead of oversubscribing the CPU. See
+    embeddings/async_executor.py for how this interacts with torch.set_num_threads.
     """
 
-    def __init__(self, model_name: str = "sentence-transformers/all-MiniLM-L6-v2") -> None:
+    def __init__(
+        self,
+        model_name: str = "sentence-transformers/all-MiniLM-L6-v2",
+        device: Optional[str] = None,
+        cache_dir: Optional[str] = None,
+        cache_max_entries: int = 100_000,
+        micro_batching: bool = False,
+        max_batch_size: int = 32,
+        max_wait_ms: float = 2.0,
+        workers: int = 1,
+        mp_chunk_size: Optional[int] = None,
+        max_batch_tokens: Optional[int] = 8192,
+        backend: str = "torch",
+        async_threads: Optional[int] = None,
+    ) -> None:
         self.model_name = model_name
-        logger.info(f"Loading local model '{self.model_name}'...")
-        self.model = SentenceTransformer(self.model_name)
-        logger.info(f"Model '{self.model_name}' loaded successfully.")
+        self.device = device
+        self.cache_dir = cache_dir or os.environ.get(CACHE_DIR_ENV)
+        self.cache_max_entries = cache_max_entries
+        self.micro_batching = micro_batching
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.workers = workers
+        self.mp_chunk_size = mp_chunk_size
+        self.max_batch_tokens = max_batch_tokens
+        self.backend = backend
+        self.async_threads = async_threads
+        self.int8_ranges: Optional[np.ndarray] = None
+        self.model = get_model(self.model_name, self.device, self.backend)
+        self._cache: Optional[EmbeddingCache] = None
+        self._pool: Optional[Dict[str, Any]] = None
+
+    def _get_cache(self) -> Optional[EmbeddingCache]:
+        if self.cache_dir and self._cache is None:
+            dim = self.model.get_sentence_embedding_dimension()
+            # Backends agree only approximately (int8 least of all), so they don't share vectors.
+            cache_name = self.model_name if self.backend == "torch" else f"{self.model_name}#{self.backend}"
+            self._cache = get_cache(self.cache_dir, cache_name, dim, self.cache_max_entries)
+        return self._cache
+
+    def _get_batcher(self) -> MicroBatcher:
+        key = (self.model_name, self.device, self.backend, self.max_batch_size, self.max_wait_ms)
+        return get_batcher(key, self._encode_batch, self.max_batch_size, self.max_wait_ms)
+
+    def start_pool(self) -> None:
+        if self._pool is not None or self.workers <= 1:
+            return
+        if self.backend != "torch":
+            raise ValueError(f"workers > 1 needs the torch backend, not '{self.backend}'")
+        # Each worker is a separate torch process; split the cores between them
+        # instead of letting every worker start one thread per core.
+        threads = str(max(1, (os.cpu_count() or 1) // self.workers))
+        previous = os.environ.get("OMP_NUM_THREADS")
+        os.environ["OMP_NUM_THREADS"] = threads
+        try:
+            logger.info(f"Starting {self.workers} embedding workers ({threads} threads each)...")
+            self._pool = self.model.start_multi_process_pool([self.device or "cpu"] * self.workers)
+        finally:
+            if previous is None:
+                os.environ.pop("OMP_NUM_THREADS", None)
+            else:
+                os.environ["OMP_NUM_THREADS"] = previous
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self.model.stop_multi_process_pool(self._pool)
+            self._pool = None
+
+    def __enter__(self) -> "LocalEmbeddingModel":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        if self.workers > 1 and len(texts) >= 2 * self.workers:
+            self.start_pool()
+            return self.model.encode(texts, pool=self._pool, chunk_size=self.mp_chunk_size, convert_to_numpy=True)
+        if self.max_batch_tokens and len(texts) > 1:
+            return self._encode_bucketed(texts)
+        return self.model.encode(texts, convert_to_numpy=True)
+
+    def token_lengths(self, texts: List[str]) -> np.ndarray:
+        """Token count of each text after truncation to the model's max_seq_length."""
+        encoded = self.model.tokenizer(
+            texts,
+            add_special_tokens=True,
+            truncation=True,
+            max_length=self.model.max_seq_length,
+        )["input_ids"]
+        return np.fromiter((len(ids) for ids in encoded), dtype=np.int64, count=len(texts))
+
+    def _encode_bucketed(self, texts: List[str]) -> np.ndarray:
+        lengths = self.token_lengths(texts)
+        order = np.argsort(-lengths, kind="stable")
+        result: Optional[np.ndarray] = None
+
+        start = 0
+        while start < len(order):
+            # Longest first, so the first text of a batch sets its padded length.
+            padded_length = max(1, int(lengths[order[start]]))
+            size = max(1, self.max_batch_tokens // padded_length)
+            batch = order[start:start + size]
+            vectors = self.model.encode([texts[i] for i in batch], convert_to_numpy=True, batch_size=len(batch))
+            if result is None:
+                result = np.empty((len(texts), vectors.shape[1]), dtype=np.float32)
+            result[batch] = vectors
+            start += size
+        return result
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        # One forward pass for the whole micro-batch.
+        return self.model.encode(texts, convert_to_numpy=True, batch_size=len(texts))
+
+    def _encode_batched(self, texts: List[str]) -> np.ndarray:
+        batcher = self._get_batcher()
+        futures = [batcher.submit(text) for text in texts]
+        return np.stack([future.result() for future in futures])
+
+    def _embed(self, texts: List[str], encode: Optional[Callable[[List[str]], np.ndarray]] = None) -> np.ndarray:
+        encode = encode or self._encode
+        cache = self._get_cache()
+        if cache is None:
+            return encode(texts)
+
+        keys = [text_key(text) for text in texts]
+        cached = cache.get_many(keys)
+        result = np.empty((len(texts), cache.dim), dtype=np.float32)
+
+        # Encode each distinct missing text once, even if it repeats in the batch.
+        pending: Dict[bytes, List[int]] = {}
+        for i, vector in enumerate(cached):
+            if vector is None:
+                pending.setdefault(keys[i], []).append(i)
+            else:
+                result[i] = vector
+
+        if pending:
+            positions = list(pending.values())
+            fresh = encode([texts[idx[0]] for idx in positions])
+            cache.put_many(list(pending.keys()), fresh)
+            for idx, vector in zip(positions, fresh):
+                result[idx] = vector
+        return result
 
     def embed_documents(self, texts: List[str]) -> List[List[float]]:
-        logger.info(f"Embedding {len(texts)} documents locally with model '{self.model_name}'...")
-        embeddings = self.model.encode(texts, convert_to_numpy=True).tolist()
-        logger.info(f"Successfully embedded {len(embeddings)} documents.")
+        if not texts:
+            return []
+        start = time.perf_counter()
+        embeddings = self._embed(texts).tolist()
+        log_call("embed_documents", self.model_name, len(texts), start)
         return embeddings
 
+    def embed_documents_array(self, texts: List[str], precision: str = "float32") -> np.ndarray:
+        """Like embed_documents, but returns a contiguous (n, dim) array in `precision`."""
+        if precision not in PRECISIONS:
+            raise ValueError(f"Unknown precision '{precision}', expected one of {PRECISIONS}")
+        if not texts:
+            return np.empty((0, self.model.get_sentence_embedding_dimension()), dtype=precision)
+        start = time.perf_counter()
+        embeddings = np.ascontiguousarray(self._embed(texts), dtype=np.float32)
+        log_call("embed_documents_array", self.model_name, len(texts), start)
+        if precision == "int8":
+            if self.int8_ranges is None:
+                # Only a batch big enough to be representative may calibrate; see calibrate_int8.
+                self.int8_ranges = int8_ranges(embeddings)
+            clipped = clipped_fraction(embeddings, self.int8_ranges)
+            if clipped:
+                logger.warning(f"{clipped:.2%} of int8 values fell outside the calibration ranges and were clipped.")
+        return np.ascontiguousarray(to_precision(embeddings, precision, self.int8_ranges))
+
+    def calibrate_int8(self, texts: List[str], min_samples: int = MIN_CALIBRATION_SAMPLES) -> np.ndarray:
+        """Set `int8_ranges` from a representative sample of at least `min_samples` texts; returns them."""
+        self.int8_ranges = int8_ranges(self.embed_documents_array(texts), min_samples)
+        return self.int8_ranges
+
+    def embed_query_array(self, text: str, precision: str = "float32") -> np.ndarray:
+        """Like embed_query, but returns a contiguous (dim,) array in `precision`."""
+        start = time.perf_counter()
+        encode = self._encode_batched if self.micro_batching else self._encode
+        embedding = np.ascontiguousarray(self._embed([text], encode), dtype=np.float32)
+        log_call("embed_query_array", self.model_name, 1, start)
+        if precision == "int8" and self.int8_ranges is None:
+            raise ValueError("int8 queries need int8_ranges; call calibrate_int8() or embed documents with precision='int8' first.")
+        return np.ascontiguousarray(to_precision(embedding, precision, self.int8_ranges)[0])
+
     def embed_query(self, text: str) -> List[float]:
-        logger.info(f"Embedding query locally with model '{self.model_name}'...")
-        embedding = self.model.encode(text, convert_to_numpy=True).tolist()
-        logger.info("Successfully embedded query.")
+        start = time.perf_counter()
+        encode = self._encode_batched if self.micro_batching else self._encode
+        embedding = self._embed([text], encode)[0].tolist()
+        log_call("embed_query", self.model_name, 1, start)
         return embedding
 
+    def _run_in_executor(self, func: Callable[..., Any], *args: Any) -> "asyncio.Future[Any]":
+        executor = get_executor(self.async_threads or default_async_threads(self.backend))
+        return asyncio.get_running_loop().run_in_executor(executor, func, *args)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await self._run_in_executor(self.embed_documents, texts)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        if not self.micro_batching:
+            return await self._run_in_executor(self.embed_query, text)
+
+        start = time.perf_counter()
+        cache = self._get_cache()
+        key = text_key(text)
+        if cache is not None:
+            hit = cache.get_many([key])[0]
+            if hit is not None:
+                log_call("aembed_query", self.model_name, 1, start)
+                return hit.tolist()
+
+        # Await the batcher's future directly instead of parking a thread on it.
+        vector = await asyncio.wrap_future(self._get_batcher().submit(text))
+        if cache is not None:
+            cache.put_many([key], vector[None, :])
+        log_call("aembed_query", self.model_name, 1, start)
+        return vector.tolist()
+
+    def cache_stats(self) -> Dict[str, Any]:
+        cache = self._get_cache()
+        return cache.stats() if cache is not None else {}
+
+    def batcher_stats(self) -> Dict[str, Any]:
+        return self._get_batcher().stats() if self.micro_batching else {}
+
+    # Vectorstores that pickle their embedding function (e.g. day08 MemoryManager)
+    # should store only the config, not the model weights.
+    def __getstate__(self) -> Dict[str, Any]:
+        return self.config
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__init__(**state)
+
     @property
     def config(self) -> Dict[str, Any]:
-        return {"model_name": self.model_name}
\ No newline at end of file
+        return {
+            "model_name": self.model_name,
+            "device": self.device,
+            "cache_dir": self.cache_dir,
+            "cache_max_entries": self.cache_max_entries,
+            "micro_batching": self.micro_batching,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_ms,
+            "workers": self.workers,
+            "mp_chunk_size": self.mp_chunk_size,
+            "max_batch_tokens": self.max_batch_tokens,
+            "backend": self.backend,
+            "async_threads": self.async_threads,
+        }
+
+    @staticmethod
+    def registry_stats() -> Dict[str, Any]:
+        return registry_stats()
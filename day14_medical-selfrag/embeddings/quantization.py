@@ -0,0 +1,64 @@
+from typing import Optional, Tuple
+import numpy as np
+
+PRECISIONS = ("float32", "float16", "int8")
+# Fewer vectors than this rarely span the range later vectors fall in.
+MIN_CALIBRATION_SAMPLES = 256
+
+
+def int8_ranges(vectors: np.ndarray, min_samples: int = MIN_CALIBRATION_SAMPLES) -> np.ndarray:
+    """
+    Per-dimension [min, max] calibration ranges, shape (2, dim), from a
+    representative sample of at least `min_samples` vectors. Every dimension
+    must vary across the sample.
+    """
+    if len(vectors) < min_samples:
+        raise ValueError(
+            f"int8 calibration needs at least {min_samples} vectors, got {len(vectors)}; "
+            "calibrate on a representative sample of the corpus."
+        )
+    ranges = np.stack([vectors.min(axis=0), vectors.max(axis=0)]).astype(np.float32)
+    _scale(ranges)
+    return ranges
+
+
+def _scale(ranges: np.ndarray) -> np.ndarray:
+    low, high = ranges
+    flat = np.flatnonzero(high <= low)
+    if len(flat):
+        raise ValueError(f"int8 ranges are degenerate (max <= min) in {len(flat)} dimensions, e.g. {flat[:5].tolist()}")
+    return (high - low) / 255.0
+
+
+def clipped_fraction(vectors: np.ndarray, ranges: np.ndarray) -> float:
+    """Share of values outside `ranges`, which int8 codes saturate at -128 / 127."""
+    low, high = ranges
+    return float(((vectors < low) | (vectors > high)).mean()) if vectors.size else 0.0
+
+
+def quantize_int8(vectors: np.ndarray, ranges: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Scalar-quantize float vectors to int8, one step = (max - min) / 255 per
+    dimension; values outside the ranges saturate. Returns the codes and the
+    ranges used (calibrated on `vectors` if not given), which must be reused
+    for every vector that is compared against them.
+    """
+    if ranges is None:
+        ranges = int8_ranges(vectors)
+    scale = _scale(ranges)
+    codes = np.clip(np.rint((vectors - ranges[0]) / scale) - 128, -128, 127).astype(np.int8)
+    return codes, ranges
+
+
+def dequantize_int8(codes: np.ndarray, ranges: np.ndarray) -> np.ndarray:
+    return ((codes.astype(np.float32) + 128) * _scale(ranges) + ranges[0]).astype(np.float32)
+
+
+def to_precision(vectors: np.ndarray, precision: str, ranges: Optional[np.ndarray] = None) -> np.ndarray:
+    if precision == "float32":
+        return vectors
+    if precision == "float16":
+        return vectors.astype(np.float16)
+    if precision == "int8":
+        return quantize_int8(vectors, ranges)[0]
+    raise ValueError(f"Unknown precision '{precision}', expected one of {PRECISIONS}")
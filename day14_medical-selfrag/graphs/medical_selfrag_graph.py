@@ -1,4 +1,3 @@
-from langgraph.graph import StateGraph, END
 from state.selfrag_state import SelfRAGState
 from nodes.user_input import user_input_node
 from nodes.retriever import retriever_node
@@ -15,6 +14,7 @@ def create_medical_selfrag_graph():
     """
     Creates the complete Medical Self-RAG graph with all nodes and routing logic
     """
+    from langgraph.graph import StateGraph, END
     
     # Initialize the graph
     workflow = StateGraph(SelfRAGState)
@@ -66,5 +66,18 @@ def create_medical_selfrag_graph():
     
     return workflow.compile()
 
-# Create the graph instance
-graph = create_medical_selfrag_graph()
\ No newline at end of file
+_graph = None
+
+def get_graph():
+    """Compile the graph on first use and reuse it afterwards."""
+    global _graph
+    if _graph is None:
+        _graph = create_medical_selfrag_graph()
+    return _graph
+
+def __getattr__(name):
+    # Keeps `from graphs.medical_selfrag_graph import graph` working while
+    # deferring compilation until somebody actually asks for the graph.
+    if name == "graph":
+        return get_graph()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
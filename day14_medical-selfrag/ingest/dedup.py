@@ -0,0 +1,174 @@
+"""
+MinHash/LSH near-duplicate detection for chunks, in plain NumPy.
+
+Each chunk becomes a set of word 3-gram shingles, hashed with crc32 and reduced
+to a `num_perm`-long MinHash signature. Signatures are split into bands, and
+chunks that share a band bucket are candidates. A candidate counts as a
+duplicate when the fraction of agreeing signature entries (an estimate of
+Jaccard similarity) reaches the threshold.
+
+The representatives' signatures are saved with each index version
+(minhash.npy, keys and parameters in minhash.json), so an incremental update
+only signs the chunks it adds.
+"""
+import json
+import os
+import re
+import zlib
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+import numpy as np
+
+MINHASH_FILE = "minhash.npy"
+MINHASH_KEYS_FILE = "minhash.json"
+
+_PRIME = np.uint64(4294967311)  # smallest prime above 2**32
+_WORD = re.compile(r"\w+")
+
+
+def shingle_hashes(text: str, size: int = 3) -> np.ndarray:
+    words = _WORD.findall(text.lower())
+    if len(words) < size:
+        words = words + [""] * (size - len(words))
+    grams = {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+    return np.fromiter((zlib.crc32(g.encode("utf-8")) for g in grams), dtype=np.uint64, count=len(grams))
+
+
+def lsh_params(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """(bands, rows) dividing num_perm whose S-curve midpoint (1/b)^(1/r) is closest to threshold."""
+    options = [(num_perm // rows, rows) for rows in range(1, num_perm + 1) if num_perm % rows == 0]
+    return min(options, key=lambda br: abs((1 / br[0]) ** (1 / br[1]) - threshold))
+
+
+class NearDuplicateIndex:
+    """
+    Incremental LSH index: add() either registers a chunk as a representative
+    or returns the key of an earlier representative it nearly duplicates.
+    Memory is one signature (num_perm uint32s) per representative.
+    """
+
+    def __init__(self, threshold: float = 0.9, num_perm: int = 128, seed: int = 1) -> None:
+        rng = np.random.default_rng(seed)
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.seed = seed
+        self.bands, self.rows = lsh_params(threshold, num_perm)
+        self._a = rng.integers(1, 2**31, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 2**31, size=num_perm, dtype=np.uint64)
+        self._buckets: List[Dict[bytes, List[int]]] = [{} for _ in range(self.bands)]
+        self._keys: List[str] = []
+        self._signatures: List[np.ndarray] = []
+
+    def signature(self, text: str) -> np.ndarray:
+        hashes = shingle_hashes(text)
+        # a < 2**31 and hashes < 2**32, so a * x + b stays below 2**64.
+        return ((self._a[:, None] * hashes[None, :] + self._b[:, None]) % _PRIME).min(axis=1).astype(np.uint32)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _bands(self, signature: np.ndarray) -> List[bytes]:
+        return [signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def _insert(self, key: str, signature: np.ndarray) -> None:
+        pos = len(self._keys)
+        self._keys.append(key)
+        self._signatures.append(signature)
+        for band, bucket in zip(self._bands(signature), self._buckets):
+            bucket.setdefault(band, []).append(pos)
+
+    def add(self, key: str, text: str) -> Optional[str]:
+        signature = self.signature(text)
+        bands = self._bands(signature)
+
+        candidates = {pos for band, bucket in zip(bands, self._buckets) for pos in bucket.get(band, ())}
+        best, best_similarity = None, self.threshold
+        for pos in sorted(candidates):
+            similarity = float(np.mean(self._signatures[pos] == signature))
+            if similarity >= best_similarity:
+                best, best_similarity = pos, similarity
+        if best is not None:
+            return self._keys[best]
+        self._insert(key, signature)
+        return None
+
+    def delete(self, keys: Iterable[str]) -> None:
+        doomed = set(keys)
+        if not doomed.intersection(self._keys):
+            return
+        kept = [(key, signature) for key, signature in zip(self._keys, self._signatures) if key not in doomed]
+        self._buckets = [{} for _ in range(self.bands)]
+        self._keys, self._signatures = [], []
+        for key, signature in kept:
+            self._insert(key, signature)
+
+    def sync(self, id_texts: Mapping[str, str]) -> Tuple[int, int]:
+        """
+        Make the representatives equal the keys of `id_texts` (the chunks in
+        an index): drop the others and sign the missing ones, reading their
+        text from the mapping (which may be lazy). Returns (removed, added).
+        """
+        live = set(id_texts)
+        stale = [key for key in self._keys if key not in live]
+        self.delete(stale)
+        known = set(self._keys)
+        missing = [key for key in id_texts if key not in known]
+        for key in missing:
+            self._insert(key, self.signature(id_texts[key]))
+        return len(stale), len(missing)
+
+    def save(self, folder: str) -> None:
+        """Write minhash.npy and minhash.json, each beside and renamed, like the other index files."""
+        path = os.path.join(folder, MINHASH_FILE)
+        with open(path + ".tmp", "wb") as f:
+            signatures = np.stack(self._signatures) if self._signatures else np.zeros((0, self.num_perm), np.uint32)
+            np.save(f, signatures)
+        os.replace(path + ".tmp", path)
+        path = os.path.join(folder, MINHASH_KEYS_FILE)
+        info = {"threshold": self.threshold, "num_perm": self.num_perm, "seed": self.seed, "keys": self._keys}
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(info, f, separators=(",", ":"))
+        os.replace(path + ".tmp", path)
+
+    @classmethod
+    def load(cls, folder: str) -> "NearDuplicateIndex":
+        with open(os.path.join(folder, MINHASH_KEYS_FILE), "r", encoding="utf-8") as f:
+            info = json.load(f)
+        index = cls(info["threshold"], info["num_perm"], info["seed"])
+        for key, signature in zip(info["keys"], np.load(os.path.join(folder, MINHASH_FILE))):
+            index._insert(key, signature)
+        return index
+
+
+def load_near_duplicates(folder: str, threshold: float, num_perm: int = 128, seed: int = 1) -> Optional[NearDuplicateIndex]:
+    """The folder's saved signatures if they were made with these parameters, else None."""
+    if not os.path.exists(os.path.join(folder, MINHASH_KEYS_FILE)):
+        return None
+    index = NearDuplicateIndex.load(folder)
+    if (index.threshold, index.num_perm, index.seed) != (threshold, num_perm, seed):
+        return None
+    return index
+
+
+def drop_near_duplicates(chunks: List, ids: List[str], entries: Dict[str, Dict], index: NearDuplicateIndex):
+    """
+    Filter chunks (in order) through `index`. Returns the kept chunks and ids
+    and `entries` with each file's chunk_ids reduced to its kept chunks and a
+    `duplicates` map of {dropped chunk id: kept chunk id}.
+    """
+    kept_chunks, kept_ids, duplicates = [], [], {}
+    for chunk, id_ in zip(chunks, ids):
+        original = index.add(id_, chunk.page_content)
+        if original is None:
+            kept_chunks.append(chunk)
+            kept_ids.append(id_)
+        else:
+            duplicates[id_] = original
+    entries = {
+        name: {
+            **entry,
+            "chunk_ids": [id_ for id_ in entry["chunk_ids"] if id_ not in duplicates],
+            "duplicates": {id_: duplicates[id_] for id_ in entry["chunk_ids"] if id_ in duplicates},
+        }
+        for name, entry in entries.items()
+    }
+    return kept_chunks, kept_ids, entries
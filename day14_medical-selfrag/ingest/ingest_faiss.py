@@ -1,55 +1,622 @@
 import sys, os
+import argparse
+import functools
+import multiprocessing
+import shutil
+import signal
+import threading
+import time
+import uuid
+import numpy as np
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from langchain_community.document_loaders import PyPDFLoader, TextLoader
 from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_community.vectorstores import FAISS
 from embeddings.local_embedding_model import LocalEmbeddingModel
+from ingest.dedup import NearDuplicateIndex, drop_near_duplicates, load_near_duplicates
+from ingest.manifest import assign_chunk_ids, diff_sources, file_sha256, load_manifest, save_manifest
+from ingest.streaming import IndexSink, stream_ingest
+from ingest.text_cache import TextCache
+from ingest.token_splitter import TokenSplitter, token_stats
+from retrieval.bm25 import load_bm25
+from retrieval.hybrid import StoreTexts, build_bm25
+from retrieval.index_handle import INDEX_ROOT, index_folder, new_version, publish_version
+from retrieval.faiss_store import add_vectors, faiss_from_index, faiss_from_vectors, load_vectorstore, save_vectorstore
+from retrieval.index_factory import (
+    INDEX_TYPES, PARAMS_FILE, TUNABLE_INDEX_TYPES, apply_search_params, make_index, sample_rows,
+    save_search_params, tune_search_params,
+)
+from retrieval.matryoshka import MatryoshkaFAISS, truncate
+from retrieval.sharded import ShardedFAISS, build_shard_indexes, partition
+from retrieval.sqlite_docstore import DOCSTORE_FORMATS
 
 DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data", "medical_docs")
 DATA_DIR = os.path.abspath(DATA_DIR)
-INDEX_DIR = "medical-rag/vectorstore/faiss_index"
+INDEX_DIR = INDEX_ROOT
+EMBEDDING_CACHE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".cache", "embeddings"))
+TEXT_CACHE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".cache", "pdf_text"))
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+CHUNK_SIZE = 512
+CHUNK_OVERLAP = 50
+CHUNK_OVERLAP_TOKENS = 32
+LOAD_TIMEOUT_GRACE = 5.0
+# Rough English average, for estimating token-sized chunk counts from file sizes.
+CHARS_PER_TOKEN = 4
+DEDUP_THRESHOLD = 0.9
+TUNING_QUERIES = 200
+TUNING_QUERY_CHARS = 120
+
+def list_sources():
+    """{file name: path} for every PDF/TXT file in DATA_DIR."""
+    return {
+        file: os.path.join(DATA_DIR, file)
+        for file in sorted(os.listdir(DATA_DIR))
+        if file.endswith((".pdf", ".txt"))
+    }
+
+def load_file(path, text_cache_dir=None):
+    """
+    Load one file. With `text_cache_dir`, PDF pages are looked up by content
+    hash first and only parsed (and then cached) on a miss.
+    """
+    if not path.endswith(".pdf"):
+        return TextLoader(path).load()
+    if text_cache_dir is None:
+        return PyPDFLoader(path).load()
+    cache = TextCache(text_cache_dir)
+    sha = file_sha256(path)
+    docs = cache.get(sha, path)
+    if docs is None:
+        docs = PyPDFLoader(path).load()
+        cache.put(sha, docs)
+    return docs
+
+def _raise_timeout(signum, frame):
+    raise TimeoutError("parse timed out")
+
+def load_file_timed(path, timeout=None, text_cache_dir=None):
+    """
+    Load one file without raising: returns (path, docs, seconds, error).
+    SIGALRM enforces `timeout` on the parse itself (main thread, POSIX only).
+    """
+    use_alarm = (
+        timeout and hasattr(signal, "SIGALRM") and threading.current_thread() is threading.main_thread()
+    )
+    if use_alarm:
+        previous = signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    start = time.perf_counter()
+    try:
+        return path, load_file(path, text_cache_dir), time.perf_counter() - start, None
+    except Exception as e:
+        # Loaders wrap the real cause (e.g. TextLoader's "Error loading ..."); report the innermost.
+        while e.__cause__ is not None:
+            e = e.__cause__
+        return path, [], time.perf_counter() - start, f"{type(e).__name__}: {e}"
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+
+def load_documents(paths=None, workers=1, timeout=None, timings=None, text_cache_dir=None):
+    """
+    Load `paths` (default: every source file) in order. With workers > 1 files
+    are parsed in a process pool. A file that fails or exceeds `timeout`
+    seconds is skipped instead of aborting the ingest; if `timings` is a list,
+    one (path, pages, seconds, error) tuple per file is appended to it.
+    `text_cache_dir` enables the extracted-text cache for PDFs.
+    """
+    paths = list(list_sources().values() if paths is None else paths)
+    if workers <= 1:
+        results = [load_file_timed(path, timeout, text_cache_dir) for path in paths]
+    else:
+        results = []
+        with multiprocessing.Pool(min(workers, max(1, len(paths)))) as pool:
+            pending = [(path, pool.apply_async(load_file_timed, (path, timeout, text_cache_dir))) for path in paths]
+            for path, result in pending:
+                try:
+                    # Tasks start in submission order, so by now this one is running;
+                    # the grace covers a parse stuck where SIGALRM cannot interrupt it.
+                    results.append(result.get(None if timeout is None else timeout + LOAD_TIMEOUT_GRACE))
+                except multiprocessing.TimeoutError:
+                    results.append((path, [], float(timeout), "TimeoutError: worker did not respond"))
+            # Leaving the block terminates the pool, killing any stuck worker.
+    if text_cache_dir is not None:
+        TextCache(text_cache_dir).evict()
 
-def load_documents():
     docs = []
-    for file in os.listdir(DATA_DIR):
-        path = os.path.join(DATA_DIR,file)
-        if file.endswith(".pdf"):
-            loader = PyPDFLoader(path)
-        elif file.endswith(".txt"):
-            loader = TextLoader(path)
-        else:
-            continue
-        docs.extend(loader.load())
+    for path, file_docs, seconds, error in results:
+        docs.extend(file_docs)
+        if timings is not None:
+            timings.append((path, len(file_docs), seconds, error))
     return docs
 
-def split_documents(docs):
-    splitter = RecursiveCharacterTextSplitter(chunk_size=512, chunk_overlap=50)
+def print_load_report(timings, elapsed, slowest=5):
+    """Failures, the slowest files and overall throughput of a load_documents run."""
+    total_bytes = sum(os.path.getsize(path) for path, *_ in timings if os.path.exists(path))
+    pages = sum(count for _, count, _, _ in timings)
+    for path, _, seconds, error in timings:
+        if error:
+            print(f"❌ {os.path.basename(path)} skipped after {seconds:.2f}s ({error})")
+    for path, count, seconds, error in sorted(timings, key=lambda t: -t[2])[:slowest]:
+        if not error:
+            print(f"   ⏱️ {seconds:7.2f}s  {count:4d} pages  {os.path.basename(path)}")
+    elapsed = max(elapsed, 1e-9)
+    print(
+        f"⏱️ Parsed {len(timings)} files ({pages} pages, {total_bytes / 1e6:.1f} MB) in {elapsed:.2f}s: "
+        f"{len(timings) / elapsed:.1f} files/s, {total_bytes / 1e6 / elapsed:.2f} MB/s"
+    )
+
+def failed_paths(timings):
+    return {path for path, _, _, error in timings if error}
+
+def split_documents(docs, splitter=None):
+    """Character-based chunks by default; pass a TokenSplitter for chunks sized in model tokens."""
+    splitter = splitter or RecursiveCharacterTextSplitter(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
     return splitter.split_documents(docs)
 
-def build_faiss_index(docs):
-    embeddings = LocalEmbeddingModel()
-    return FAISS.from_documents(docs, embeddings)
+def make_splitter(chunking="chars", overlap_tokens=CHUNK_OVERLAP_TOKENS):
+    if chunking == "chars":
+        return None
+    return TokenSplitter.from_model(make_embeddings().model, overlap_tokens)
+
+def estimate_chunks(records, splitter=None):
+    """
+    Chunk count a full build of `records` will produce, from file sizes, for
+    sizing nlist / M before the chunks exist. PDF bytes overstate their text,
+    so PDF-heavy corpora are overestimated.
+    """
+    size = sum(record["size"] for record in records.values())
+    if splitter is None:
+        step = CHUNK_SIZE - CHUNK_OVERLAP
+    else:
+        step = (splitter.max_tokens - splitter.overlap_tokens) * CHARS_PER_TOKEN
+    return max(1, size // step)
+
+def print_chunk_stats(chunks):
+    model = make_embeddings().model
+    stats = token_stats([chunk.page_content for chunk in chunks], model.tokenizer, model.max_seq_length)
+    print(
+        f"📏 {stats['chunks']} chunks, {stats['mean_tokens']:.0f} tokens on average, "
+        f"{stats['truncation_rate']:.1%} truncated at {model.max_seq_length} tokens."
+    )
+
+def dedupe_chunks(chunks, ids, entries, threshold, index=None):
+    """
+    Drop chunks whose estimated Jaccard similarity to an earlier chunk, or to
+    a representative already in `index` (a NearDuplicateIndex, fresh by
+    default; kept chunks are added to it), is >= threshold (0/None = keep all).
+    """
+    if not threshold:
+        return chunks, ids, entries
+    index = index if index is not None else NearDuplicateIndex(threshold)
+    kept, kept_ids, entries = drop_near_duplicates(chunks, ids, entries, index)
+    print(f"🪞 Dropped {len(chunks) - len(kept)} near-duplicate chunks (threshold {threshold}).")
+    return kept, kept_ids, entries
+
+def make_embeddings(workers=1):
+    return LocalEmbeddingModel(EMBEDDING_MODEL, cache_dir=EMBEDDING_CACHE_DIR, workers=workers)
+
+def build_faiss_index(docs, workers=1, index_type="flat", truncate_dim=None, oversample=4, ids=None,
+                      nlist=None, hnsw_m=None, target_recall=0.95, tune_k=4, shards=1):
+    """
+    Embed `docs` and build the index. For IVF and HNSW indexes, nprobe /
+    efSearch is tuned to reach `target_recall` at k=`tune_k`. With `shards`
+    > 1 the chunks are split across that many indexes, built in parallel
+    processes. Returns (index, tuned search params).
+    """
+    embeddings = make_embeddings(workers)
+    tunable = index_type in TUNABLE_INDEX_TYPES
+    # NumPy path: vectors go straight from the encoder into FAISS, no list round-trip.
+    with embeddings:
+        vectors = embeddings.embed_documents_array([doc.page_content for doc in docs])
+        if tunable:
+            # Queries: the openings of sampled chunks, embedded on their own; each
+            # is tuned with its source chunk left out of the results.
+            sample = sample_rows(np.arange(len(docs)), TUNING_QUERIES)
+            queries = embeddings.embed_documents_array([docs[i].page_content[:TUNING_QUERY_CHARS] for i in sample])
+    stats = embeddings.cache_stats()
+    print(f"🗃️ Embedding cache: {stats['hits']} hits, {stats['misses']} misses (hit rate {stats['hit_rate']:.0%}).")
+
+    # Coarse index on the first `truncate_dim` dims; full vectors kept for re-ranking.
+    indexed = truncate(vectors, truncate_dim) if truncate_dim else vectors
+    if tunable and truncate_dim:
+        queries = truncate(queries, truncate_dim)
+    if shards > 1:
+        return build_sharded_index(docs, vectors, indexed, embeddings, index_type, truncate_dim, oversample, ids,
+                                   nlist, hnsw_m, (queries, sample) if tunable else None, target_recall, tune_k, shards)
+
+    faiss_index = make_index(index_type, indexed.shape[1], indexed, nlist=nlist, hnsw_m=hnsw_m)
+    index = faiss_from_vectors(docs, indexed, embeddings, ids, index=faiss_index)
+    if truncate_dim:
+        index = MatryoshkaFAISS.wrap(index, vectors, truncate_dim, oversample)
+    params = tune_index(faiss_index, indexed, queries, tune_k, target_recall, sample) if tunable else {}
+    return index, params
 
-def save_index(index):
-    index.save_local(INDEX_DIR)
+def build_sharded_index(docs, vectors, indexed, embeddings, index_type, truncate_dim, oversample, ids,
+                        nlist, hnsw_m, queries, target_recall, tune_k, shards):
+    """
+    Split chunks across `shards` indexes by ID hash and build them in
+    parallel processes. Each shard is tuned on its own; the saved params are
+    the largest any shard needed, since one setting is applied to all.
+    `queries` is (query vectors, row of each query's source chunk) or None.
+    """
+    ids = ids or [str(uuid.uuid4()) for _ in docs]
+    parts = partition(ids, shards)
+    start = time.perf_counter()
+    faiss_indexes = build_shard_indexes([indexed[rows] for rows in parts], index_type, nlist, hnsw_m)
+    print(f"🧱 Built {shards} shards of {min(map(len, parts))}-{max(map(len, parts))} chunks "
+          f"in {time.perf_counter() - start:.1f}s.")
+
+    stores, params = [], {}
+    for i, (rows, faiss_index) in enumerate(zip(parts, faiss_indexes)):
+        store = faiss_from_index([docs[j] for j in rows], faiss_index, embeddings, [ids[j] for j in rows])
+        if truncate_dim:
+            store = MatryoshkaFAISS.wrap(store, vectors[rows], truncate_dim, oversample)
+        stores.append(store)
+        if queries is not None and len(rows):
+            print(f"🧱 Shard {i}:")
+            # Source rows in this shard, renumbered to shard positions; -1 elsewhere.
+            local = {row: j for j, row in enumerate(rows)}
+            exclude = np.array([local.get(row, -1) for row in queries[1]], dtype=np.int64)
+            shard_params = tune_index(faiss_index, indexed[rows], queries[0], tune_k, target_recall, exclude)
+            for name, value in shard_params.items():
+                params[name] = max(value, params.get(name, 0))
+    if params:
+        for faiss_index in faiss_indexes:
+            apply_search_params(faiss_index, params)
+        print(f"🎯 Search params for all shards: {params}.")
+    return ShardedFAISS(stores, embeddings), params
+
+def tune_index(faiss_index, vectors, queries, k, target_recall, exclude=None):
+    """Run the nprobe/efSearch sweep, print it, and return the chosen params."""
+    params, rows = tune_search_params(faiss_index, vectors, queries, k, target_recall, exclude)
+    name = next(iter(params))
+    for row in rows:
+        print(f"   🎛️ {name}={row[name]:<4} recall@{k}={row['recall']:.3f}  {row['ms_per_query']:.3f} ms/query")
+    print(f"🎯 Search params {params} (target recall@{k} {target_recall}).")
+    return params
+
+def update_faiss_index(index, sources, files, load_workers=1, load_timeout=None, text_cache_dir=None,
+                       dedup_threshold=None, splitter=None, near_duplicates=None):
+    """
+    Bring a loaded index in line with `sources` in place: drop the chunks of
+    removed and changed files, then embed and add only new/changed files.
+    Unchanged files whose near-duplicates were collapsed into a dropped chunk
+    are re-ingested too, so their content does not vanish with it. With
+    `dedup_threshold`, new chunks are also checked against the chunks
+    unchanged files keep in the index. Pass the index version's saved
+    signatures as `near_duplicates` (updated in place, to be saved with the
+    new version); without them every indexed chunk is read back and signed.
+    Files that fail to load are left out of the manifest so the next run
+    retries them. Returns (new manifest files section, chunks removed, chunks added).
+    """
+    changed, removed, unchanged = diff_sources(sources, files)
+    stale = [id_ for name in removed + [n for n in changed if n in files] for id_ in files[name]["chunk_ids"]]
+    while True:
+        stale_set = set(stale)
+        dependents = [n for n, e in unchanged.items() if stale_set & set(e.get("duplicates", {}).values())]
+        if not dependents:
+            break
+        for name in dependents:
+            entry = unchanged.pop(name)
+            changed[name] = {key: entry[key] for key in ("sha256", "mtime", "size")}
+            stale.extend(entry["chunk_ids"])
+    if stale:
+        index.delete(stale)
+    if dedup_threshold:
+        near_duplicates = near_duplicates if near_duplicates is not None else NearDuplicateIndex(dedup_threshold)
+        # The index now holds exactly the unchanged files' chunks.
+        near_duplicates.sync(StoreTexts(index))
+
+    entries, added = {}, 0
+    if changed:
+        changed_sources = {name: sources[name] for name in changed}
+        timings = []
+        docs = load_documents(changed_sources.values(), load_workers, load_timeout, timings, text_cache_dir)
+        print_load_report(timings, sum(t[2] for t in timings))
+        failed = failed_paths(timings)
+        changed_sources = {name: path for name, path in changed_sources.items() if path not in failed}
+        chunks, ids, entries = assign_chunk_ids(split_documents(docs, splitter), changed_sources, changed)
+        chunks, ids, entries = dedupe_chunks(chunks, ids, entries, dedup_threshold, near_duplicates)
+        if chunks:
+            embeddings = index.embedding_function
+            with embeddings:
+                vectors = embeddings.embed_documents_array([chunk.page_content for chunk in chunks])
+            add_vectors(index, chunks, vectors, ids)
+            added = len(chunks)
+    return {**unchanged, **entries}, len(stale), added
+
+def index_settings(args):
+    """Anything that changes every chunk or vector; a mismatch forces a full rebuild."""
+    return {
+        "index_type": args.index_type,
+        "truncate_dim": args.truncate_dim,
+        "rerank_oversample": args.rerank_oversample,
+        "chunking": args.chunking,
+        "chunk_size": CHUNK_SIZE,
+        "chunk_overlap": CHUNK_OVERLAP,
+        "chunk_overlap_tokens": args.chunk_overlap_tokens,
+        "model": EMBEDDING_MODEL,
+        "dedup_threshold": args.dedup_threshold,
+        "nlist": args.nlist,
+        "hnsw_m": args.hnsw_m,
+        "shards": args.shards,
+    }
+
+def save_index(index, settings, files, search_params=None, docstore=None, near_duplicates=None):
+    """
+    Save as a new index version, with the BM25 index the retriever nodes fuse
+    with FAISS and the MinHash signatures of its chunks (`near_duplicates`,
+    when deduplicating), and publish it; running retrievers swap to it.
+    search_params=None keeps the tuned parameters of the current version.
+    """
+    current = index_folder(INDEX_DIR)
+    previous = os.path.join(current, PARAMS_FILE)
+    version, folder = new_version(INDEX_DIR)
+    save_vectorstore(index, folder, docstore)
+    if search_params is not None:
+        save_search_params(folder, search_params, index_type=settings["index_type"])
+    elif os.path.exists(previous):
+        shutil.copy(previous, folder)
+    # Chunk IDs only identify the same text under the same settings; otherwise tokenize everything.
+    manifest = load_manifest(current)
+    sparse = load_bm25(current) if manifest and manifest["settings"] == settings else None
+    sparse, dropped, tokenized = build_bm25(index, sparse)
+    sparse.save(folder)
+    if near_duplicates is not None:
+        near_duplicates.save(folder)
+    print(f"🔤 BM25 index: {len(sparse)} chunks ({tokenized} tokenized, {dropped} dropped).")
+    save_manifest(folder, {"settings": settings, "files": files})
+    publish_version(INDEX_DIR, version)
+    print(f"📌 Published index version {version}.")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Build the medical FAISS index")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of embedding worker processes (1 = encode in this process)"
+    )
+    parser.add_argument(
+        "--index-type",
+        choices=INDEX_TYPES,
+        default="flat",
+        help="FAISS index storage: exact float32, float16, 8-bit scalar or product quantized"
+    )
+    parser.add_argument(
+        "--nlist",
+        type=int,
+        default=None,
+        help="IVF cells for ivf-flat/ivf-pq (default: about 4 * sqrt(chunks); "
+             "--streaming estimates chunks from source file sizes)"
+    )
+    parser.add_argument(
+        "--hnsw-m",
+        type=int,
+        default=None,
+        help="Links per node for hnsw (default: 16, or 32 above 100k chunks; "
+             "--streaming estimates chunks from source file sizes)"
+    )
+    parser.add_argument(
+        "--target-recall",
+        type=float,
+        default=0.95,
+        help="Recall@k the nprobe/efSearch sweep must reach on held-out queries"
+    )
+    parser.add_argument(
+        "--tune-k",
+        type=int,
+        default=4,
+        help="k used by the tuning sweep (the retriever node fetches 4)"
+    )
+    parser.add_argument(
+        "--shards",
+        type=int,
+        default=1,
+        help="Split the index into N shards built in parallel processes and searched concurrently"
+    )
+    parser.add_argument(
+        "--truncate-dim",
+        type=int,
+        default=None,
+        help="Index only the first N embedding dims and re-rank candidates on full vectors"
+    )
+    parser.add_argument(
+        "--rerank-oversample",
+        type=int,
+        default=4,
+        help="With --truncate-dim, re-rank k * N coarse candidates"
+    )
+    parser.add_argument(
+        "--load-workers",
+        type=int,
+        default=1,
+        help="Number of processes parsing source files (1 = parse in this process)"
+    )
+    parser.add_argument(
+        "--load-timeout",
+        type=float,
+        default=None,
+        help="Skip any file whose parse takes longer than this many seconds"
+    )
+    parser.add_argument(
+        "--chunking",
+        choices=("chars", "tokens"),
+        default="chars",
+        help="Chunk by 512 characters, or pack chunks up to the embedding model's max sequence in tokens"
+    )
+    parser.add_argument(
+        "--chunk-overlap-tokens",
+        type=int,
+        default=CHUNK_OVERLAP_TOKENS,
+        help="Token overlap between consecutive chunks with --chunking tokens"
+    )
+    parser.add_argument(
+        "--dedup-threshold",
+        type=float,
+        default=DEDUP_THRESHOLD,
+        help="Drop chunks at least this similar (MinHash Jaccard) to an earlier chunk; 0 keeps all"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Re-parse every PDF instead of reusing text extracted by earlier runs"
+    )
+    parser.add_argument(
+        "--streaming",
+        action="store_true",
+        help="Build with the bounded-memory load/split/embed/add pipeline (files are parsed one at a time)"
+    )
+    parser.add_argument(
+        "--docstore",
+        choices=DOCSTORE_FORMATS,
+        default="sqlite",
+        help="Store chunk text in docstore.sqlite (read per hit) or the pickled index.pkl FAISS.save_local writes"
+    )
+    parser.add_argument(
+        "--full-rebuild",
+        action="store_true",
+        help="Ignore the manifest and rebuild the index from every source file"
+    )
+    args = parser.parse_args()
+    if args.shards > 1 and args.streaming:
+        parser.error("--shards is not supported with --streaming")
+    return args
+
+def text_cache_dir(args):
+    return None if args.no_cache else TEXT_CACHE_DIR
+
+def streaming_build(args, sources):
+    """
+    Full build through the streaming pipeline; returns (index, manifest files
+    section, search params, NearDuplicateIndex or None).
+    """
+    print("🌊 Streaming load → split → embed → index...")
+    start = time.perf_counter()
+    records, _, _ = diff_sources(sources, {})
+    embeddings = make_embeddings(args.workers)
+    tunable = args.index_type in TUNABLE_INDEX_TYPES
+    splitter = make_splitter(args.chunking, args.chunk_overlap_tokens)
+    sink = IndexSink(
+        embeddings, args.index_type, args.truncate_dim, args.rerank_oversample, nlist=args.nlist,
+        hnsw_m=args.hnsw_m, tuning_queries=TUNING_QUERIES if tunable else 0, query_chars=TUNING_QUERY_CHARS,
+        n_total=estimate_chunks(records, splitter),
+    )
+    cache_dir = text_cache_dir(args)
+    load = functools.partial(load_file_timed, text_cache_dir=cache_dir)
+    split = functools.partial(split_documents, splitter=splitter)
+    dedup = near_duplicates = None
+    if args.dedup_threshold:
+        near_duplicates = NearDuplicateIndex(args.dedup_threshold)
+        dedup = functools.partial(drop_near_duplicates, index=near_duplicates)
+    with embeddings:
+        files, timings = stream_ingest(
+            sources, records, embeddings, sink, load, split, timeout=args.load_timeout, dedup=dedup,
+            timeout_grace=LOAD_TIMEOUT_GRACE,
+        )
+        index = sink.finish()
+        if tunable:
+            queries = embeddings.embed_documents_array(sink.query_texts)
+    if cache_dir is not None:
+        TextCache(cache_dir).evict()
+    elapsed = time.perf_counter() - start
+    print_load_report(timings, elapsed)
+    dropped = sum(len(entry.get("duplicates", {})) for entry in files.values())
+    print(f"🪞 Dropped {dropped} near-duplicate chunks (threshold {args.dedup_threshold}).")
+    print(f"✅ Indexed {index.index.ntotal} chunks in {elapsed:.1f}s ({sink.add_seconds:.1f}s adding to the index).")
+
+    params = {}
+    if tunable:
+        if args.truncate_dim:
+            queries = truncate(queries, args.truncate_dim)
+        # The full vectors are gone by now; the index provides its own reference results.
+        params = tune_index(index.index, None, queries, args.tune_k, args.target_recall, np.asarray(sink.query_rows))
+    return index, files, params, near_duplicates
+
+def incremental_update(args, sources, settings, manifest):
+    """Update the current index version; returns None when a full rebuild is needed instead."""
+    print("🔁 Updating existing index from manifest...")
+    start = time.perf_counter()
+    # Updated in memory and saved as a new version; a memory-mapped index is read-only.
+    folder = index_folder(INDEX_DIR)
+    index = load_vectorstore(folder, make_embeddings(args.workers), mmap=False)
+    near_duplicates = None
+    if args.dedup_threshold:
+        # Versions saved before signatures were kept are signed once here, then saved.
+        near_duplicates = load_near_duplicates(folder, args.dedup_threshold) or NearDuplicateIndex(args.dedup_threshold)
+    try:
+        files, removed, added = update_faiss_index(
+            index, sources, manifest["files"], args.load_workers, args.load_timeout, text_cache_dir(args),
+            args.dedup_threshold, make_splitter(args.chunking, args.chunk_overlap_tokens), near_duplicates,
+        )
+    except RuntimeError as e:
+        # Some FAISS index types cannot remove vectors.
+        print(f"⚠️ In-place update not possible ({e}); rebuilding.")
+        return None
+    if removed or added or files != manifest["files"]:
+        print("💾 Saving index...")
+        save_index(index, settings, files, docstore=args.docstore, near_duplicates=near_duplicates)
+    print(f"✅ Removed {removed} and added {added} chunks in {time.perf_counter() - start:.1f}s.")
+    return index
 
 if __name__ == "__main__":
-    print("📄 Loading medical documents...")
-    docs = load_documents()
-    print(f"✅ Loaded {len(docs)} documents.")
+    args = parse_args()
+    sources = list_sources()
+    settings = index_settings(args)
+    manifest = None if args.full_rebuild else load_manifest(index_folder(INDEX_DIR))
+
+    index = None
+    if manifest and manifest["settings"] == settings:
+        index = incremental_update(args, sources, settings, manifest)
+    elif manifest:
+        print("⚠️ Index settings changed since the last build; rebuilding.")
+
+    if index is None and args.streaming:
+        index, files, search_params, near_duplicates = streaming_build(args, sources)
+        print("💾 Saving index...")
+        save_index(index, settings, files, search_params, args.docstore, near_duplicates)
+        print("✅ FAISS index built and saved successfully!")
+
+    if index is None:
+        print("📄 Loading medical documents...")
+        timings = []
+        start = time.perf_counter()
+        docs = load_documents(sources.values(), args.load_workers, args.load_timeout, timings, text_cache_dir(args))
+        print_load_report(timings, time.perf_counter() - start)
+        print(f"✅ Loaded {len(docs)} documents.")
 
-    print("🧩 Splitting into chunks...")
-    chunks = split_documents(docs)
-    print(f"✅ Created {len(chunks)} chunks.")
+        print("🧩 Splitting into chunks...")
+        failed = failed_paths(timings)
+        sources = {name: path for name, path in sources.items() if path not in failed}
+        records, _, _ = diff_sources(sources, {})
+        splitter = make_splitter(args.chunking, args.chunk_overlap_tokens)
+        chunks, ids, files = assign_chunk_ids(split_documents(docs, splitter), sources, records)
+        print(f"✅ Created {len(chunks)} chunks.")
+        print_chunk_stats(chunks)
+        near_duplicates = NearDuplicateIndex(args.dedup_threshold) if args.dedup_threshold else None
+        chunks, ids, files = dedupe_chunks(chunks, ids, files, args.dedup_threshold, near_duplicates)
 
-    print("📦 Creating FAISS index...")
-    index = build_faiss_index(chunks)
+        print("📦 Creating FAISS index...")
+        index, search_params = build_faiss_index(
+            chunks,
+            workers=args.workers,
+            index_type=args.index_type,
+            truncate_dim=args.truncate_dim,
+            oversample=args.rerank_oversample,
+            ids=ids,
+            nlist=args.nlist,
+            hnsw_m=args.hnsw_m,
+            target_recall=args.target_recall,
+            tune_k=args.tune_k,
+            shards=args.shards,
+        )
 
-    print("💾 Saving index...")
-    save_index(index)
+        print("💾 Saving index...")
+        save_index(index, settings, files, search_params, args.docstore, near_duplicates)
 
-    print("✅ FAISS index built and saved successfully!")
+        print("✅ FAISS index built and saved successfully!")
 
     # Optional: test retrieval
     query = "What are symptoms of hypertension?"
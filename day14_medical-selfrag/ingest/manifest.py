@@ -0,0 +1,82 @@
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+
+MANIFEST_FILE = "manifest.json"
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def chunk_ids(source: str, sha: str, count: int) -> List[str]:
+    """Stable docstore IDs for the chunks of one version of one source file."""
+    prefix = hashlib.sha1(source.encode("utf-8")).hexdigest()[:8]
+    return [f"{prefix}-{sha[:16]}-{i}" for i in range(count)]
+
+
+def load_manifest(index_dir: str) -> Optional[Dict]:
+    path = os.path.join(index_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(index_dir: str, manifest: Dict) -> None:
+    """Written after the index itself, via rename, so a crash never leaves a manifest ahead of its index."""
+    path = os.path.join(index_dir, MANIFEST_FILE)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(path + ".tmp", path)
+
+
+def diff_sources(paths: Dict[str, str], files: Dict[str, Dict]) -> Tuple[Dict[str, Dict], List[str], Dict[str, Dict]]:
+    """
+    Compare source files on disk ({name: path}) against the manifest's `files`
+    section. Returns (changed, removed, unchanged): `changed` maps new or
+    modified names to their fresh {sha256, mtime, size} record, `removed` lists
+    names no longer on disk, and `unchanged` carries the manifest entries over
+    (with the mtime refreshed when a file was touched but not modified).
+
+    Files whose size and mtime match the manifest are not re-hashed.
+    """
+    changed, unchanged = {}, {}
+    for name, path in sorted(paths.items()):
+        stat = os.stat(path)
+        entry = files.get(name)
+        if entry and entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime:
+            unchanged[name] = entry
+            continue
+        sha = file_sha256(path)
+        record = {"sha256": sha, "mtime": stat.st_mtime, "size": stat.st_size}
+        if entry and entry["sha256"] == sha:
+            unchanged[name] = {**entry, **record}
+        else:
+            changed[name] = record
+    removed = sorted(set(files) - set(paths))
+    return changed, removed, unchanged
+
+
+def assign_chunk_ids(chunks: List, sources: Dict[str, str], records: Dict[str, Dict]) -> Tuple[List, List[str], Dict[str, Dict]]:
+    """
+    Order `chunks` by source file and give them stable IDs. `sources` maps file
+    names to paths and `records` holds each file's manifest record; returns
+    (chunks, ids, manifest entries with chunk_ids filled in).
+    """
+    name_of = {path: name for name, path in sources.items()}
+    grouped = {name: [] for name in sources}
+    for chunk in chunks:
+        grouped[name_of[chunk.metadata["source"]]].append(chunk)
+    ordered, ids, entries = [], [], {}
+    for name, file_chunks in grouped.items():
+        file_ids = chunk_ids(name, records[name]["sha256"], len(file_chunks))
+        ordered.extend(file_chunks)
+        ids.extend(file_ids)
+        entries[name] = {**records[name], "chunk_ids": file_ids}
+    return ordered, ids, entries
@@ -0,0 +1,283 @@
+"""
+Streaming ingest: load -> split -> embed -> index-add as a chain of generators,
+each running in its own thread and joined to the next by a bounded queue.
+
+At most `queue_size` files (or chunk batches) wait between any two stages, so
+memory is bounded by a few files' worth of text plus whatever the sink keeps,
+and parsing file N+1 overlaps with embedding file N. IndexSink keeps only the
+FAISS index in memory; with dedup, each kept chunk's MinHash signature stays
+in memory too.
+"""
+import atexit
+import multiprocessing
+import os
+import queue
+import random
+import shutil
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+import numpy as np
+from langchain_core.documents import Document
+from ingest.manifest import assign_chunk_ids
+
+_DONE = object()
+
+
+class _Failed:
+    def __init__(self, error: BaseException) -> None:
+        self.error = error
+
+
+def threaded(items: Iterable, queue_size: int = 2) -> Iterator:
+    """
+    Run `items` in a background thread, yielding its values through a queue of
+    at most `queue_size` entries. Exceptions are re-raised in the consumer;
+    closing the consumer early stops the producer at its next put.
+    """
+    buffer: "queue.Queue" = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce() -> None:
+        try:
+            for item in items:
+                if not put(item):
+                    return
+        except BaseException as e:
+            put(_Failed(e))
+            return
+        put(_DONE)
+
+    thread = threading.Thread(target=produce, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = buffer.get()
+            if item is _DONE:
+                return
+            if isinstance(item, _Failed):
+                raise item.error
+            yield item
+    finally:
+        stop.set()
+
+
+def stream_ingest(
+    sources: Dict[str, str],
+    records: Dict[str, Dict],
+    embeddings,
+    sink: Callable[[List[Document], np.ndarray, List[str]], None],
+    load: Callable,
+    split: Callable[[List[Document]], List[Document]],
+    queue_size: int = 2,
+    batch_size: int = 256,
+    timeout: Optional[float] = None,
+    dedup: Optional[Callable] = None,
+    timeout_grace: float = 5.0,
+) -> Tuple[Dict[str, Dict], List[Tuple[str, int, float, Optional[str]]]]:
+    """
+    Feed every file in `sources` ({name: path}) through the pipeline, calling
+    `sink(chunks, vectors, ids)` on the caller's thread for each batch of at
+    most `batch_size` chunks. `records` holds each file's manifest record
+    (sha256, mtime, size).
+
+    `load(path, timeout)` returns (path, docs, seconds, error) like
+    ingest_faiss.load_file_timed, and `split(docs)` returns chunks. With a
+    `timeout`, `load` runs in a worker process, where load_file_timed can arm
+    SIGALRM on the main thread; a worker still silent `timeout_grace` seconds
+    after that is killed and replaced. `load` must then be picklable. `dedup`,
+    if given, filters each file's (chunks, ids, entries) before embedding, like
+    dedup.drop_near_duplicates bound to one NearDuplicateIndex. Returns
+    (manifest files section for the files that loaded, per-file
+    (path, pages, seconds, error) timings).
+    """
+    files: Dict[str, Dict] = {}
+    timings: List[Tuple[str, int, float, Optional[str]]] = []
+
+    def load_in_worker(pool, path):
+        try:
+            return pool, pool.apply_async(load, (path, timeout)).get(timeout + timeout_grace)
+        except multiprocessing.TimeoutError:
+            pool.terminate()
+            return None, (path, [], float(timeout), "TimeoutError: worker did not respond")
+
+    def load_stage():
+        pool = None
+        try:
+            for name, path in sources.items():
+                if timeout is None:
+                    result = load(path, timeout)
+                else:
+                    # Spawned, not forked: the embedding thread may hold locks a fork would copy.
+                    pool = pool or multiprocessing.get_context("spawn").Pool(1)
+                    pool, result = load_in_worker(pool, path)
+                path, docs, seconds, error = result
+                timings.append((path, len(docs), seconds, error))
+                if error is None:
+                    yield name, path, docs
+        finally:
+            if pool is not None:
+                pool.terminate()
+
+    def split_stage(loaded):
+        for name, path, docs in loaded:
+            chunks, ids, entries = assign_chunk_ids(split(docs), {name: path}, {name: records[name]})
+            del docs
+            if dedup is not None:
+                chunks, ids, entries = dedup(chunks, ids, entries)
+            files.update(entries)
+            for i in range(0, len(chunks), batch_size):
+                yield chunks[i:i + batch_size], ids[i:i + batch_size]
+
+    def embed_stage(batches):
+        for chunks, ids in batches:
+            vectors = embeddings.embed_documents_array([chunk.page_content for chunk in chunks])
+            yield chunks, vectors, ids
+
+    loaded = threaded(load_stage(), queue_size)
+    batches = threaded(split_stage(loaded), queue_size)
+    for chunks, vectors, ids in threaded(embed_stage(batches), queue_size):
+        sink(chunks, vectors, ids)
+    return files, timings
+
+
+class IndexSink:
+    """
+    stream_ingest sink that builds the FAISS store batch by batch. Index types
+    that need training buffer the first `train_size` vectors before the index
+    is created.
+
+    The corpus size is unknown until the end, so IVF nlist and HNSW M are
+    sized from `n_total`, an estimate of the chunk count (without one, from
+    the buffered vectors). IVF buffers at least 39 vectors per expected cell,
+    FAISS's training minimum.
+
+    Only the FAISS index itself grows in memory. Chunk text goes straight to a
+    docstore.sqlite in a scratch directory (under `work_dir`, default the
+    system temp dir), and with `truncate_dim` the full vectors are appended to
+    a file there and memory-mapped by finish(). The scratch directory is
+    removed at exit, after the index has been saved elsewhere.
+
+    It also keeps a uniform sample of `tuning_queries` chunk openings, to be
+    embedded as queries for the nprobe/efSearch sweep, and in `query_rows` the
+    index row of each one's chunk, which the sweep leaves out of the results.
+    """
+
+    def __init__(self, embeddings, index_type: str = "flat", truncate_dim: Optional[int] = None,
+                 oversample: int = 4, train_size: int = 20_000, nlist: Optional[int] = None,
+                 hnsw_m: Optional[int] = None, tuning_queries: int = 0, query_chars: int = 120,
+                 work_dir: Optional[str] = None, n_total: Optional[int] = None) -> None:
+        from retrieval.index_factory import TRAINED_INDEX_TYPES, default_nlist
+        from retrieval.sqlite_docstore import DOCSTORE_FILE, DocstoreWriter
+
+        self.embeddings = embeddings
+        self.index_type = index_type
+        self.truncate_dim = truncate_dim
+        self.oversample = oversample
+        self.train_size = train_size if index_type in TRAINED_INDEX_TYPES else 0
+        self.nlist = nlist
+        self.hnsw_m = hnsw_m
+        self.n_total = n_total
+        if index_type.startswith("ivf") and (nlist or n_total):
+            self.train_size = max(self.train_size, 39 * (nlist or default_nlist(n_total)))
+        self.tuning_queries = tuning_queries
+        self.query_chars = query_chars
+        self.query_texts: List[str] = []
+        self.query_rows: List[int] = []
+        self._seen = 0
+        self._rng = random.Random(0)
+        self.store = None
+        self.index = None
+        self._pending: List[Tuple[List[Document], np.ndarray, List[str]]] = []
+        self.work_dir = tempfile.mkdtemp(prefix="index-sink-", dir=work_dir)
+        atexit.register(shutil.rmtree, self.work_dir, True)
+        self._docs = DocstoreWriter(os.path.join(self.work_dir, DOCSTORE_FILE))
+        self._full_path = os.path.join(self.work_dir, "full_vectors.f32")
+        self._full = open(self._full_path, "wb") if truncate_dim else None
+        self._full_dim = None
+        self.add_seconds = 0.0
+
+    def __call__(self, chunks: List[Document], vectors: np.ndarray, ids: List[str]) -> None:
+        start = time.perf_counter()
+        self._sample_queries(chunks)
+        if self.index is None:
+            self._pending.append((chunks, vectors, ids))
+            if sum(len(v) for _, v, _ in self._pending) >= self.train_size:
+                self._create()
+        else:
+            self._add(chunks, vectors, ids)
+        self.add_seconds += time.perf_counter() - start
+
+    def _sample_queries(self, chunks: List[Document]) -> None:
+        # Reservoir sampling: every chunk seen so far is equally likely to be kept.
+        for chunk in chunks:
+            # Chunks reach the index in the order they are seen.
+            row = self._seen
+            self._seen += 1
+            text = chunk.page_content[:self.query_chars]
+            if len(self.query_texts) < self.tuning_queries:
+                self.query_texts.append(text)
+                self.query_rows.append(row)
+            else:
+                slot = self._rng.randrange(self._seen)
+                if slot < self.tuning_queries:
+                    self.query_texts[slot] = text
+                    self.query_rows[slot] = row
+
+    def _add(self, chunks: List[Document], vectors: np.ndarray, ids: List[str]) -> None:
+        from retrieval.matryoshka import truncate
+
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if self.truncate_dim:
+            self._full_dim = vectors.shape[1]
+            self._full.write(vectors.tobytes())
+            vectors = np.ascontiguousarray(truncate(vectors, self.truncate_dim))
+        self.index.add(vectors)
+        self._docs.add(chunks, ids)
+
+    def _create(self, complete: bool = False) -> None:
+        from retrieval.index_factory import make_index
+        from retrieval.matryoshka import truncate
+
+        pending, self._pending = self._pending, []
+        train = np.concatenate([vectors for _, vectors, _ in pending])
+        if self.truncate_dim:
+            train = truncate(train, self.truncate_dim)
+        # Once every chunk is buffered the count is exact; until then, trust the estimate.
+        n_total = len(train) if complete else max(len(train), self.n_total or 0)
+        self.index = make_index(self.index_type, train.shape[1], train, nlist=self.nlist, hnsw_m=self.hnsw_m,
+                                n_total=n_total)
+        for batch in pending:
+            self._add(*batch)
+
+    def finish(self):
+        from langchain_community.vectorstores import FAISS
+        from retrieval.matryoshka import MatryoshkaFAISS
+        from retrieval.sqlite_docstore import SQLiteIdMap
+
+        if self.index is None:
+            if not self._pending:
+                raise ValueError("No chunks were ingested.")
+            self._create(complete=True)
+        docstore = self._docs.close()
+        self.store = FAISS(
+            embedding_function=self.embeddings,
+            index=self.index,
+            docstore=docstore,
+            index_to_docstore_id=SQLiteIdMap(docstore),
+        )
+        if self.truncate_dim:
+            self._full.close()
+            full = np.memmap(self._full_path, dtype=np.float32, mode="r").reshape(-1, self._full_dim)
+            self.store = MatryoshkaFAISS.wrap(self.store, full, self.truncate_dim, self.oversample)
+        return self.store
@@ -0,0 +1,80 @@
+import json
+import os
+import uuid
+from typing import List, Optional, Tuple
+from langchain_core.documents import Document
+
+# Bump when the extraction itself changes (loader, pypdf options), so old entries miss.
+CACHE_VERSION = 1
+DEFAULT_MAX_BYTES = 1 << 30
+
+
+class TextCache:
+    """
+    Extracted page text and metadata of parsed files, one JSON file per file
+    content hash. Entries are least-recently-used ordered by mtime, which get()
+    refreshes, and evict() trims the directory to `max_bytes`.
+
+    Writes go through a temporary file and a rename, so pool workers can share
+    one cache directory; eviction is left to the parent process.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, sha: str) -> str:
+        return os.path.join(self.cache_dir, f"{sha}.json")
+
+    def get(self, sha: str, source: str) -> Optional[List[Document]]:
+        """Cached pages for this content, re-attributed to `source` (the same bytes may live under a new name)."""
+        path = self._path(sha)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get("version") != CACHE_VERSION:
+            return None
+        os.utime(path)
+        return [
+            Document(page_content=page["page_content"], metadata={**page["metadata"], "source": source})
+            for page in entry["pages"]
+        ]
+
+    def put(self, sha: str, docs: List[Document]) -> None:
+        entry = {
+            "version": CACHE_VERSION,
+            "pages": [{"page_content": d.page_content, "metadata": d.metadata} for d in docs],
+        }
+        path = self._path(sha)
+        tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(entry, f, default=str)
+        os.replace(tmp, path)
+
+    def _entries(self) -> List[Tuple[float, int, str]]:
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".json"):
+                stat = os.stat(os.path.join(self.cache_dir, name))
+                entries.append((stat.st_mtime, stat.st_size, name))
+        return entries
+
+    def evict(self) -> int:
+        """Remove least recently used entries until the cache fits `max_bytes`; returns how many were removed."""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, name in entries:
+            if total <= self.max_bytes:
+                break
+            os.remove(os.path.join(self.cache_dir, name))
+            total -= size
+            removed += 1
+        return removed
+
+    def stats(self) -> dict:
+        entries = self._entries()
+        return {"entries": len(entries), "bytes": sum(size for _, size, _ in entries), "max_bytes": self.max_bytes}
@@ -0,0 +1,100 @@
+from typing import Dict, List, Sequence, Tuple
+from langchain_core.documents import Document
+
+
+class TokenSplitter:
+    """
+    Splits documents into chunks of at most `max_tokens` tokens as counted by
+    the embedding model's own tokenizer, with `overlap_tokens` of overlap, so
+    no chunk is silently truncated by the encoder and none is needlessly small.
+
+    Documents are tokenized in batches with offset mappings (needs a fast
+    tokenizer) and chunks are cut from the original text by character offset.
+    A window ends at the last sentence end or line break in its final quarter
+    when there is one, and never inside a word.
+    """
+
+    def __init__(self, tokenizer, max_tokens: int, overlap_tokens: int = 32, batch_size: int = 64) -> None:
+        if not getattr(tokenizer, "is_fast", False):
+            raise ValueError("TokenSplitter needs a fast tokenizer (offset mappings).")
+        if not 0 <= overlap_tokens < max_tokens // 2:
+            raise ValueError(f"overlap_tokens must be in [0, {max_tokens // 2}), got {overlap_tokens}")
+        self.tokenizer = tokenizer
+        self.max_tokens = max_tokens
+        self.overlap_tokens = overlap_tokens
+        self.batch_size = batch_size
+
+    @classmethod
+    def from_model(cls, model, overlap_tokens: int = 32, batch_size: int = 64) -> "TokenSplitter":
+        """Budget = the model's max_seq_length minus its [CLS]/[SEP]-style special tokens."""
+        tokenizer = model.tokenizer
+        budget = model.max_seq_length - tokenizer.num_special_tokens_to_add(pair=False)
+        return cls(tokenizer, budget, overlap_tokens, batch_size)
+
+    def _offsets(self, texts: List[str]) -> List[List[Tuple[int, int]]]:
+        offsets = []
+        for i in range(0, len(texts), self.batch_size):
+            encoded = self.tokenizer(
+                texts[i:i + self.batch_size],
+                add_special_tokens=False,
+                return_offsets_mapping=True,
+                return_attention_mask=False,
+                return_token_type_ids=False,
+                verbose=False,  # whole documents are meant to exceed model_max_length here
+            )
+            offsets.extend(encoded["offset_mapping"])
+        return offsets
+
+    def _spans(self, text: str, offsets: Sequence[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        n = len(offsets)
+
+        def joined(j: int) -> bool:
+            # Token j continues the word of token j - 1 (e.g. a "##" word piece).
+            return 0 < j < n and offsets[j][0] == offsets[j - 1][1]
+
+        spans, start = [], 0
+        while start < n:
+            end = min(start + self.max_tokens, n)
+            if end < n:
+                floor = start + max(1, 3 * self.max_tokens // 4)
+                for j in range(end - 1, floor - 1, -1):
+                    gap = text[offsets[j][1]:offsets[j + 1][0]]
+                    if "\n" in gap or (gap and text[offsets[j][1] - 1] in ".!?"):
+                        end = j + 1
+                        break
+                else:
+                    while end > start + 1 and joined(end):
+                        end -= 1
+            spans.append((offsets[start][0], offsets[end - 1][1]))
+            if end >= n:
+                break
+            next_start = max(end - self.overlap_tokens, start + 1)
+            while next_start > start + 1 and joined(next_start):
+                next_start -= 1
+            start = next_start
+        return spans
+
+    def split_documents(self, docs: List[Document]) -> List[Document]:
+        texts = [doc.page_content for doc in docs]
+        chunks = []
+        for doc, text, offsets in zip(docs, texts, self._offsets(texts)):
+            for begin, end in self._spans(text, offsets):
+                chunks.append(Document(page_content=text[begin:end], metadata=dict(doc.metadata)))
+        return chunks
+
+
+def token_stats(texts: List[str], tokenizer, max_seq_length: int, batch_size: int = 256) -> Dict[str, float]:
+    """Chunk count, share of chunks the encoder would truncate, and token length stats."""
+    lengths = []
+    for i in range(0, len(texts), batch_size):
+        encoded = tokenizer(texts[i:i + batch_size], add_special_tokens=True, return_attention_mask=False,
+                            return_token_type_ids=False, verbose=False)
+        lengths.extend(len(ids) for ids in encoded["input_ids"])
+    truncated = sum(length > max_seq_length for length in lengths)
+    return {
+        "chunks": len(lengths),
+        "truncated": truncated,
+        "truncation_rate": truncated / max(1, len(lengths)),
+        "mean_tokens": sum(min(length, max_seq_length) for length in lengths) / max(1, len(lengths)),
+        "max_tokens": max(lengths, default=0),
+    }
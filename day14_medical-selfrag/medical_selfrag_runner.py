@@ -2,12 +2,14 @@ import sys, os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 import argparse
-from graphs.medical_selfrag_graph import graph
-from state.selfrag_state import SelfRAGState
+
+# The graph, state model and node modules are imported inside the functions
+# that use them, so `--debug-only` doesn't pay for langgraph/torch/FAISS.
 
 def debug_graph_structure():
     """Debug the graph structure to see what nodes are available"""
     print("🔍 Debugging graph structure...")
+    from graphs.medical_selfrag_graph import graph
     
     try:
         # Check if graph has nodes
@@ -28,6 +30,7 @@ def debug_graph_structure():
 def test_individual_nodes():
     """Test individual nodes to see which ones work"""
     print("\n🧪 Testing individual nodes...")
+    from state.selfrag_state import SelfRAGState
     
     # Create a test state
     test_state = SelfRAGState(
@@ -64,6 +67,8 @@ def run_selfrag_debug(question: str):
     Run the Medical Self-RAG system with detailed debugging
     """
     print(f"🚀 Starting Medical Self-RAG pipeline with question: {question}")
+    from graphs.medical_selfrag_graph import graph
+    from state.selfrag_state import SelfRAGState
     
     # Debug graph structure first
     debug_graph_structure()
@@ -133,6 +138,14 @@ def run_selfrag_debug(question: str):
         print(f"\n🔄 Retry Information:")
         print(f"Total retries: {retry_count}")
 
+        from retrieval.index_handle import default_handle
+        cache = default_handle().cache
+        if cache is not None:
+            stats = cache.stats()
+            print(f"\n🗃️ Retrieval cache:")
+            print(f"Hit rate: {stats['hit_rate']:.0%} ({stats['hits']} hits, {stats['misses']} misses), "
+                  f"{stats['embedding_hits']} cached embeddings reused, {stats['saved_ms']} ms saved")
+
         logs = final_state.get('logs', [])
         print(f"\n📜 Execution Logs ({len(logs)}):")
         if logs:
@@ -177,6 +190,8 @@ def check_file_structure():
     if os.path.exists(faiss_path):
         files = os.listdir(faiss_path)
         print(f"📊 FAISS index files: {files}")
+        from retrieval.index_handle import read_version
+        print(f"📌 Index version: {read_version(faiss_path) or 'unversioned'}")
         if not files:
             print("⚠️  FAISS index directory is empty!")
     
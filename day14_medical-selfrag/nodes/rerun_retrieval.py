@@ -1,25 +1,23 @@
 from state.selfrag_state import SelfRAGState
-from embeddings.local_embedding_model import LocalEmbeddingModel
-from langchain_community.vectorstores import FAISS
-import os
-
-INDEX_PATH = os.path.abspath("vectorstore/faiss_index")
-
-vectorstore = FAISS.load_local(INDEX_PATH, LocalEmbeddingModel(), allow_dangerous_deserialization=True)
 
 def rerun_retrieval(state: SelfRAGState) -> SelfRAGState:
     query = state.question
     logs = state.logs
+    version = state.index_version
 
     try:
-        docs = vectorstore.similarity_search(query, k=4)
+        from retrieval.index_handle import default_handle
+
+        # The same handle as retriever_node, so a retry searches the version it would.
+        version, docs, hit = default_handle().search(query, k=4)
         text_chunks = [doc.page_content for doc in docs]
-        logs.append(f"🔄 Reretrieved {len(text_chunks)} docs using corrected query.")
+        logs.append(f"🔄 Reretrieved {len(text_chunks)} docs using corrected query{' (query cache)' if hit else ''}.")
     except Exception as e:
         text_chunks = []
         logs.append(f"Retry retrieval failed: {str(e)}")
 
     return state.model_copy(update={
     "retrieved_docs": text_chunks,
+    "index_version": version,
     "logs": logs
     })
\ No newline at end of file
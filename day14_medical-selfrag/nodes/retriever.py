@@ -1,23 +1,22 @@
 from state.selfrag_state import SelfRAGState
-from langchain_community.vectorstores import FAISS
-from embeddings.local_embedding_model import LocalEmbeddingModel
-import os
-
-FAISS_INDEX_PATH = os.path.join(os.path.dirname(__file__), "..", "vectorstore", "faiss_index")
 
 def retriever_node(state:SelfRAGState) -> SelfRAGState:
     query = state.question
     logs = state.logs
 
-    embeddings = LocalEmbeddingModel()
-    db = FAISS.load_local(FAISS_INDEX_PATH,embeddings,allow_dangerous_deserialization=True)
+    from retrieval.index_handle import default_handle
 
-    docs = db.similarity_search(query,k=4)
+    # Loaded once per process and swapped when ingest publishes a new version.
+    # FAISS and BM25 hits are fused by reciprocal rank (retrieval/hybrid.py);
+    # repeated questions are answered from the handle's query cache.
+    version, docs, hit = default_handle().search(query,k=4)
     doc_texts = [doc.page_content for doc in docs]
 
-    logs.append(f"Retrieved {len(doc_texts)} documents from FAISS.")
+    source = "query cache" if hit else "FAISS"
+    logs.append(f"Retrieved {len(doc_texts)} documents from {source} (index version {version}).")
 
     return state.model_copy(update={
         "retrieved_docs":doc_texts,
+        "index_version":version,
         "logs":logs
-    })
\ No newline at end of file
+    })
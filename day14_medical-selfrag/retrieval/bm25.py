@@ -0,0 +1,172 @@
+"""
+In-memory BM25 inverted index over the chunks of a FAISS store.
+
+MiniLM splits drug names, abbreviations and readings like "130/80 mmHg" into
+word pieces whose embeddings barely move the query vector, so dense search
+misses chunks an exact term match would find. This index scores those terms
+directly; retrieval/hybrid.py fuses its ranking with FAISS's.
+
+Saved as bm25.json in the index folder, beside index.faiss:
+
+    {"k1": ..., "b": ..., "ids": [docstore id per slot], "lengths": [tokens per slot],
+     "postings": {term: [[slot, ...], [term frequency, ...]]}}
+
+Postings are NumPy arrays in memory, so a query term is scored over all
+chunks containing it in one vectorised step.
+"""
+import json
+import math
+import os
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+
+BM25_FILE = "bm25.json"
+
+# Words joined by ".", "/" or "-" stay one token ("130/80", "covid-19", "2.5"); their parts are indexed too.
+TOKEN_RE = re.compile(r"[a-z0-9]+(?:[./-][a-z0-9]+)*")
+STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from has have how in is it its of on or that the their "
+    "this to was what when where which who why with".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    tokens = []
+    for token in TOKEN_RE.findall(text.lower()):
+        if token not in STOPWORDS:
+            tokens.append(token)
+        parts = re.split(r"[./-]", token)
+        if len(parts) > 1:
+            tokens.extend(part for part in parts if part not in STOPWORDS)
+    return tokens
+
+
+class BM25Index:
+    """
+    Okapi BM25 over docstore IDs. add() appends chunks, delete() drops them by
+    ID (postings are compacted right away, so document frequencies stay exact).
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75) -> None:
+        self.k1 = k1
+        self.b = b
+        self.ids: List[str] = []
+        self.lengths = np.zeros(0, dtype=np.float32)
+        self.postings: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self._slots: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, id_: str) -> bool:
+        return id_ in self._slots
+
+    def add(self, ids: Sequence[str], texts: Iterable[str]) -> None:
+        new_postings: Dict[str, Tuple[List[int], List[int]]] = {}
+        lengths = []
+        start = len(self.ids)
+        for offset, (id_, text) in enumerate(zip(ids, texts)):
+            if id_ in self._slots:
+                raise ValueError(f"Tried to add an id that already exists: {id_}")
+            self._slots[id_] = start + offset
+            self.ids.append(id_)
+            tokens = tokenize(text)
+            lengths.append(len(tokens))
+            for term, tf in Counter(tokens).items():
+                slots, tfs = new_postings.setdefault(term, ([], []))
+                slots.append(start + offset)
+                tfs.append(tf)
+        self.lengths = np.concatenate([self.lengths, np.asarray(lengths, dtype=np.float32)])
+        for term, (slots, tfs) in new_postings.items():
+            old = self.postings.get(term)
+            slots, tfs = np.asarray(slots, dtype=np.int32), np.asarray(tfs, dtype=np.float32)
+            if old is not None:
+                slots, tfs = np.concatenate([old[0], slots]), np.concatenate([old[1], tfs])
+            self.postings[term] = (slots, tfs)
+
+    def delete(self, ids: Iterable[str]) -> None:
+        doomed = {self._slots[id_] for id_ in ids if id_ in self._slots}
+        if not doomed:
+            return
+        keep = np.ones(len(self.ids), dtype=bool)
+        keep[list(doomed)] = False
+        new_slot = np.cumsum(keep, dtype=np.int32) - 1
+        for term, (slots, tfs) in list(self.postings.items()):
+            live = keep[slots]
+            if live.all():
+                self.postings[term] = (new_slot[slots], tfs)
+            elif live.any():
+                self.postings[term] = (new_slot[slots[live]], tfs[live])
+            else:
+                del self.postings[term]
+        self.ids = [id_ for id_, kept in zip(self.ids, keep) if kept]
+        self.lengths = self.lengths[keep]
+        self._slots = {id_: slot for slot, id_ in enumerate(self.ids)}
+
+    def search(self, query: str, k: int = 4) -> List[Tuple[str, float]]:
+        """Top-k (docstore id, BM25 score) for `query`, best first; chunks sharing no term are left out."""
+        n = len(self.ids)
+        terms = [term for term in dict.fromkeys(tokenize(query)) if term in self.postings]
+        if not n or not terms or k <= 0:
+            return []
+        norm = self.k1 * (1 - self.b + self.b * self.lengths / max(float(self.lengths.mean()), 1e-9))
+        scores = np.zeros(n, dtype=np.float32)
+        for term in terms:
+            slots, tfs = self.postings[term]
+            idf = math.log(1 + (n - len(slots) + 0.5) / (len(slots) + 0.5))
+            scores[slots] += idf * tfs * (self.k1 + 1) / (tfs + norm[slots])
+        matched = np.flatnonzero(scores)
+        if len(matched) > k:
+            matched = matched[np.argpartition(-scores[matched], k - 1)[:k]]
+        order = matched[np.lexsort((matched, -scores[matched]))]
+        return [(self.ids[slot], float(scores[slot])) for slot in order]
+
+    def sync(self, id_texts: Dict[str, Optional[str]]) -> Tuple[int, int]:
+        """
+        Make the indexed IDs equal the keys of `id_texts`: drop the others
+        and add the missing ones, reading their text from the mapping (which
+        may be lazy). Returns (removed, added).
+        """
+        live = set(id_texts)
+        stale = [id_ for id_ in self.ids if id_ not in live]
+        self.delete(stale)
+        missing = [id_ for id_ in id_texts if id_ not in self._slots]
+        self.add(missing, (id_texts[id_] for id_ in missing))
+        return len(stale), len(missing)
+
+    def save(self, folder: str) -> None:
+        """Write bm25.json beside and rename it, like the other index files."""
+        data = {
+            "k1": self.k1,
+            "b": self.b,
+            "ids": self.ids,
+            "lengths": self.lengths.astype(int).tolist(),
+            "postings": {term: [slots.tolist(), tfs.astype(int).tolist()] for term, (slots, tfs) in self.postings.items()},
+        }
+        path = os.path.join(folder, BM25_FILE)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(path + ".tmp", path)
+
+    @classmethod
+    def load(cls, folder: str) -> "BM25Index":
+        with open(os.path.join(folder, BM25_FILE), "r", encoding="utf-8") as f:
+            data = json.load(f)
+        index = cls(data["k1"], data["b"])
+        index.ids = data["ids"]
+        index.lengths = np.asarray(data["lengths"], dtype=np.float32)
+        index.postings = {
+            term: (np.asarray(slots, dtype=np.int32), np.asarray(tfs, dtype=np.float32))
+            for term, (slots, tfs) in data["postings"].items()
+        }
+        index._slots = {id_: slot for slot, id_ in enumerate(index.ids)}
+        return index
+
+
+def load_bm25(folder: str) -> Optional[BM25Index]:
+    """The folder's BM25 index, or None for indexes built before it existed."""
+    if not os.path.exists(os.path.join(folder, BM25_FILE)):
+        return None
+    return BM25Index.load(folder)
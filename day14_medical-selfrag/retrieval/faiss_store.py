@@ -0,0 +1,243 @@
+import json
+import os
+import pickle
+import uuid
+import warnings
+from typing import List, Optional
+import numpy as np
+from langchain_core.documents import Document
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+
+INDEX_FILE = "index.faiss"
+# Set to 1 to have the retriever nodes memory-map the index (see read_index).
+MMAP_ENV = "FAISS_INDEX_MMAP"
+
+
+def mmap_enabled() -> bool:
+    return os.environ.get(MMAP_ENV, "").lower() in ("1", "true", "yes")
+
+
+def read_index(path: str, mmap: bool = False):
+    """
+    faiss.read_index, optionally memory-mapping the vector data read-only so
+    its pages come from the OS page cache and are shared by every process
+    that maps the same file. Load time then barely depends on index size.
+
+    IO_FLAG_MMAP_IFC maps flat, scalar- and product-quantized codes, the
+    inverted lists of ivf-flat and the vectors of an HNSW graph (its links are
+    still read into memory); older FAISS versions get IO_FLAG_MMAP. Falls
+    back to a normal read if the index cannot be mapped.
+
+    A mapped index is read-only: adding to it aborts the process.
+    """
+    import faiss
+
+    if mmap:
+        flag = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP)
+        try:
+            return faiss.read_index(path, flag | faiss.IO_FLAG_READ_ONLY)
+        except RuntimeError as e:
+            warnings.warn(f"Could not memory-map {path}, reading it into memory instead: {e}")
+    return faiss.read_index(path)
+
+
+def write_index(index, path: str) -> None:
+    """Write beside and rename, so processes that memory-mapped the old file keep a valid mapping."""
+    import faiss
+
+    faiss.write_index(index, path + ".tmp")
+    os.replace(path + ".tmp", path)
+
+
+def add_vectors(
+    vectorstore: FAISS,
+    docs: List[Document],
+    vectors: np.ndarray,
+    ids: Optional[List[str]] = None,
+) -> List[str]:
+    """
+    Add pre-computed vectors to a LangChain FAISS store without converting them
+    to Python lists (FAISS.add_embeddings boxes every float and copies twice).
+
+    For a MatryoshkaFAISS store pass full-dimension vectors: the index gets the
+    truncated ones and `full_vectors` grows to match. A ShardedFAISS store
+    routes each vector to the shard its ID hashes to.
+    """
+    import faiss
+    from retrieval.matryoshka import MatryoshkaFAISS, truncate
+    from retrieval.sharded import ShardedFAISS, partition
+
+    ids = ids or [str(uuid.uuid4()) for _ in docs]
+    if len(ids) != len(docs) or len(docs) != len(vectors):
+        raise ValueError(f"Got {len(docs)} docs, {len(vectors)} vectors and {len(ids)} ids.")
+
+    if isinstance(vectorstore, ShardedFAISS):
+        for shard, rows in zip(vectorstore.shards, partition(ids, len(vectorstore.shards))):
+            add_vectors(shard, [docs[i] for i in rows], vectors[rows], [ids[i] for i in rows])
+        return ids
+
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    if isinstance(vectorstore, MatryoshkaFAISS):
+        vectorstore.full_vectors = np.concatenate([np.asarray(vectorstore.full_vectors), vectors])
+        vectors = truncate(vectors, vectorstore.truncate_dim)
+    if vectorstore._normalize_L2:
+        faiss.normalize_L2(vectors)
+    vectorstore.index.add(vectors)
+    _register(vectorstore, docs, ids)
+    return ids
+
+
+def _register(vectorstore: FAISS, docs: List[Document], ids: List[str]) -> None:
+    """Docstore entries for vectors just appended to the index, in the same order."""
+    vectorstore.docstore.add({
+        id_: Document(id=id_, page_content=doc.page_content, metadata=doc.metadata)
+        for id_, doc in zip(ids, docs)
+    })
+    start = len(vectorstore.index_to_docstore_id)
+    vectorstore.index_to_docstore_id.update({start + i: id_ for i, id_ in enumerate(ids)})
+
+
+def faiss_from_vectors(
+    docs: List[Document],
+    vectors: np.ndarray,
+    embeddings,
+    ids: Optional[List[str]] = None,
+    index=None,
+) -> FAISS:
+    """Build a LangChain FAISS store from docs and their (n, dim) float32 vectors."""
+    import faiss
+
+    if index is None:
+        index = faiss.IndexFlatL2(vectors.shape[1])
+    vectorstore = FAISS(
+        embedding_function=embeddings,
+        index=index,
+        docstore=InMemoryDocstore(),
+        index_to_docstore_id={},
+    )
+    add_vectors(vectorstore, docs, vectors, ids)
+    return vectorstore
+
+
+def faiss_from_index(docs: List[Document], index, embeddings, ids: List[str]) -> FAISS:
+    """Wrap an index that already holds the vectors of `docs` (row i is docs[i])."""
+    if index.ntotal != len(docs) or len(ids) != len(docs):
+        raise ValueError(f"Index holds {index.ntotal} vectors for {len(docs)} docs and {len(ids)} ids.")
+    vectorstore = FAISS(
+        embedding_function=embeddings,
+        index=index,
+        docstore=InMemoryDocstore(),
+        index_to_docstore_id={},
+    )
+    _register(vectorstore, docs, ids)
+    return vectorstore
+
+
+def faiss_from_documents(docs: List[Document], embeddings, ids: Optional[List[str]] = None) -> FAISS:
+    """
+    Drop-in replacement for FAISS.from_documents that uses the NumPy embedding
+    path (embed_documents_array) when the embedding model provides one.
+    """
+    texts = [doc.page_content for doc in docs]
+    if hasattr(embeddings, "embed_documents_array"):
+        vectors = embeddings.embed_documents_array(texts)
+    else:
+        vectors = np.asarray(embeddings.embed_documents(texts), dtype=np.float32)
+    return faiss_from_vectors(docs, vectors, embeddings, ids)
+
+
+def save_vectorstore(vectorstore: FAISS, folder: str, docstore: Optional[str] = None) -> None:
+    """
+    save_local plus whatever side files the store type needs. Every file is
+    written beside its target and renamed over it, so a saved index can be
+    replaced under processes that have it loaded or memory-mapped.
+
+    `docstore` picks how chunk text is stored: "pickle" (index.pkl, as
+    save_local writes it) or "sqlite" (docstore.sqlite, read lazily at query
+    time). None keeps the format the store was loaded from.
+    """
+    from retrieval.matryoshka import CONFIG_FILE, FULL_VECTORS_FILE, MatryoshkaFAISS
+    from retrieval.sharded import SHARDS_FILE, ShardedFAISS, save_sharded
+    from retrieval.sqlite_docstore import (
+        DOCSTORE_FILE, DOCSTORE_FORMATS, PICKLE_FILE, SQLiteDocstore, in_memory, write_docstore
+    )
+
+    if isinstance(vectorstore, ShardedFAISS):
+        save_sharded(vectorstore, folder, docstore)
+        return
+    if docstore is None:
+        docstore = "sqlite" if isinstance(vectorstore.docstore, SQLiteDocstore) else "pickle"
+    if docstore not in DOCSTORE_FORMATS:
+        raise ValueError(f"Unknown docstore format '{docstore}', expected one of {DOCSTORE_FORMATS}")
+    os.makedirs(folder, exist_ok=True)
+    write_index(vectorstore.index, os.path.join(folder, INDEX_FILE))
+    if docstore == "sqlite":
+        write_docstore(os.path.join(folder, DOCSTORE_FILE), vectorstore.docstore, vectorstore.index_to_docstore_id)
+        stale = PICKLE_FILE
+    else:
+        docs, id_map = vectorstore.docstore, vectorstore.index_to_docstore_id
+        if isinstance(docs, SQLiteDocstore):
+            docs, id_map = in_memory(docs, id_map)
+        # The same pickle FAISS.save_local writes.
+        path = os.path.join(folder, PICKLE_FILE)
+        with open(path + ".tmp", "wb") as f:
+            pickle.dump((docs, id_map), f)
+        os.replace(path + ".tmp", path)
+        stale = DOCSTORE_FILE
+    if os.path.exists(os.path.join(folder, stale)):
+        # Exactly one docstore per folder, so load_vectorstore never picks up an old one.
+        os.remove(os.path.join(folder, stale))
+    if os.path.exists(os.path.join(folder, SHARDS_FILE)):
+        # A single index saved over a sharded one must not be shadowed by the old shards.
+        os.remove(os.path.join(folder, SHARDS_FILE))
+    config_path = os.path.join(folder, CONFIG_FILE)
+    if isinstance(vectorstore, MatryoshkaFAISS):
+        # Write beside and rename: full_vectors may be a memory map of the file being replaced.
+        path = os.path.join(folder, FULL_VECTORS_FILE)
+        with open(path + ".tmp", "wb") as f:
+            np.save(f, np.asarray(vectorstore.full_vectors, dtype=np.float32))
+        os.replace(path + ".tmp", path)
+        with open(config_path, "w", encoding="utf-8") as f:
+            json.dump({"truncate_dim": vectorstore.truncate_dim, "oversample": vectorstore.oversample}, f)
+    elif os.path.exists(config_path):
+        # A plain index saved over a truncated one must not inherit its config.
+        os.remove(config_path)
+
+
+def load_vectorstore(folder: str, embeddings, mmap: bool = False) -> FAISS:
+    """
+    Load an index written by save_vectorstore, returning the matching store
+    type with its tuned search parameters applied. The retriever nodes use
+    this instead of FAISS.load_local.
+
+    A folder with a shards.json loads as a ShardedFAISS over its shard folders,
+    and one with a docstore.sqlite reads chunk text from it per search
+    instead of unpickling index.pkl. `mmap` memory-maps the FAISS index
+    read-only (see read_index); leave it off for stores that will be updated.
+    """
+    from retrieval.index_factory import apply_search_params, load_search_params
+    from retrieval.matryoshka import CONFIG_FILE, FULL_VECTORS_FILE, MatryoshkaFAISS
+    from retrieval.sharded import SHARDS_FILE, load_sharded
+    from retrieval.sqlite_docstore import DOCSTORE_FILE, PICKLE_FILE, load_compact
+
+    if os.path.exists(os.path.join(folder, SHARDS_FILE)):
+        return load_sharded(folder, embeddings, mmap)
+    index = read_index(os.path.join(folder, INDEX_FILE), mmap)
+    if os.path.exists(os.path.join(folder, DOCSTORE_FILE)):
+        store = load_compact(folder, embeddings, index)
+    else:
+        # What FAISS.load_local does, minus its own faiss.read_index.
+        with open(os.path.join(folder, PICKLE_FILE), "rb") as f:
+            docstore, index_to_docstore_id = pickle.load(f)
+        store = FAISS(embeddings, index, docstore, index_to_docstore_id)
+    # nprobe / efSearch chosen by the ingest-time tuning sweep.
+    apply_search_params(store.index, load_search_params(folder))
+    config_path = os.path.join(folder, CONFIG_FILE)
+    if os.path.exists(config_path):
+        with open(config_path, "r", encoding="utf-8") as f:
+            config = json.load(f)
+        # Memory-mapped: only the rows of re-ranked candidates are paged in.
+        full_vectors = np.load(os.path.join(folder, FULL_VECTORS_FILE), mmap_mode="r")
+        store = MatryoshkaFAISS.wrap(store, full_vectors, config["truncate_dim"], config["oversample"])
+    return store
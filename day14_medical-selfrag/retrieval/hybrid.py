@@ -0,0 +1,136 @@
+"""
+Hybrid retrieval: FAISS and BM25 searched concurrently, merged by
+reciprocal rank fusion (RRF).
+
+RRF scores a chunk by sum(1 / (RRF_K + rank)) over the rankings it appears
+in. It only uses ranks, so L2 distances and BM25 scores never have to be put
+on one scale, and a chunk near the top of either list makes the cut.
+"""
+import os
+import threading
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+from langchain_core.documents import Document
+from retrieval.bm25 import BM25Index
+
+# Set to 0 to have the retriever nodes search FAISS alone even when the index has a bm25.json.
+HYBRID_ENV = "RETRIEVAL_HYBRID"
+RRF_K = 60
+# Candidates taken from each retriever before fusion.
+CANDIDATES = 20
+
+_pool: Optional[ThreadPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def hybrid_enabled() -> bool:
+    return os.environ.get(HYBRID_ENV, "1").lower() not in ("0", "false", "no")
+
+
+def _executor() -> ThreadPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1), thread_name_prefix="bm25")
+        return _pool
+
+
+def store_ids(store) -> Iterator[str]:
+    """Docstore ID of every vector in a FAISS, MatryoshkaFAISS or ShardedFAISS store."""
+    from retrieval.sharded import ShardedFAISS
+
+    shards = store.shards if isinstance(store, ShardedFAISS) else [store]
+    for shard in shards:
+        yield from shard.index_to_docstore_id.values()
+
+
+def lookup(store, id_: str) -> Document:
+    from retrieval.sharded import ShardedFAISS, shard_of
+
+    if isinstance(store, ShardedFAISS):
+        store = store.shards[shard_of(id_, len(store.shards))]
+    doc = store.docstore.search(id_)
+    if not isinstance(doc, Document):
+        raise ValueError(f"Could not find document for id {id_}, got {doc}")
+    return doc
+
+
+class StoreTexts(Mapping):
+    """{docstore id: chunk text} over a store; text is read per key, so only new chunks are fetched."""
+
+    def __init__(self, store) -> None:
+        self.store = store
+        self._ids = list(store_ids(store))
+
+    def __getitem__(self, id_: str) -> str:
+        return lookup(self.store, id_).page_content
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._ids)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+
+def build_bm25(store, previous: Optional[BM25Index] = None) -> Tuple[BM25Index, int, int]:
+    """
+    BM25 index over every chunk in `store`. Given the index of the version
+    `store` was updated from, only the chunks added since are tokenized.
+    Returns (index, chunks dropped, chunks tokenized).
+    """
+    index = previous if previous is not None else BM25Index()
+    removed, added = index.sync(StoreTexts(store))
+    return index, removed, added
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[str]], k: int = RRF_K) -> List[Tuple[str, float]]:
+    """Keys of all `rankings` (each best first) ordered by fused score; ties keep first-seen order."""
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, key in enumerate(ranking, start=1):
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: -item[1])
+
+
+def _key(doc: Document) -> str:
+    # Indexes pickled by FAISS.from_documents carry no Document.id.
+    return doc.id or doc.page_content
+
+
+def hybrid_search(
+    store,
+    sparse: BM25Index,
+    query: str,
+    k: int = 4,
+    filter: Optional[Union[Callable, Dict[str, Any]]] = None,
+    embed: Optional[Callable[[str], List[float]]] = None,
+    candidates: int = CANDIDATES,
+    rrf_k: int = RRF_K,
+) -> List[Document]:
+    """
+    Top-k chunks for `query` by RRF over FAISS and BM25 rankings of
+    `candidates` each. BM25 runs on a worker thread while this one embeds the
+    query (with `embed`, default the store's embed_query) and searches FAISS.
+    A metadata filter applies to both sides.
+    """
+    from langchain_community.vectorstores import FAISS
+
+    fetch = max(candidates, k)
+    sparse_hits = _executor().submit(sparse.search, query, fetch)
+    embed = embed or store.embedding_function.embed_query
+    dense = store.similarity_search_by_vector(embed(query), k=fetch, filter=filter)
+
+    docs = {_key(doc): doc for doc in dense}
+    sparse_ranking = []
+    keep = FAISS._create_filter_func(filter) if filter is not None else None
+    for id_, _ in sparse_hits.result():
+        if keep is not None:
+            doc = docs.get(id_) or lookup(store, id_)
+            if not keep(doc.metadata):
+                continue
+            docs[id_] = doc
+        sparse_ranking.append(id_)
+
+    fused = reciprocal_rank_fusion([[_key(doc) for doc in dense], sparse_ranking], rrf_k)[:k]
+    return [docs[key] if key in docs else lookup(store, key) for key, _ in fused]
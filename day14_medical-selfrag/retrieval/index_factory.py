@@ -0,0 +1,205 @@
+import json
+import math
+import os
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+# flat     - exact float32 (what FAISS.from_documents builds)
+# fp16     - float16 scalar quantizer, 2x smaller
+# sq8      - 8-bit scalar quantizer trained per dimension, 4x smaller
+# pq       - product quantizer with `pq_m` 8-bit sub-codes per vector
+# ivf-flat - inverted lists over `nlist` k-means cells, exact vectors; searches `nprobe` cells
+# ivf-pq   - ivf-flat with product-quantized vectors
+# hnsw     - HNSW graph with `M` links per node; searches with `efSearch` candidates
+INDEX_TYPES = ("flat", "fp16", "sq8", "pq", "ivf-flat", "ivf-pq", "hnsw")
+
+# Tuned search parameters saved next to the index and applied by load_vectorstore.
+PARAMS_FILE = "index_params.json"
+MAX_TRAIN_POINTS = 100_000
+NPROBE_SWEEP = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+EF_SEARCH_SWEEP = (16, 24, 32, 48, 64, 96, 128, 192, 256, 512)
+TRAINED_INDEX_TYPES = ("sq8", "pq", "ivf-flat", "ivf-pq")
+TUNABLE_INDEX_TYPES = ("ivf-flat", "ivf-pq", "hnsw")
+
+
+def default_pq_m(dim: int) -> int:
+    """Largest divisor of dim giving sub-vectors of at least 8 dims (384 -> 48)."""
+    for m in range(max(1, dim // 8), 0, -1):
+        if dim % m == 0:
+            return m
+    return 1
+
+
+def default_nlist(n: int) -> int:
+    """About 4 * sqrt(n) IVF cells, but never fewer than 39 points per cell (FAISS's training minimum)."""
+    return max(1, min(int(4 * math.sqrt(n)), n // 39))
+
+
+def default_hnsw_m(n: int) -> int:
+    """HNSW links per node: 16 is plenty for small corpora, 32 keeps recall up on large ones."""
+    return 16 if n < 100_000 else 32
+
+
+def sample_rows(vectors: np.ndarray, limit: int, seed: int = 0) -> np.ndarray:
+    if len(vectors) <= limit:
+        return vectors
+    rows = np.random.default_rng(seed).choice(len(vectors), size=limit, replace=False)
+    return vectors[np.sort(rows)]
+
+
+def make_index(
+    index_type: str,
+    dim: int,
+    train_vectors: Optional[np.ndarray] = None,
+    pq_m: Optional[int] = None,
+    nlist: Optional[int] = None,
+    hnsw_m: Optional[int] = None,
+    n_total: Optional[int] = None,
+):
+    """
+    Create (and train, if needed) an L2 FAISS index of the given type.
+
+    `nlist` and `hnsw_m` default to values derived from `n_total` (the corpus
+    size, defaulting to len(train_vectors)). Training uses a random sample of
+    at most MAX_TRAIN_POINTS vectors (256 per cell for IVF).
+    """
+    import faiss
+
+    n_total = n_total or (0 if train_vectors is None else len(train_vectors))
+    if index_type == "flat":
+        return faiss.IndexFlatL2(dim)
+    if index_type == "fp16":
+        return faiss.IndexScalarQuantizer(dim, faiss.ScalarQuantizer.QT_fp16, faiss.METRIC_L2)
+    if index_type == "hnsw":
+        return faiss.IndexHNSWFlat(dim, hnsw_m or default_hnsw_m(n_total), faiss.METRIC_L2)
+
+    if train_vectors is None or len(train_vectors) == 0:
+        raise ValueError(f"Index type '{index_type}' needs training vectors.")
+    limit = MAX_TRAIN_POINTS
+    if index_type.startswith("ivf"):
+        nlist = nlist or default_nlist(n_total)
+        limit = min(limit, 256 * nlist)
+    train_vectors = np.ascontiguousarray(sample_rows(train_vectors, limit), dtype=np.float32)
+    # 256 centroids per sub-quantizer want 39 * 256 training points;
+    # shrink the code size on small corpora instead of training badly.
+    nbits = min(8, max(1, int(math.log2(max(2, len(train_vectors) // 39)))))
+
+    if index_type == "sq8":
+        index = faiss.IndexScalarQuantizer(dim, faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_L2)
+    elif index_type == "pq":
+        index = faiss.IndexPQ(dim, pq_m or default_pq_m(dim), nbits, faiss.METRIC_L2)
+    elif index_type == "ivf-flat":
+        index = faiss.IndexIVFFlat(faiss.IndexFlatL2(dim), dim, nlist, faiss.METRIC_L2)
+    elif index_type == "ivf-pq":
+        index = faiss.IndexIVFPQ(faiss.IndexFlatL2(dim), dim, nlist, pq_m or default_pq_m(dim), nbits)
+    else:
+        raise ValueError(f"Unknown index type '{index_type}', expected one of {INDEX_TYPES}")
+
+    index.train(train_vectors)
+    return index
+
+
+def search_param_sweep(index) -> Tuple[Optional[str], Sequence[int]]:
+    """The query-time knob of `index` and the values to try, cheapest first."""
+    import faiss
+
+    if isinstance(index, faiss.IndexIVF):
+        return "nprobe", [v for v in NPROBE_SWEEP if v <= index.nlist]
+    if isinstance(index, faiss.IndexHNSW):
+        return "efSearch", EF_SEARCH_SWEEP
+    return None, ()
+
+
+def apply_search_params(index, params: Dict[str, int]) -> None:
+    import faiss
+
+    space = faiss.ParameterSpace()
+    for name, value in params.items():
+        space.set_index_parameter(index, name, value)
+
+
+def _leave_out(found: np.ndarray, exclude: Optional[np.ndarray], k: int) -> List[List[int]]:
+    """First k ids of each result row, skipping that query's own row in `exclude`."""
+    if exclude is None:
+        return [list(row[:k]) for row in found]
+    return [[id_ for id_ in row if id_ != own][:k] for row, own in zip(found, exclude)]
+
+
+def tune_search_params(
+    index,
+    vectors: Optional[np.ndarray],
+    queries: np.ndarray,
+    k: int = 4,
+    target_recall: float = 0.95,
+    exclude: Optional[np.ndarray] = None,
+) -> Tuple[Dict[str, int], List[Dict[str, float]]]:
+    """
+    Sweep the index's query-time knob (nprobe / efSearch) against exact
+    search over `vectors` for the held-out `queries`, and apply the cheapest
+    setting whose recall@k reaches `target_recall` (or the most accurate one
+    if none does). Returns (chosen params, one row per setting tried).
+
+    Without `vectors` the reference comes from the index itself: probing all
+    IVF cells, or the vectors stored in an HNSW graph.
+
+    Queries taken from indexed chunks should pass `exclude`, the row of each
+    query's source chunk (-1 for none): that row is left out of both the exact
+    and the approximate results, or it would be an easy top hit for both.
+    """
+    import faiss
+
+    name, values = search_param_sweep(index)
+    if name is None:
+        return {}, []
+    queries = np.ascontiguousarray(queries, dtype=np.float32)
+    k = min(k, index.ntotal)
+    fetch = min(k + (exclude is not None), index.ntotal)
+    if vectors is None and name == "nprobe":
+        apply_search_params(index, {"nprobe": index.nlist})
+        _, truth = index.search(queries, fetch)
+    else:
+        if vectors is None:
+            vectors = index.reconstruct_n(0, index.ntotal)
+        exact = faiss.IndexFlatL2(vectors.shape[1])
+        exact.add(np.ascontiguousarray(vectors, dtype=np.float32))
+        _, truth = exact.search(queries, fetch)
+    truth = _leave_out(truth, exclude, k)
+
+    rows = []
+    for value in values:
+        apply_search_params(index, {name: value})
+        start = time.perf_counter()
+        _, found = index.search(queries, fetch)
+        ms = (time.perf_counter() - start) * 1000 / len(queries)
+        found = _leave_out(found, exclude, k)
+        recall = float(np.mean([len(set(f) & set(t)) / max(len(t), 1) for f, t in zip(found, truth)]))
+        rows.append({name: value, "recall": recall, "ms_per_query": ms})
+        if recall >= target_recall:
+            break
+
+    # Values are swept in increasing cost, so the first hit is the cheapest.
+    chosen = next((r for r in rows if r["recall"] >= target_recall), max(rows, key=lambda r: r["recall"]))
+    params = {name: int(chosen[name])}
+    apply_search_params(index, params)
+    return params, rows
+
+
+def save_search_params(folder: str, params: Dict[str, int], **info) -> None:
+    with open(os.path.join(folder, PARAMS_FILE), "w", encoding="utf-8") as f:
+        json.dump({"params": params, **info}, f, indent=2)
+
+
+def load_search_params(folder: str) -> Dict[str, int]:
+    path = os.path.join(folder, PARAMS_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)["params"]
+
+
+def index_nbytes(index) -> int:
+    """Serialized size of an index, i.e. what it costs on disk and in memory."""
+    import faiss
+
+    return int(faiss.serialize_index(index).nbytes)
@@ -0,0 +1,201 @@
+"""
+Versioned index folders and the process-wide handle the retriever nodes search.
+
+Layout under the index root:
+
+    VERSION               name of the current version, replaced by rename
+    versions/<version>/   a complete index folder (what save_vectorstore writes)
+
+Ingest writes every build or update into a new version folder and publishes
+it by rewriting VERSION, so readers never see a half-written index. A root
+without a VERSION file is an unversioned index folder and is read as is.
+"""
+import os
+import shutil
+import threading
+import time
+import warnings
+from typing import Callable, Optional, Tuple
+
+INDEX_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "vectorstore", "faiss_index"))
+VERSION_FILE = "VERSION"
+VERSIONS_DIR = "versions"
+# Old versions are kept for a while for processes that have not swapped yet.
+KEEP_VERSIONS = 3
+CHECK_INTERVAL = 2.0
+
+
+def read_version(root: str) -> Optional[str]:
+    try:
+        with open(os.path.join(root, VERSION_FILE), "r", encoding="utf-8") as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def index_folder(root: str, version: Optional[str] = None) -> str:
+    """Folder holding `version` (default: the current one); the root itself when unversioned."""
+    version = version or read_version(root)
+    return os.path.join(root, VERSIONS_DIR, version) if version else root
+
+
+def new_version(root: str) -> Tuple[str, str]:
+    """A fresh version name, sorting in creation order, and its (created) folder."""
+    now = time.time()
+    version = f"{time.strftime('%Y%m%d-%H%M%S', time.localtime(now))}-{int(now * 1e6) % 1_000_000:06d}"
+    folder = os.path.join(root, VERSIONS_DIR, version)
+    os.makedirs(folder)
+    return version, folder
+
+
+def publish_version(root: str, version: str, keep: int = KEEP_VERSIONS) -> None:
+    """Make `version` current, then drop all but the newest `keep` versions."""
+    path = os.path.join(root, VERSION_FILE)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        f.write(version + "\n")
+    os.replace(path + ".tmp", path)
+    versions = sorted(os.listdir(os.path.join(root, VERSIONS_DIR)))
+    for old in versions[:-keep]:
+        if old != version:
+            shutil.rmtree(os.path.join(root, VERSIONS_DIR, old), ignore_errors=True)
+
+
+class IndexHandle:
+    """
+    Loads the current version of an index once per process and swaps to a
+    newer one when VERSION changes, without a restart.
+
+    snapshot() returns a consistent (version, store) pair. At most every
+    `check_interval` seconds it re-reads VERSION; a new version is loaded on
+    a background thread while searches carry on against the old store, and
+    replaces it in one assignment once loaded. Searches already running keep
+    the store they started with. A version that fails to load is reported
+    and skipped; the handle keeps serving the previous one.
+
+    With `hybrid`, a version folder's bm25.json is loaded with it and
+    search() fuses FAISS and BM25 results (retrieval/hybrid.py). With a
+    QueryCache, search() answers repeated queries from it; its entries are
+    keyed by version, so a swap invalidates them.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        embeddings_factory: Callable,
+        mmap: bool = False,
+        check_interval: float = CHECK_INTERVAL,
+        cache=None,
+        hybrid: bool = False,
+    ) -> None:
+        self.root = root
+        self.mmap = mmap
+        self.check_interval = check_interval
+        self.cache = cache
+        self.hybrid = hybrid
+        self._embeddings_factory = embeddings_factory
+        self._embeddings = None
+        self._lock = threading.Lock()
+        self._current = None
+        self._checked_at = 0.0
+        self._loading: Optional[threading.Thread] = None
+        self._failed: Optional[str] = None
+
+    def _load(self, version: Optional[str]):
+        from retrieval.bm25 import load_bm25
+        from retrieval.faiss_store import load_vectorstore
+
+        if self._embeddings is None:
+            # Shared by every version, so a swap does not reload the model.
+            self._embeddings = self._embeddings_factory()
+        folder = index_folder(self.root, version)
+        store = load_vectorstore(folder, self._embeddings, self.mmap)
+        return version, store, load_bm25(folder) if self.hybrid else None
+
+    def _snapshot(self):
+        """(version, store, BM25 index or None), swapped together."""
+        current = self._current
+        if current is None:
+            with self._lock:
+                if self._current is None:
+                    self._checked_at = time.monotonic()
+                    self._current = self._load(read_version(self.root))
+                return self._current
+        if time.monotonic() - self._checked_at >= self.check_interval:
+            self._poll()
+        return current
+
+    def snapshot(self):
+        return self._snapshot()[:2]
+
+    @property
+    def version(self) -> Optional[str]:
+        return self.snapshot()[0]
+
+    def _poll(self) -> None:
+        with self._lock:
+            self._checked_at = time.monotonic()
+            if self._loading is not None and self._loading.is_alive():
+                return
+            version = read_version(self.root)
+            if version == self._current[0] or version == self._failed:
+                return
+            self._loading = threading.Thread(target=self._swap, args=(version,), name="index-reload", daemon=True)
+            self._loading.start()
+
+    def _swap(self, version: Optional[str]) -> None:
+        try:
+            loaded = self._load(version)
+        except Exception as e:
+            self._failed = version
+            warnings.warn(f"Could not load index version {version}, still serving {self._current[0]}: {e}")
+            return
+        self._current = loaded
+
+    def search(self, query: str, k: int = 4, filter=None):
+        """
+        Search the current version (hybrid when it has a BM25 index), through
+        the cache if any; returns (version, docs, cache hit).
+        """
+        from retrieval.hybrid import hybrid_search
+
+        version, store, sparse = self._snapshot()
+        if self.cache is not None:
+            docs, hit = self.cache.search(store, version, query, k=k, filter=filter, sparse=sparse)
+            return version, docs, hit
+        if sparse is not None:
+            return version, hybrid_search(store, sparse, query, k=k, filter=filter), False
+        return version, store.similarity_search(query, k=k, filter=filter), False
+
+    def reload(self) -> Optional[str]:
+        """Swap to the current version now, in this thread; returns it."""
+        version = read_version(self.root)
+        if self._current is None or self._current[0] != version:
+            loaded = self._load(version)
+            with self._lock:
+                self._current = loaded
+                self._checked_at = time.monotonic()
+        return version
+
+
+_default: Optional[IndexHandle] = None
+_default_lock = threading.Lock()
+
+
+def default_handle() -> IndexHandle:
+    """
+    The handle shared by the retriever nodes: INDEX_ROOT, the local embedding
+    model, FAISS_INDEX_MMAP, a QueryCache sized by RETRIEVAL_CACHE_SIZE, and
+    hybrid BM25 + FAISS search unless RETRIEVAL_HYBRID=0.
+    """
+    global _default
+    with _default_lock:
+        if _default is None:
+            from embeddings.local_embedding_model import LocalEmbeddingModel
+            from retrieval.faiss_store import mmap_enabled
+            from retrieval.hybrid import hybrid_enabled
+            from retrieval.query_cache import QueryCache
+
+            _default = IndexHandle(
+                INDEX_ROOT, LocalEmbeddingModel, mmap=mmap_enabled(), cache=QueryCache(), hybrid=hybrid_enabled()
+            )
+        return _default
@@ -0,0 +1,81 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+import numpy as np
+from langchain_core.documents import Document
+from langchain_community.vectorstores import FAISS
+
+FULL_VECTORS_FILE = "full_vectors.npy"
+CONFIG_FILE = "matryoshka.json"
+
+
+def truncate(vectors: np.ndarray, dim: int) -> np.ndarray:
+    """First `dim` components of each vector, re-normalized to unit length."""
+    head = np.ascontiguousarray(vectors[:, :dim], dtype=np.float32)
+    norms = np.linalg.norm(head, axis=1, keepdims=True)
+    return head / np.clip(norms, 1e-12, None)
+
+
+class MatryoshkaFAISS(FAISS):
+    """
+    FAISS store whose index holds truncated, renormalized vectors for a cheap
+    coarse search. The top `k * oversample` candidates are then re-scored by L2
+    distance against the full-dimension vectors in `full_vectors` (row i
+    belongs to FAISS position i), so scores match a full-dimension flat index.
+    """
+
+    def __init__(self, *args: Any, full_vectors: np.ndarray, truncate_dim: int, oversample: int = 4, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.full_vectors = full_vectors
+        self.truncate_dim = truncate_dim
+        self.oversample = oversample
+
+    @classmethod
+    def wrap(cls, store: FAISS, full_vectors: np.ndarray, truncate_dim: int, oversample: int = 4) -> "MatryoshkaFAISS":
+        return cls(
+            embedding_function=store.embedding_function,
+            index=store.index,
+            docstore=store.docstore,
+            index_to_docstore_id=store.index_to_docstore_id,
+            full_vectors=full_vectors,
+            truncate_dim=truncate_dim,
+            oversample=oversample,
+        )
+
+    def delete(self, ids: Optional[List[str]] = None, **kwargs: Any) -> Optional[bool]:
+        """Delete by ID, dropping the matching `full_vectors` rows as well."""
+        doomed = set(ids or [])
+        positions = [i for i, id_ in self.index_to_docstore_id.items() if id_ in doomed]
+        result = super().delete(ids, **kwargs)
+        self.full_vectors = np.delete(np.asarray(self.full_vectors), positions, axis=0)
+        return result
+
+    def similarity_search_with_score_by_vector(
+        self,
+        embedding: List[float],
+        k: int = 4,
+        filter: Optional[Union[Callable, Dict[str, Any]]] = None,
+        fetch_k: int = 20,
+        **kwargs: Any,
+    ) -> List[Tuple[Document, float]]:
+        query = np.asarray(embedding, dtype=np.float32)
+        candidates = k * self.oversample if filter is None else max(fetch_k, k) * self.oversample
+        _, indices = self.index.search(truncate(query[None, :], self.truncate_dim), candidates)
+        positions = indices[0][indices[0] >= 0]
+
+        distances = ((self.full_vectors[positions] - query) ** 2).sum(axis=1)
+        filter_func = self._create_filter_func(filter) if filter is not None else None
+        score_threshold = kwargs.get("score_threshold")
+
+        docs: List[Tuple[Document, float]] = []
+        for j in np.argsort(distances, kind="stable"):
+            if score_threshold is not None and distances[j] > score_threshold:
+                break
+            _id = self.index_to_docstore_id[int(positions[j])]
+            doc = self.docstore.search(_id)
+            if not isinstance(doc, Document):
+                raise ValueError(f"Could not find document for id {_id}, got {doc}")
+            if filter_func is not None and not filter_func(doc.metadata):
+                continue
+            docs.append((doc, float(distances[j])))
+            if len(docs) == k:
+                break
+        return docs
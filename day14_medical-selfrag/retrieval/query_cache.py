@@ -0,0 +1,172 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+from langchain_core.documents import Document
+
+MAX_ENTRIES_ENV = "RETRIEVAL_CACHE_SIZE"
+TTL_SECONDS_ENV = "RETRIEVAL_CACHE_TTL_SECONDS"
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_TTL_SECONDS = 600.0
+
+
+def normalize_query(query: str) -> str:
+    """
+    Lower-cased with whitespace collapsed. The uncased MiniLM tokenizer
+    ignores both, so queries equal after this embed to the same vector.
+    """
+    return " ".join(query.lower().split())
+
+
+def filter_key(filter: Optional[Union[Callable, Dict[str, Any]]]) -> Optional[str]:
+    """Hashable form of a metadata filter; a callable filter cannot be compared, so it is never cached."""
+    if filter is None:
+        return ""
+    if callable(filter):
+        return None
+    return json.dumps(filter, sort_keys=True, default=str)
+
+
+class _LRU:
+    """OrderedDict LRU whose entries expire `ttl` seconds after they were stored."""
+
+    def __init__(self, max_entries: int, ttl: float) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[Any, Tuple[float, Any]]" = OrderedDict()
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[0] > self.ttl:
+            del self._entries[key]
+            self.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def put(self, key, value) -> None:
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class QueryCache:
+    """
+    LRU/TTL cache of retrieval results (dense or hybrid), keyed by (normalized query,
+    k, filter, index version), in front of a vector store. Query embeddings
+    are cached separately by normalized query, since they do not depend on
+    the index: a retry against a new index version still skips the encoder.
+
+    Result entries of other index versions are dropped as soon as a new
+    version is searched. Each entry remembers what computing it cost, so
+    stats() can report the milliseconds hits saved.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, ttl_seconds: Optional[float] = None) -> None:
+        if max_entries is None:
+            max_entries = int(os.environ.get(MAX_ENTRIES_ENV, DEFAULT_MAX_ENTRIES))
+        if ttl_seconds is None:
+            ttl_seconds = float(os.environ.get(TTL_SECONDS_ENV, DEFAULT_TTL_SECONDS))
+        self.max_entries = max_entries
+        self._results = _LRU(max_entries, ttl_seconds)
+        self._embeddings = _LRU(max_entries, ttl_seconds)
+        self._version = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.embedding_hits = 0
+        self.saved_ms = 0.0
+
+    def _embed(self, store, normalized: str, query: str) -> Tuple[List[float], float]:
+        """Query embedding, and the milliseconds it originally took when it came from the cache (else 0)."""
+        with self._lock:
+            cached = self._embeddings.get(normalized)
+            if cached is not None:
+                self.embedding_hits += 1
+                self.saved_ms += cached[1]
+                return cached
+        start = time.perf_counter()
+        embedding = store.embedding_function.embed_query(query)
+        with self._lock:
+            self._embeddings.put(normalized, (embedding, (time.perf_counter() - start) * 1000))
+        return embedding, 0.0
+
+    def search(self, store, version, query: str, k: int = 4, filter=None, sparse=None) -> Tuple[List[Document], bool]:
+        """
+        store.similarity_search(query, k, filter=filter) through the cache, or
+        hybrid_search with the version's BM25 index when `sparse` is given;
+        returns (docs, cache hit).
+        """
+        from retrieval.hybrid import hybrid_search
+
+        normalized = normalize_query(query)
+        fkey = filter_key(filter)
+        if self.max_entries <= 0 or fkey is None:
+            if sparse is not None:
+                return hybrid_search(store, sparse, query, k=k, filter=filter), False
+            return store.similarity_search(query, k=k, filter=filter), False
+
+        key = (normalized, k, fkey, version)
+        with self._lock:
+            if version != self._version:
+                self._results.clear()
+                self._version = version
+            cached = self._results.get(key)
+            if cached is not None:
+                self.hits += 1
+                self.saved_ms += cached[1]
+                return list(cached[0]), True
+            self.misses += 1
+
+        reused_ms = []
+
+        def embed(text: str) -> List[float]:
+            embedding, saved = self._embed(store, normalized, text)
+            reused_ms.append(saved)
+            return embedding
+
+        start = time.perf_counter()
+        if sparse is not None:
+            docs = hybrid_search(store, sparse, query, k=k, filter=filter, embed=embed)
+        else:
+            docs = store.similarity_search_by_vector(embed(query), k=k, filter=filter)
+        # What a hit on this entry saves: this search plus the embedding, even if it was reused just now.
+        cost_ms = (time.perf_counter() - start) * 1000 + sum(reused_ms)
+        with self._lock:
+            if version == self._version:
+                self._results.put(key, (docs, cost_ms))
+        return list(docs), False
+
+    def clear(self) -> None:
+        with self._lock:
+            self._results.clear()
+            self._embeddings.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "embedding_hits": self.embedding_hits,
+                "saved_ms": round(self.saved_ms, 1),
+                "evictions": self._results.evictions,
+                "expirations": self._results.expirations,
+                "entries": len(self._results),
+                "max_entries": self.max_entries,
+            }
@@ -0,0 +1,204 @@
+import hashlib
+import heapq
+import json
+import os
+import shutil
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.vectorstores import VectorStore
+from langchain_community.vectorstores import FAISS
+from langchain_community.vectorstores.utils import DistanceStrategy
+
+# Written at the index root; each shard is a regular index folder beside it.
+SHARDS_FILE = "shards.json"
+
+
+def shard_of(id_: str, n_shards: int) -> int:
+    """Shard a docstore ID belongs to; stable across runs and Python processes."""
+    return int(hashlib.sha1(id_.encode("utf-8")).hexdigest()[:8], 16) % n_shards
+
+
+def partition(ids: Sequence[str], n_shards: int) -> List[np.ndarray]:
+    """Row positions of `ids` falling into each shard, in their original order."""
+    shards = np.fromiter((shard_of(id_, n_shards) for id_ in ids), dtype=np.int64, count=len(ids))
+    return [np.flatnonzero(shards == i) for i in range(n_shards)]
+
+
+def shard_folder(i: int) -> str:
+    return f"shard-{i:03d}"
+
+
+class ShardedFAISS(VectorStore):
+    """
+    N FAISS stores searched as one. A query is embedded once, every shard is
+    searched concurrently on a thread pool (FAISS releases the GIL while it
+    searches), and the per-shard top-k lists are merged by score, so results
+    match a single index over the same vectors.
+
+    Vectors are assigned to shards by a hash of their docstore ID (shard_of),
+    which lets add_vectors and delete find a chunk's shard without a lookup table.
+    """
+
+    def __init__(self, shards: List[FAISS], embedding_function, max_workers: Optional[int] = None) -> None:
+        if not shards:
+            raise ValueError("ShardedFAISS needs at least one shard.")
+        self.shards = shards
+        self.embedding_function = embedding_function
+        self._pool = ThreadPoolExecutor(max_workers=max_workers or len(shards), thread_name_prefix="faiss-shard")
+
+    @property
+    def embeddings(self):
+        return self.embedding_function
+
+    @property
+    def ntotal(self) -> int:
+        return sum(shard.index.ntotal for shard in self.shards)
+
+    def add_texts(self, texts, metadatas=None, ids=None, **kwargs: Any) -> List[str]:
+        from retrieval.faiss_store import add_vectors
+
+        texts = list(texts)
+        metadatas = metadatas or [{} for _ in texts]
+        docs = [Document(page_content=t, metadata=m) for t, m in zip(texts, metadatas)]
+        vectors = np.asarray(self.embedding_function.embed_documents(texts), dtype=np.float32)
+        return add_vectors(self, docs, vectors, ids)
+
+    @classmethod
+    def from_texts(cls, texts, embedding, metadatas=None, ids=None, shards: int = 2, workers: Optional[int] = 1,
+                   **kwargs: Any) -> "ShardedFAISS":
+        """
+        Embed `texts` and split them by ID across `shards` flat indexes.
+        Flat shards need no training, so by default they are filled in this
+        process; ingest_faiss.py --shards N builds the other index types.
+        """
+        from retrieval.faiss_store import faiss_from_index
+
+        texts = list(texts)
+        metadatas = metadatas or [{} for _ in texts]
+        ids = list(ids) if ids else [str(uuid.uuid4()) for _ in texts]
+        docs = [Document(page_content=t, metadata=m) for t, m in zip(texts, metadatas)]
+        if hasattr(embedding, "embed_documents_array"):
+            vectors = embedding.embed_documents_array(texts)
+        else:
+            vectors = np.asarray(embedding.embed_documents(texts), dtype=np.float32)
+        parts = partition(ids, shards)
+        indexes = build_shard_indexes([vectors[rows] for rows in parts], "flat", workers=workers)
+        stores = [
+            faiss_from_index([docs[i] for i in rows], index, embedding, [ids[i] for i in rows])
+            for rows, index in zip(parts, indexes)
+        ]
+        return cls(stores, embedding, **kwargs)
+
+    def delete(self, ids: Optional[List[str]] = None, **kwargs: Any) -> Optional[bool]:
+        ids = list(ids or [])
+        for shard, rows in zip(self.shards, partition(ids, len(self.shards))):
+            if len(rows):
+                shard.delete([ids[i] for i in rows], **kwargs)
+        return True
+
+    def _select_relevance_score_fn(self) -> Callable[[float], float]:
+        return self.shards[0]._select_relevance_score_fn()
+
+    def similarity_search_with_score_by_vector(
+        self,
+        embedding: List[float],
+        k: int = 4,
+        filter: Optional[Union[Callable, Dict[str, Any]]] = None,
+        fetch_k: int = 20,
+        **kwargs: Any,
+    ) -> List[Tuple[Document, float]]:
+        futures = [
+            self._pool.submit(shard.similarity_search_with_score_by_vector, embedding, k, filter, fetch_k, **kwargs)
+            for shard in self.shards
+        ]
+        hits = [hit for future in futures for hit in future.result()]
+        # L2 distances: smaller is closer. Inner product: larger is closer.
+        if self.shards[0].distance_strategy == DistanceStrategy.MAX_INNER_PRODUCT:
+            return heapq.nlargest(k, hits, key=lambda hit: hit[1])
+        return heapq.nsmallest(k, hits, key=lambda hit: hit[1])
+
+    def similarity_search_with_score(self, query: str, k: int = 4, **kwargs: Any) -> List[Tuple[Document, float]]:
+        embedding = self.embedding_function.embed_query(query)
+        return self.similarity_search_with_score_by_vector(embedding, k, **kwargs)
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score_by_vector(embedding, k, **kwargs)]
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k, **kwargs)]
+
+
+def _build_shard(task) -> np.ndarray:
+    """Pool worker: train and fill one shard's index, returned serialized (FAISS indexes do not pickle)."""
+    import faiss
+    from retrieval.index_factory import make_index
+
+    index_type, vectors, train_vectors, nlist, hnsw_m = task
+    index = make_index(index_type, vectors.shape[1], train_vectors, nlist=nlist, hnsw_m=hnsw_m, n_total=len(vectors))
+    index.add(vectors)
+    return faiss.serialize_index(index)
+
+
+def build_shard_indexes(
+    parts: List[np.ndarray],
+    index_type: str,
+    nlist: Optional[int] = None,
+    hnsw_m: Optional[int] = None,
+    workers: Optional[int] = None,
+) -> List:
+    """
+    One FAISS index per (n, dim) float32 array in `parts`, trained and filled
+    in parallel processes. Each shard trains on its own vectors (an empty one
+    borrows the others' so every shard can take later additions).
+    """
+    import multiprocessing
+    import faiss
+
+    everything = np.concatenate(parts)
+    tasks = [
+        (index_type, np.ascontiguousarray(part, dtype=np.float32), part if len(part) else everything, nlist, hnsw_m)
+        for part in parts
+    ]
+    workers = min(len(tasks), workers or os.cpu_count() or 1)
+    if workers == 1:
+        blobs = [_build_shard(task) for task in tasks]
+    else:
+        # Spawned, not forked: the parent's OpenMP and torch thread pools do not survive a fork.
+        with multiprocessing.get_context("spawn").Pool(workers) as pool:
+            blobs = pool.map(_build_shard, tasks)
+    return [faiss.deserialize_index(blob) for blob in blobs]
+
+
+def save_sharded(store: ShardedFAISS, folder: str, docstore: Optional[str] = None) -> None:
+    from retrieval.faiss_store import save_vectorstore
+
+    os.makedirs(folder, exist_ok=True)
+    folders = [shard_folder(i) for i in range(len(store.shards))]
+    for shard, name in zip(store.shards, folders):
+        save_vectorstore(shard, os.path.join(folder, name), docstore)
+    path = os.path.join(folder, SHARDS_FILE)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump({"shards": folders}, f, indent=2)
+    os.replace(path + ".tmp", path)
+    # Shards left over from a build with more of them.
+    for name in os.listdir(folder):
+        if name.startswith("shard-") and name not in folders:
+            shutil.rmtree(os.path.join(folder, name), ignore_errors=True)
+
+
+def load_sharded(folder: str, embeddings, mmap: bool = False) -> ShardedFAISS:
+    """Load every shard listed in shards.json (concurrently) and apply the root's tuned search params to each."""
+    from retrieval.faiss_store import load_vectorstore
+    from retrieval.index_factory import apply_search_params, load_search_params
+
+    with open(os.path.join(folder, SHARDS_FILE), "r", encoding="utf-8") as f:
+        folders = json.load(f)["shards"]
+    with ThreadPoolExecutor(max_workers=len(folders)) as pool:
+        shards = list(pool.map(lambda name: load_vectorstore(os.path.join(folder, name), embeddings, mmap), folders))
+    params = load_search_params(folder)
+    for shard in shards:
+        apply_search_params(shard.index, params)
+    return ShardedFAISS(shards, embeddings)
@@ -0,0 +1,258 @@
+"""
+SQLite-backed docstore for saved FAISS indexes.
+
+FAISS.save_local pickles every chunk's text and metadata into index.pkl, and
+load_local unpickles all of it at startup. The compact format keeps them in
+docstore.sqlite instead:
+
+    docs(id TEXT PRIMARY KEY, page_content TEXT, metadata TEXT)  -- metadata as JSON
+    positions(pos INTEGER PRIMARY KEY, id TEXT)                  -- FAISS row -> docstore id
+
+Loading opens the file and reads nothing else; a search fetches only the rows
+of its k hits. Convert an existing index folder (sharded or not) with
+
+    python -m retrieval.sqlite_docstore vectorstore/faiss_index
+"""
+import json
+import os
+import sqlite3
+import threading
+from collections.abc import MutableMapping
+from typing import Dict, Iterator, List, Tuple, Union
+from langchain_core.documents import Document
+from langchain_community.docstore.base import AddableMixin, Docstore
+from langchain_community.docstore.in_memory import InMemoryDocstore
+
+DOCSTORE_FILE = "docstore.sqlite"
+PICKLE_FILE = "index.pkl"
+DOCSTORE_FORMATS = ("pickle", "sqlite")
+
+Row = Tuple[str, str, str]
+SCHEMA = (
+    "CREATE TABLE docs (id TEXT PRIMARY KEY, page_content TEXT NOT NULL, metadata TEXT NOT NULL)",
+    "CREATE TABLE positions (pos INTEGER PRIMARY KEY, id TEXT NOT NULL)",
+)
+
+
+class SQLiteDocstore(Docstore, AddableMixin):
+    """
+    Read-only view of a docstore.sqlite file. add() and delete() go to an
+    in-memory overlay that write_docstore folds into a new file, so the file
+    on disk always matches the index saved with it.
+
+    One connection is shared by all threads behind a lock; lookups are a
+    single primary-key read each.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._added: Dict[str, Document] = {}
+        self._deleted = set()
+
+    def query(self, sql: str, params: tuple = ()) -> List[tuple]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def scan(self, table: str, columns: str, batch: int = 10_000) -> Iterator[tuple]:
+        """All rows of `table` in rowid order, a batch at a time, without holding the lock in between."""
+        last = -1
+        while True:
+            rows = self.query(f"SELECT rowid, {columns} FROM {table} WHERE rowid > ? ORDER BY rowid LIMIT ?", (last, batch))
+            for row in rows:
+                yield row[1:]
+            if len(rows) < batch:
+                return
+            last = rows[-1][0]
+
+    def _stored(self, id_: str) -> bool:
+        return id_ not in self._deleted and bool(self.query("SELECT 1 FROM docs WHERE id = ?", (id_,)))
+
+    def search(self, search: str) -> Union[str, Document]:
+        if search in self._added:
+            return self._added[search]
+        if search not in self._deleted:
+            rows = self.query("SELECT page_content, metadata FROM docs WHERE id = ?", (search,))
+            if rows:
+                return Document(id=search, page_content=rows[0][0], metadata=json.loads(rows[0][1]))
+        return f"ID {search} not found."
+
+    def add(self, texts: Dict[str, Document]) -> None:
+        overlapping = [id_ for id_ in texts if id_ in self._added or self._stored(id_)]
+        if overlapping:
+            raise ValueError(f"Tried to add ids that already exist: {overlapping}")
+        self._added.update(texts)
+
+    def delete(self, ids: List) -> None:
+        missing = [id_ for id_ in ids if id_ not in self._added and not self._stored(id_)]
+        if missing:
+            raise ValueError(f"Tried to delete ids that does not exist: {missing}")
+        for id_ in ids:
+            if self._added.pop(id_, None) is None:
+                self._deleted.add(id_)
+
+    def rows(self) -> Iterator[Row]:
+        """Every live (id, page_content, metadata JSON) row, overlay included."""
+        for row in self.scan("docs", "id, page_content, metadata"):
+            if row[0] not in self._deleted:
+                yield row
+        for id_, doc in self._added.items():
+            yield id_, doc.page_content, json.dumps(doc.metadata, default=str)
+
+
+class SQLiteIdMap(MutableMapping):
+    """
+    FAISS row -> docstore id, read from the positions table on demand.
+    New rows (FAISS only ever appends) are kept in memory until the next save;
+    FAISS.delete replaces the whole mapping with a plain dict.
+    """
+
+    def __init__(self, docstore: SQLiteDocstore) -> None:
+        self._docstore = docstore
+        self._stored = docstore.query("SELECT COUNT(*) FROM positions")[0][0]
+        self._appended: Dict[int, str] = {}
+
+    def __getitem__(self, pos) -> str:
+        pos = int(pos)  # FAISS hands over numpy ints, which sqlite3 cannot bind
+        if pos in self._appended:
+            return self._appended[pos]
+        if 0 <= pos < self._stored:
+            rows = self._docstore.query("SELECT id FROM positions WHERE pos = ?", (pos,))
+            if rows:
+                return rows[0][0]
+        raise KeyError(pos)
+
+    def __setitem__(self, pos, id_: str) -> None:
+        pos = int(pos)
+        if pos < self._stored:
+            raise KeyError(f"Position {pos} is already stored; FAISS rows are only appended.")
+        self._appended[pos] = id_
+
+    def __delitem__(self, pos) -> None:
+        raise KeyError(f"Cannot delete position {pos}; FAISS.delete renumbers the whole mapping.")
+
+    def __len__(self) -> int:
+        return self._stored + len(self._appended)
+
+    def __iter__(self) -> Iterator[int]:
+        yield from range(self._stored)
+        yield from sorted(self._appended)
+
+    def items(self) -> Iterator[Tuple[int, str]]:
+        # One scan instead of one query per row.
+        yield from self._docstore.scan("positions", "pos, id")
+        yield from sorted(self._appended.items())
+
+    def values(self) -> Iterator[str]:
+        return (id_ for _, id_ in self.items())
+
+
+def _doc_rows(docstore) -> Iterator[Row]:
+    if isinstance(docstore, SQLiteDocstore):
+        return docstore.rows()
+    # InMemoryDocstore
+    return (
+        (id_, doc.page_content, json.dumps(doc.metadata, default=str))
+        for id_, doc in docstore._dict.items()
+    )
+
+
+def in_memory(docstore: SQLiteDocstore, index_to_docstore_id) -> Tuple[InMemoryDocstore, Dict[int, str]]:
+    """Everything read back into the objects FAISS.save_local pickles."""
+    docs = {
+        id_: Document(id=id_, page_content=text, metadata=json.loads(metadata))
+        for id_, text, metadata in docstore.rows()
+    }
+    return InMemoryDocstore(docs), dict(index_to_docstore_id.items())
+
+
+def write_docstore(path: str, docstore, index_to_docstore_id) -> None:
+    """Write `docstore` and the FAISS position map to a fresh SQLite file, swapped in by rename."""
+    tmp = path + ".tmp"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    conn = sqlite3.connect(tmp)
+    try:
+        conn.execute("PRAGMA journal_mode = OFF")
+        for statement in SCHEMA:
+            conn.execute(statement)
+        conn.executemany("INSERT INTO docs VALUES (?, ?, ?)", _doc_rows(docstore))
+        conn.executemany("INSERT INTO positions VALUES (?, ?)", ((int(p), i) for p, i in index_to_docstore_id.items()))
+        conn.commit()
+    finally:
+        conn.close()
+    os.replace(tmp, path)
+
+
+class DocstoreWriter:
+    """
+    Builds a docstore.sqlite batch by batch, for builds that never hold all
+    chunk text in memory. Chunks get FAISS positions in the order added;
+    close() returns the finished file opened as a SQLiteDocstore.
+    """
+
+    def __init__(self, path: str) -> None:
+        if os.path.exists(path):
+            os.remove(path)
+        self.path = path
+        self.count = 0
+        # Batches come from the streaming sink's thread; close() may come from another.
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode = OFF")
+        for statement in SCHEMA:
+            self._conn.execute(statement)
+
+    def add(self, docs: List[Document], ids: List[str]) -> None:
+        self._conn.executemany(
+            "INSERT INTO docs VALUES (?, ?, ?)",
+            ((id_, doc.page_content, json.dumps(doc.metadata, default=str)) for id_, doc in zip(ids, docs)),
+        )
+        self._conn.executemany(
+            "INSERT INTO positions VALUES (?, ?)", ((self.count + i, id_) for i, id_ in enumerate(ids))
+        )
+        self._conn.commit()
+        self.count += len(ids)
+
+    def close(self) -> SQLiteDocstore:
+        self._conn.commit()
+        self._conn.close()
+        return SQLiteDocstore(self.path)
+
+
+def load_compact(folder: str, embeddings, index):
+    """The FAISS store of a folder saved with docstore="sqlite", around its already-read `index`."""
+    from langchain_community.vectorstores import FAISS
+
+    docstore = SQLiteDocstore(os.path.join(folder, DOCSTORE_FILE))
+    return FAISS(
+        embedding_function=embeddings,
+        index=index,
+        docstore=docstore,
+        index_to_docstore_id=SQLiteIdMap(docstore),
+    )
+
+
+def convert(folder: str) -> None:
+    """
+    Rewrite a pickled index folder (or every shard of a sharded one) in the
+    compact format. For a versioned index root this converts the current version.
+    """
+    from retrieval.faiss_store import load_vectorstore, save_vectorstore
+    from retrieval.index_handle import index_folder
+
+    folder = index_folder(folder)
+    store = load_vectorstore(folder, None)
+    save_vectorstore(store, folder, docstore="sqlite")
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+    parser = argparse.ArgumentParser(description="Convert a FAISS index folder from index.pkl to docstore.sqlite")
+    parser.add_argument("folders", nargs="+")
+    for folder in parser.parse_args().folders:
+        convert(folder)
+        print(f"✅ Converted {folder} to {DOCSTORE_FILE}")
@@ -6,6 +6,7 @@ class SelfRAGState(BaseModel):
     question : str
 
     retrieved_docs : List[str] = []
+    index_version : Optional[str] = None
     corrected_docs : Optional[list[str]] = None
 
     final_context : str = ""
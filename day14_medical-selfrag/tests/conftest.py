@@ -0,0 +1,12 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+from tests.helpers import registered_stub_model
+
+
+@pytest.fixture
+def stub_model():
+    """A StubModel that LocalEmbeddingModel(helpers.STUB_MODEL) loads, for the duration of one test."""
+    with registered_stub_model() as model:
+        yield model
@@ -0,0 +1,122 @@
+"""
+Stubs shared by the test modules: stand-in embedding models and corpora, so
+FAISS, ingest and retrieval code runs without downloading a model.
+"""
+import os
+import zlib
+from contextlib import contextmanager
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from embeddings.model_registry import _registry
+from retrieval.faiss_store import faiss_from_vectors, save_vectorstore
+from retrieval.index_handle import new_version, publish_version
+
+STUB_MODEL = "stub-model"
+
+# 200 unit vectors and their 'chunk N' documents, for index and store tests.
+rng = np.random.default_rng(0)
+VECTORS = rng.normal(size=(200, 64)).astype(np.float32)
+VECTORS /= np.linalg.norm(VECTORS, axis=1, keepdims=True)
+DOCS = [Document(page_content=f"chunk {i}", metadata={"i": i}) for i in range(len(VECTORS))]
+
+
+class LookupEmbeddings(Embeddings):
+    """Embeds 'chunk N' as VECTORS[N]."""
+
+    def embed_documents(self, texts):
+        return [self.embed_query(t) for t in texts]
+
+    def embed_query(self, text):
+        return VECTORS[int(text.split()[1])].tolist()
+
+
+def publish(root, n_docs):
+    """Save the first `n_docs` DOCS as a new index version under `root` and publish it."""
+    version, folder = new_version(root)
+    save_vectorstore(faiss_from_vectors(DOCS[:n_docs], VECTORS[:n_docs], LookupEmbeddings()), folder)
+    publish_version(root, version)
+    return version
+
+
+class KeywordEmbeddings(Embeddings):
+    """Tiny deterministic embedding: one dimension per keyword."""
+
+    KEYWORDS = ["hypertension", "diabetes", "stroke", "kidney"]
+
+    def _vector(self, text):
+        lowered = text.lower()
+        return np.array([float(k in lowered) for k in self.KEYWORDS], dtype=np.float32)
+
+    def embed_documents_array(self, texts):
+        return np.stack([self._vector(t) for t in texts])
+
+    def embed_documents(self, texts):
+        return self.embed_documents_array(texts).tolist()
+
+    def embed_query(self, text):
+        return self._vector(text).tolist()
+
+
+class CountingEmbeddings(KeywordEmbeddings):
+    """KeywordEmbeddings padded to 8 dims, counting embedded texts."""
+
+    KEYWORDS = KeywordEmbeddings.KEYWORDS + ["asthma", "fever", "cough", "sepsis"]
+
+    def __init__(self):
+        self.embedded = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def embed_documents_array(self, texts):
+        self.embedded += len(texts)
+        return super().embed_documents_array(texts)
+
+
+def write(folder, name, text):
+    with open(os.path.join(folder, name), "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+class StubModel:
+    """SentenceTransformer stand-in: a fixed random vector per text, one token per word."""
+
+    max_seq_length = 128
+
+    def __init__(self, dim=8):
+        self.dim = dim
+        self.batches = []
+
+    def get_sentence_embedding_dimension(self):
+        return self.dim
+
+    def tokenizer(self, texts, add_special_tokens=True, truncation=True, max_length=None):
+        lengths = [min(len(text.split()) + 2 * add_special_tokens, max_length or 10**9) for text in texts]
+        return {"input_ids": [[0] * n for n in lengths]}
+
+    def encode(self, texts, convert_to_numpy=True, batch_size=32, **kwargs):
+        self.batches.append(list(texts))
+        return np.stack([
+            np.random.default_rng(zlib.crc32(text.encode())).normal(size=self.dim).astype(np.float32)
+            for text in texts
+        ])
+
+
+@contextmanager
+def registered_stub_model(dim=8):
+    """Serve a fresh StubModel as STUB_MODEL from the model registry, removing it afterwards."""
+    key = _registry._key(STUB_MODEL, None, "torch")
+    previous = _registry._models.get(key)
+    model = StubModel(dim)
+    _registry._models[key] = model
+    try:
+        yield model
+    finally:
+        if previous is None:
+            _registry._models.pop(key, None)
+        else:
+            _registry._models[key] = previous
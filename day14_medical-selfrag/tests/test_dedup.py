@@ -0,0 +1,127 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import tempfile
+import ingest.ingest_faiss as ingest_faiss
+from ingest.dedup import NearDuplicateIndex, load_near_duplicates
+from ingest.manifest import chunk_ids, diff_sources
+from retrieval.faiss_store import faiss_from_vectors
+from tests.helpers import CountingEmbeddings, write
+
+DEFINITION = (
+    "Hypertension, also known as high blood pressure, is a long-term medical condition in which the "
+    "blood pressure in the arteries is persistently elevated. High blood pressure usually does not "
+    "cause symptoms, but it is a major risk factor for stroke, coronary artery disease, heart failure, "
+    "atrial fibrillation, peripheral arterial disease, vision loss and chronic kidney disease."
+)
+
+
+def test_near_duplicates_are_detected():
+    index = NearDuplicateIndex(threshold=0.8)
+    assert index.add("a", DEFINITION) is None
+    assert index.add("b", DEFINITION.replace("long-term", "chronic")) == "a"
+    assert index.add("c", "Diabetes mellitus is a group of metabolic disorders with high blood sugar.") is None
+    assert index.add("d", DEFINITION + " See your doctor.") == "a"
+
+
+def test_removing_a_representative_reingests_its_duplicates():
+    with tempfile.TemporaryDirectory() as data_dir:
+        previous = ingest_faiss.DATA_DIR
+        ingest_faiss.DATA_DIR = data_dir
+        try:
+            write(data_dir, "aha.txt", DEFINITION)
+            write(data_dir, "info.txt", DEFINITION.replace("long-term", "chronic"))
+            write(data_dir, "kidney.txt", "Kidney disease is a gradual loss of kidney function.")
+
+            sources = ingest_faiss.list_sources()
+            records, _, _ = diff_sources(sources, {})
+            chunks = ingest_faiss.split_documents(ingest_faiss.load_documents(sources.values()))
+            chunks, ids, files = ingest_faiss.assign_chunk_ids(chunks, sources, records)
+            chunks, ids, files = ingest_faiss.dedupe_chunks(chunks, ids, files, 0.8)
+            assert files["info.txt"]["chunk_ids"] == []
+            dropped = chunk_ids("info.txt", records["info.txt"]["sha256"], 1)[0]
+            assert files["info.txt"]["duplicates"] == {dropped: files["aha.txt"]["chunk_ids"][0]}
+
+            embeddings = CountingEmbeddings()
+            store = faiss_from_vectors(chunks, embeddings.embed_documents_array([c.page_content for c in chunks]), embeddings, ids)
+            assert store.index.ntotal == 2
+
+            os.remove(os.path.join(data_dir, "aha.txt"))
+            files, removed, added = ingest_faiss.update_faiss_index(store, ingest_faiss.list_sources(), files, dedup_threshold=0.8)
+            assert (removed, added) == (1, 1)
+            assert len(files["info.txt"]["chunk_ids"]) == 1
+            assert "chronic" in store.similarity_search("hypertension and stroke", k=1)[0].page_content
+        finally:
+            ingest_faiss.DATA_DIR = previous
+
+
+def test_update_dedupes_new_chunks_against_unchanged_files():
+    with tempfile.TemporaryDirectory() as data_dir:
+        previous = ingest_faiss.DATA_DIR
+        ingest_faiss.DATA_DIR = data_dir
+        try:
+            write(data_dir, "aha.txt", DEFINITION)
+            sources = ingest_faiss.list_sources()
+            records, _, _ = diff_sources(sources, {})
+            chunks = ingest_faiss.split_documents(ingest_faiss.load_documents(sources.values()))
+            chunks, ids, files = ingest_faiss.assign_chunk_ids(chunks, sources, records)
+            embeddings = CountingEmbeddings()
+            store = faiss_from_vectors(chunks, embeddings.embed_documents_array([c.page_content for c in chunks]), embeddings, ids)
+
+            # info.txt arrives in a later update and copies the already indexed aha.txt.
+            write(data_dir, "info.txt", DEFINITION.replace("long-term", "chronic"))
+            files, removed, added = ingest_faiss.update_faiss_index(store, ingest_faiss.list_sources(), files, dedup_threshold=0.8)
+            assert (removed, added) == (0, 0) and store.index.ntotal == 1
+            assert list(files["info.txt"]["duplicates"].values()) == files["aha.txt"]["chunk_ids"]
+
+            os.remove(os.path.join(data_dir, "aha.txt"))
+            files, removed, added = ingest_faiss.update_faiss_index(store, ingest_faiss.list_sources(), files, dedup_threshold=0.8)
+            assert (removed, added) == (1, 1)
+            assert "chronic" in store.similarity_search("hypertension", k=1)[0].page_content
+        finally:
+            ingest_faiss.DATA_DIR = previous
+
+
+def test_saved_signatures_spare_an_update_from_reading_indexed_text():
+    with tempfile.TemporaryDirectory() as data_dir, tempfile.TemporaryDirectory() as folder:
+        previous = ingest_faiss.DATA_DIR
+        ingest_faiss.DATA_DIR = data_dir
+        try:
+            write(data_dir, "aha.txt", DEFINITION)
+            write(data_dir, "kidney.txt", "Kidney disease is a gradual loss of kidney function.")
+            sources = ingest_faiss.list_sources()
+            records, _, _ = diff_sources(sources, {})
+            chunks = ingest_faiss.split_documents(ingest_faiss.load_documents(sources.values()))
+            chunks, ids, files = ingest_faiss.assign_chunk_ids(chunks, sources, records)
+            near = NearDuplicateIndex(0.8)
+            chunks, ids, files = ingest_faiss.dedupe_chunks(chunks, ids, files, 0.8, near)
+            embeddings = CountingEmbeddings()
+            store = faiss_from_vectors(chunks, embeddings.embed_documents_array([c.page_content for c in chunks]), embeddings, ids)
+            near.save(folder)
+            assert load_near_duplicates(folder, 0.9) is None
+            saved = load_near_duplicates(folder, 0.8)
+            assert len(saved) == 2
+
+            def no_reads(id_):
+                raise AssertionError(f"read back chunk {id_}")
+
+            store.docstore.search = no_reads
+            os.remove(os.path.join(data_dir, "kidney.txt"))
+            write(data_dir, "info.txt", DEFINITION.replace("long-term", "chronic"))
+            files, removed, added = ingest_faiss.update_faiss_index(
+                store, ingest_faiss.list_sources(), files, dedup_threshold=0.8, near_duplicates=saved,
+            )
+            assert (removed, added) == (1, 0)
+            assert list(files["info.txt"]["duplicates"].values()) == files["aha.txt"]["chunk_ids"]
+            # The signatures now match the index, ready to be saved with the new version.
+            assert saved.sync({id_: None for id_ in files["aha.txt"]["chunk_ids"]}) == (0, 0)
+        finally:
+            ingest_faiss.DATA_DIR = previous
+
+
+if __name__ == "__main__":
+    test_near_duplicates_are_detected()
+    test_removing_a_representative_reingests_its_duplicates()
+    test_update_dedupes_new_chunks_against_unchanged_files()
+    test_saved_signatures_spare_an_update_from_reading_indexed_text()
+    print("✅ Near-duplicate chunks are collapsed and tracked")
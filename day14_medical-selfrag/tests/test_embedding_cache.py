@@ -0,0 +1,49 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import tempfile
+import numpy as np
+from embeddings.embedding_cache import EmbeddingCache, text_key
+
+
+def test_embedding_cache_roundtrip_and_lru():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = EmbeddingCache(cache_dir, "test-model", dim=4, max_entries=2)
+        keys = [text_key("Hypertension  is high\nblood pressure."), text_key("Normal BP is 120/80 mmHg.")]
+        vectors = np.arange(8, dtype=np.float32).reshape(2, 4)
+        cache.put_many(keys, vectors)
+
+        # Whitespace-normalized text maps to the same entry.
+        assert text_key("Hypertension is high blood pressure.") == keys[0]
+        hit = cache.get_many([keys[0]])[0]
+        assert np.array_equal(hit, vectors[0])
+
+        # keys[1] is now least recently used and gets evicted.
+        cache.put_many([text_key("Stage 2 hypertension")], np.ones((1, 4), dtype=np.float32))
+        assert cache.get_many([keys[1]])[0] is None
+        cache.flush()
+
+        reopened = EmbeddingCache(cache_dir, "test-model", dim=4, max_entries=2)
+        assert np.array_equal(reopened.get_many([keys[0]])[0], vectors[0])
+        print(cache.stats())
+
+
+def test_shared_directory_never_returns_another_texts_vector():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        first = EmbeddingCache(cache_dir, "test-model", dim=4, max_entries=4)
+        # Opened before `first` writes, so it also sees slot 0 as free.
+        second = EmbeddingCache(cache_dir, "test-model", dim=4, max_entries=4)
+        aspirin, warfarin = text_key("aspirin"), text_key("warfarin")
+        first.put_many([aspirin], np.ones((1, 4), dtype=np.float32))
+        second.put_many([warfarin], np.full((1, 4), 2, dtype=np.float32))
+
+        assert first.get_many([aspirin]) == [None]
+        assert np.array_equal(second.get_many([warfarin])[0], np.full(4, 2, dtype=np.float32))
+        first.put_many([aspirin], np.ones((1, 4), dtype=np.float32))
+        assert np.array_equal(first.get_many([aspirin])[0], np.ones(4, dtype=np.float32))
+
+
+if __name__ == "__main__":
+    print("🗃️ Testing EmbeddingCache...\n")
+    test_embedding_cache_roundtrip_and_lru()
+    test_shared_directory_never_returns_another_texts_vector()
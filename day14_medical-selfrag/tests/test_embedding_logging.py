@@ -0,0 +1,97 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import io
+import logging
+import logging.handlers
+import time
+from embeddings import embedding_logging
+from embeddings.embedding_logging import configure_logging, log_call, logger
+
+
+class Capture(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+def test_calls_are_aggregated_not_logged_individually():
+    configure_logging(debug=False, sample_rate=0.0, summary_seconds=3600)
+    assert any(isinstance(h, logging.handlers.QueueHandler) for h in logger.handlers)
+    capture = Capture()
+    logger.addHandler(capture)
+    try:
+        for _ in range(100):
+            log_call("embed_query", "m", 1, time.perf_counter())
+        log_call("embed_documents", "m", 32, time.perf_counter())
+        assert capture.messages == []
+
+        embedding_logging._stats.flush()
+        assert len(capture.messages) == 2
+        assert capture.messages[0].startswith("embed_documents: 1 calls, 32 texts")
+        assert capture.messages[1].startswith("embed_query: 100 calls, 100 texts")
+    finally:
+        logger.removeHandler(capture)
+
+
+def test_sampling_and_debug():
+    configure_logging(debug=False, sample_rate=1.0, summary_seconds=3600)
+    capture = Capture()
+    logger.addHandler(capture)
+    try:
+        log_call("embed_query", "m", 1, time.perf_counter())
+        assert "(sampled)" in capture.messages[0]
+
+        configure_logging(debug=True)
+        assert not any(isinstance(h, logging.handlers.QueueHandler) for h in logger.handlers)
+        logger.addHandler(capture)
+        log_call("embed_query", "m", 1, time.perf_counter())
+        assert capture.messages[-1].startswith("embed_query: embedded 1 texts")
+    finally:
+        logger.removeHandler(capture)
+        configure_logging(debug=False, sample_rate=0.01, summary_seconds=60)
+        embedding_logging._stats.flush()
+
+
+def test_summary_is_written_without_further_calls():
+    configure_logging(debug=False, sample_rate=0.0, summary_seconds=0.3)
+    capture = Capture()
+    logger.addHandler(capture)
+    try:
+        for _ in range(5):
+            log_call("embed_documents", "m", 8, time.perf_counter())
+        # A burst, then silence: the timer still writes the summary, covering only the window.
+        deadline = time.monotonic() + 5
+        while not capture.messages and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert len(capture.messages) == 1
+        assert capture.messages[0].startswith("embed_documents: 5 calls, 40 texts")
+        assert capture.messages[0].endswith("in the last 0s")
+
+        time.sleep(0.6)
+        assert len(capture.messages) == 1
+    finally:
+        logger.removeHandler(capture)
+        configure_logging(debug=False, sample_rate=0.01, summary_seconds=60)
+
+
+def test_handler_writes_to_the_current_stderr():
+    handler = embedding_logging.StderrHandler()
+    original = sys.stderr
+    try:
+        sys.stderr = replacement = io.StringIO()
+        assert handler.stream is replacement
+    finally:
+        sys.stderr = original
+    assert handler.stream is original
+
+
+if __name__ == "__main__":
+    test_calls_are_aggregated_not_logged_individually()
+    test_sampling_and_debug()
+    test_summary_is_written_without_further_calls()
+    test_handler_writes_to_the_current_stderr()
+    print("✅ Embedding logging is aggregated, sampled and queue-backed")
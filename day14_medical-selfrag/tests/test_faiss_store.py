@@ -0,0 +1,26 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from langchain_core.documents import Document
+from retrieval.faiss_store import faiss_from_documents
+from tests.helpers import KeywordEmbeddings
+
+
+def test_faiss_from_documents_matches_from_documents():
+    docs = [
+        Document(page_content="Hypertension is high blood pressure.", metadata={"source": "aha"}),
+        Document(page_content="Diabetes affects blood sugar.", metadata={"source": "cdc"}),
+        Document(page_content="Kidney disease can cause hypertension.", metadata={"source": "nih"}),
+    ]
+    store = faiss_from_documents(docs, KeywordEmbeddings(), ids=["a", "b", "c"])
+
+    assert store.index.ntotal == 3
+    assert store.index_to_docstore_id == {0: "a", 1: "b", 2: "c"}
+    hits = store.similarity_search("diabetes", k=1)
+    assert hits[0].page_content == docs[1].page_content
+    assert hits[0].metadata == {"source": "cdc"}
+
+
+if __name__ == "__main__":
+    test_faiss_from_documents_matches_from_documents()
+    print("✅ faiss_from_documents works")
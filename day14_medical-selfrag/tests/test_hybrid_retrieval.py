@@ -0,0 +1,98 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import tempfile
+import ingest.ingest_faiss as ingest_faiss
+from langchain_core.documents import Document
+from retrieval.bm25 import BM25Index, load_bm25, tokenize
+from retrieval.faiss_store import faiss_from_documents
+from retrieval.hybrid import build_bm25, hybrid_search, reciprocal_rank_fusion
+from retrieval.index_handle import IndexHandle, index_folder
+from retrieval.query_cache import QueryCache
+from tests.helpers import KeywordEmbeddings
+
+TEXTS = {
+    "aha": "Hypertension is high blood pressure, at or above 130/80 mm Hg.",
+    "who": "Uncontrolled hypertension damages the heart and kidneys.",
+    "ace": "Lisinopril 10 mg daily, an ACE inhibitor, treats hypertension.",
+    "cdc": "Diabetes affects blood sugar.",
+    "nih": "Stroke risk rises with hypertension.",
+}
+
+
+def make_store():
+    docs = [Document(page_content=text, metadata={"source": id_}) for id_, text in TEXTS.items()]
+    return faiss_from_documents(docs, KeywordEmbeddings(), ids=list(TEXTS))
+
+
+def test_bm25_ranks_exact_terms_and_stays_in_sync():
+    assert tokenize("BP of 130/80 mmHg is high") == ["bp", "130/80", "130", "80", "mmhg", "high"]
+    index = BM25Index()
+    index.add(list(TEXTS), TEXTS.values())
+    assert [id_ for id_, _ in index.search("LISINOPRIL dose", k=2)] == ["ace"]
+    assert index.search("reading 130/80", k=1)[0][0] == "aha"
+    assert index.search("aspirin") == []
+
+    index.delete(["ace", "missing"])
+    assert "ace" not in index and len(index) == 4 and index.search("lisinopril") == []
+    assert index.search("hypertension", k=4)[0][0] in {"aha", "who", "nih"}
+
+    with tempfile.TemporaryDirectory() as folder:
+        index.save(folder)
+        loaded = load_bm25(folder)
+        assert loaded.search("blood sugar", k=4) == index.search("blood sugar", k=4)
+        assert loaded.sync({"aha": TEXTS["aha"], "ace": TEXTS["ace"]}) == (3, 1)
+        assert {id_ for id_, _ in loaded.search("hypertension", k=4)} == {"ace", "aha"}
+        assert load_bm25(os.path.join(folder, "no-such-index")) is None
+
+
+def test_rrf_and_hybrid_search_surface_exact_term_matches():
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["c", "a"]])
+    assert [key for key, _ in fused] == ["a", "c", "b"]
+
+    store = make_store()
+    sparse, dropped, tokenized = build_bm25(store)
+    assert (len(sparse), dropped, tokenized) == (5, 0, 5)
+
+    # KeywordEmbeddings only sees "hypertension": every hypertension chunk ties for dense rank.
+    query = "hypertension lisinopril"
+    assert store.similarity_search(query, k=1)[0].id != "ace"
+    docs = hybrid_search(store, sparse, query, k=2)
+    assert docs[0].id == "ace" and len(docs) == 2
+
+    filtered = hybrid_search(store, sparse, query, k=2, filter={"source": {"$in": ["aha", "nih"]}})
+    assert {doc.id for doc in filtered} == {"aha", "nih"}
+
+
+def test_ingest_saves_bm25_and_handle_searches_hybrid():
+    with tempfile.TemporaryDirectory() as root:
+        previous = ingest_faiss.INDEX_DIR
+        ingest_faiss.INDEX_DIR = root
+        try:
+            settings = {"index_type": "flat"}
+            store = make_store()
+            ingest_faiss.save_index(store, settings, {"a.txt": {}})
+            assert len(load_bm25(index_folder(root))) == 5
+
+            # An update only tokenizes what changed.
+            store.delete(["cdc"])
+            store.add_texts(["Amlodipine 5 mg lowers blood pressure in hypertension."], ids=["ccb"])
+            ingest_faiss.save_index(store, settings, {"a.txt": {}})
+            sparse = load_bm25(index_folder(root))
+            assert "ccb" in sparse and "cdc" not in sparse and len(sparse) == 5
+
+            handle = IndexHandle(root, KeywordEmbeddings, cache=QueryCache(ttl_seconds=60), hybrid=True)
+            _, docs, hit = handle.search("amlodipine for hypertension", k=1)
+            assert docs[0].id == "ccb" and not hit
+            assert handle.search("Amlodipine for  hypertension", k=1)[2]
+            dense_only = IndexHandle(root, KeywordEmbeddings)
+            assert dense_only.search("amlodipine for hypertension", k=1)[1][0].id != "ccb"
+        finally:
+            ingest_faiss.INDEX_DIR = previous
+
+
+if __name__ == "__main__":
+    test_bm25_ranks_exact_terms_and_stays_in_sync()
+    test_rrf_and_hybrid_search_surface_exact_term_matches()
+    test_ingest_saves_bm25_and_handle_searches_hybrid()
+    print("✅ Hybrid BM25 + FAISS retrieval fuses exact-term matches")
@@ -0,0 +1,72 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import tempfile
+import ingest.ingest_faiss as ingest_faiss
+from ingest.manifest import diff_sources
+from retrieval.faiss_store import faiss_from_vectors, load_vectorstore, save_vectorstore
+from retrieval.matryoshka import MatryoshkaFAISS, truncate
+from tests.helpers import CountingEmbeddings, write
+
+
+def full_build(embeddings, truncate_dim=None):
+    sources = ingest_faiss.list_sources()
+    records, _, _ = diff_sources(sources, {})
+    chunks = ingest_faiss.split_documents(ingest_faiss.load_documents(sources.values()))
+    chunks, ids, files = ingest_faiss.assign_chunk_ids(chunks, sources, records)
+    vectors = embeddings.embed_documents_array([c.page_content for c in chunks])
+    if truncate_dim:
+        store = faiss_from_vectors(chunks, truncate(vectors, truncate_dim), embeddings, ids)
+        return MatryoshkaFAISS.wrap(store, vectors, truncate_dim), files
+    return faiss_from_vectors(chunks, vectors, embeddings, ids), files
+
+
+def check_incremental_update(truncate_dim):
+    with tempfile.TemporaryDirectory() as data_dir, tempfile.TemporaryDirectory() as index_dir:
+        previous = ingest_faiss.DATA_DIR
+        ingest_faiss.DATA_DIR = data_dir
+        try:
+            write(data_dir, "a.txt", "Hypertension is high blood pressure.")
+            write(data_dir, "b.txt", "Diabetes affects blood sugar.")
+            write(data_dir, "c.txt", "Stroke needs urgent care.")
+            store, files = full_build(CountingEmbeddings(), truncate_dim)
+            save_vectorstore(store, index_dir)
+
+            write(data_dir, "a.txt", "Asthma narrows the airways.")
+            os.remove(os.path.join(data_dir, "b.txt"))
+            write(data_dir, "d.txt", "Sepsis is a response to infection.")
+
+            embeddings = CountingEmbeddings()
+            store = load_vectorstore(index_dir, embeddings)
+            new_files, removed, added = ingest_faiss.update_faiss_index(store, ingest_faiss.list_sources(), files)
+
+            assert (removed, added) == (2, 2)
+            assert embeddings.embedded == 2  # only a.txt and d.txt were re-embedded
+            assert sorted(new_files) == ["a.txt", "c.txt", "d.txt"]
+            assert new_files["c.txt"] == files["c.txt"]
+            assert sorted(store.index_to_docstore_id.values()) == sorted(i for f in new_files.values() for i in f["chunk_ids"])
+            assert store.similarity_search("asthma", k=1)[0].page_content.startswith("Asthma")
+            assert store.similarity_search("stroke", k=1)[0].page_content.startswith("Stroke")
+            if truncate_dim:
+                assert len(store.full_vectors) == store.index.ntotal == 3
+
+            save_vectorstore(store, index_dir)
+            reloaded = load_vectorstore(index_dir, CountingEmbeddings())
+            assert reloaded.similarity_search("sepsis", k=1)[0].page_content.startswith("Sepsis")
+            assert ingest_faiss.update_faiss_index(reloaded, ingest_faiss.list_sources(), new_files)[1:] == (0, 0)
+        finally:
+            ingest_faiss.DATA_DIR = previous
+
+
+def test_incremental_update_flat():
+    check_incremental_update(truncate_dim=None)
+
+
+def test_incremental_update_matryoshka():
+    check_incremental_update(truncate_dim=4)
+
+
+if __name__ == "__main__":
+    test_incremental_update_flat()
+    test_incremental_update_matryoshka()
+    print("✅ Incremental re-ingest only embeds changed files")
@@ -0,0 +1,80 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import tempfile
+import time
+import warnings
+import ingest.ingest_faiss as ingest_faiss
+from ingest.manifest import load_manifest
+from retrieval.faiss_store import faiss_from_vectors, save_vectorstore
+from retrieval.index_factory import load_search_params
+from retrieval.index_handle import (
+    VERSIONS_DIR, IndexHandle, index_folder, new_version, publish_version, read_version
+)
+from tests.helpers import DOCS, VECTORS, LookupEmbeddings, publish
+
+
+def wait_for(handle, version, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while handle.snapshot()[0] != version:
+        assert time.monotonic() < deadline, f"handle never swapped to {version}"
+        time.sleep(0.01)
+
+
+def test_handle_swaps_to_published_versions():
+    with tempfile.TemporaryDirectory() as root:
+        first = publish(root, 100)
+        handle = IndexHandle(root, LookupEmbeddings, check_interval=0)
+        version, store = handle.snapshot()
+        assert version == first and store.index.ntotal == 100
+
+        second = publish(root, 200)
+        wait_for(handle, second)
+        assert handle.snapshot()[1].index.ntotal == 200
+        # The old store stays usable for searches that started before the swap.
+        assert store.similarity_search("chunk 5", k=1)[0].metadata["i"] == 5
+
+        # A broken version is skipped; the handle keeps serving the last good one.
+        broken, _ = new_version(root)
+        publish_version(root, broken)
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            handle.snapshot()
+            handle._loading.join()
+        assert handle.version == second and "Could not load index version" in str(caught[0].message)
+
+
+def test_publish_prunes_old_versions_and_unversioned_roots_load():
+    with tempfile.TemporaryDirectory() as root:
+        save_vectorstore(faiss_from_vectors(DOCS, VECTORS, LookupEmbeddings()), root)
+        handle = IndexHandle(root, LookupEmbeddings)
+        assert handle.snapshot()[0] is None and handle.snapshot()[1].index.ntotal == 200
+
+        versions = [publish(root, 10 + i) for i in range(5)]
+        assert sorted(os.listdir(os.path.join(root, VERSIONS_DIR))) == versions[-3:]
+        assert handle.reload() == read_version(root) == versions[-1]
+        assert handle.snapshot()[1].index.ntotal == 14
+
+
+def test_ingest_saves_new_versions_and_keeps_tuned_params():
+    with tempfile.TemporaryDirectory() as root:
+        previous = ingest_faiss.INDEX_DIR
+        ingest_faiss.INDEX_DIR = root
+        try:
+            store = faiss_from_vectors(DOCS, VECTORS, LookupEmbeddings())
+            ingest_faiss.save_index(store, {"index_type": "hnsw"}, {"a.txt": {}}, {"efSearch": 48})
+            first = read_version(root)
+            ingest_faiss.save_index(store, {"index_type": "hnsw"}, {"a.txt": {}, "b.txt": {}})
+            assert read_version(root) != first
+            assert load_search_params(index_folder(root)) == {"efSearch": 48}
+            assert sorted(load_manifest(index_folder(root))["files"]) == ["a.txt", "b.txt"]
+            assert sorted(load_manifest(index_folder(root, first))["files"]) == ["a.txt"]
+        finally:
+            ingest_faiss.INDEX_DIR = previous
+
+
+if __name__ == "__main__":
+    test_handle_swaps_to_published_versions()
+    test_publish_prunes_old_versions_and_unversioned_roots_load()
+    test_ingest_saves_new_versions_and_keeps_tuned_params()
+    print("✅ Index handle hot-swaps published versions")
@@ -0,0 +1,62 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import tempfile
+import faiss
+import numpy as np
+from langchain_core.documents import Document
+from retrieval.faiss_store import faiss_from_vectors, load_vectorstore, save_vectorstore
+from retrieval.index_factory import default_nlist, make_index, save_search_params, tune_search_params
+from tests.helpers import LookupEmbeddings
+
+rng = np.random.default_rng(0)
+CENTERS = rng.normal(size=(40, 64)).astype(np.float32)
+VECTORS = (CENTERS[rng.integers(0, 40, 4000)] + 0.3 * rng.normal(size=(4000, 64))).astype(np.float32)
+QUERIES = (VECTORS[:100] + 0.1 * rng.normal(size=(100, 64))).astype(np.float32)
+DOCS = [Document(page_content=f"chunk {i}") for i in range(len(VECTORS))]
+
+
+def searched_param(index, name):
+    return faiss.extract_index_ivf(index).nprobe if name == "nprobe" else index.hnsw.efSearch
+
+
+def test_tuned_params_reach_target_and_survive_reload():
+    for index_type in ("ivf-flat", "ivf-pq", "hnsw"):
+        index = make_index(index_type, 64, VECTORS)
+        store = faiss_from_vectors(DOCS, VECTORS, LookupEmbeddings(), index=index)
+        params, rows = tune_search_params(index, VECTORS, QUERIES, k=4, target_recall=0.9)
+        (name, value), = params.items()
+        if index_type != "ivf-pq":  # PQ codes may cap recall below the target
+            assert rows[-1]["recall"] >= 0.9 and rows[-1][name] == value
+
+        with tempfile.TemporaryDirectory() as folder:
+            save_vectorstore(store, folder)
+            save_search_params(folder, params, index_type=index_type)
+            loaded = load_vectorstore(folder, LookupEmbeddings())
+            assert searched_param(loaded.index, name) == value
+
+
+def test_ivf_self_reference_and_auto_nlist():
+    assert default_nlist(4000) == 102 and default_nlist(10) == 1
+    index = make_index("ivf-flat", 64, VECTORS)
+    index.add(VECTORS)
+    params, rows = tune_search_params(index, None, QUERIES, k=4, target_recall=1.0)
+    assert rows[-1]["recall"] == 1.0 and params["nprobe"] <= index.nlist
+
+
+def test_tuning_leaves_out_each_querys_own_chunk():
+    index = make_index("ivf-flat", 64, VECTORS)
+    index.add(VECTORS)
+    sample = np.arange(0, 4000, 40)
+    # A query copied from an indexed chunk finds that chunk at any nprobe, so recall looks perfect.
+    _, rows = tune_search_params(index, VECTORS, VECTORS[sample], k=1, target_recall=1.0)
+    assert rows[0]["nprobe"] == 1 and rows[0]["recall"] == 1.0
+    _, rows = tune_search_params(index, VECTORS, VECTORS[sample], k=1, target_recall=1.0, exclude=sample)
+    assert rows[0]["recall"] < 1.0 and rows[-1]["recall"] == 1.0
+
+
+if __name__ == "__main__":
+    test_tuned_params_reach_target_and_survive_reload()
+    test_ivf_self_reference_and_auto_nlist()
+    test_tuning_leaves_out_each_querys_own_chunk()
+    print("✅ IVF/HNSW search params are tuned and applied at load")
@@ -0,0 +1,36 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+from embeddings.local_embedding_model import LocalEmbeddingModel
+from tests.helpers import STUB_MODEL, registered_stub_model
+
+# Word counts chosen so budgets cut the sorted texts at different points, with ties.
+TEXTS = [" ".join(["word"] * n) + f" text {i}" for i, n in enumerate([3, 40, 1, 17, 17, 0, 90, 5, 2, 33, 8, 17, 60, 1])]
+
+
+def test_bucketed_encode_matches_plain_encode_row_for_row(stub_model):
+    for budget in (1, 16, 64, 150, 10_000):
+        embeddings = LocalEmbeddingModel(STUB_MODEL, max_batch_tokens=budget)
+        expected = stub_model.encode(TEXTS)
+        stub_model.batches.clear()
+
+        assert np.array_equal(embeddings._encode_bucketed(TEXTS), expected)
+        assert np.array_equal(np.asarray(embeddings.embed_documents(TEXTS), dtype=np.float32), expected)
+
+        # Every text is encoded once per call, and no batch exceeds the budget unless it is a single text.
+        batches = stub_model.batches[:len(stub_model.batches) // 2]
+        assert sorted(text for batch in batches for text in batch) == sorted(TEXTS)
+        lengths = dict(zip(TEXTS, embeddings.token_lengths(TEXTS)))
+        for batch in batches:
+            assert len(batch) == 1 or len(batch) * max(lengths[text] for text in batch) <= budget
+        if budget == 1:
+            assert len(batches) == len(TEXTS)
+        if budget == 10_000:
+            assert len(batches) == 1
+
+
+if __name__ == "__main__":
+    with registered_stub_model() as model:
+        test_bucketed_encode_matches_plain_encode_row_for_row(model)
+    print("✅ Length-bucketed encoding returns rows in the caller's order")
@@ -0,0 +1,29 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import tempfile
+import numpy as np
+from retrieval.faiss_store import faiss_from_vectors, load_vectorstore, save_vectorstore
+from retrieval.matryoshka import MatryoshkaFAISS, truncate
+from tests.helpers import DOCS, VECTORS, LookupEmbeddings
+
+
+def test_rerank_returns_full_dimension_neighbours():
+    store = faiss_from_vectors(DOCS, truncate(VECTORS, 16), LookupEmbeddings())
+    store = MatryoshkaFAISS.wrap(store, VECTORS, truncate_dim=16, oversample=50)
+
+    for query in (3, 77, 150):
+        exact = np.argsort(((VECTORS - VECTORS[query]) ** 2).sum(axis=1))[:5]
+        hits = store.similarity_search_with_score(f"chunk {query}", k=5)
+        assert [doc.metadata["i"] for doc, _ in hits] == exact.tolist()
+
+    with tempfile.TemporaryDirectory() as folder:
+        save_vectorstore(store, folder)
+        loaded = load_vectorstore(folder, LookupEmbeddings())
+        assert isinstance(loaded, MatryoshkaFAISS)
+        assert loaded.similarity_search("chunk 3", k=1)[0].metadata["i"] == 3
+
+
+if __name__ == "__main__":
+    test_rerank_returns_full_dimension_neighbours()
+    print("✅ Matryoshka re-ranking matches exact search")
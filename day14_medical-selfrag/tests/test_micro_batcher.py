@@ -0,0 +1,38 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from concurrent.futures import ThreadPoolExecutor
+from pprint import pprint
+import numpy as np
+from embeddings.micro_batcher import MicroBatcher
+
+calls = []
+
+
+def fake_encode(texts):
+    calls.append(len(texts))
+    return np.array([[float(len(text)), 1.0] for text in texts], dtype=np.float32)
+
+
+def test_micro_batcher_groups_concurrent_requests():
+    batcher = MicroBatcher(fake_encode, max_batch_size=8, max_wait_ms=50)
+    questions = [f"What is stage {i} hypertension?" for i in range(16)]
+    try:
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            vectors = list(pool.map(lambda q: batcher.submit(q).result(timeout=5), questions))
+    finally:
+        batcher.close()
+
+    # Results fan back out to the right caller...
+    assert [v[0] for v in vectors] == [float(len(q)) for q in questions]
+    # ...and were encoded in fewer calls than requests.
+    assert len(calls) < len(questions)
+    assert max(calls) <= 8
+    stats = batcher.stats()
+    assert stats["requests"] == len(questions)
+    pprint(stats)
+
+
+if __name__ == "__main__":
+    print("📦 Testing MicroBatcher...\n")
+    test_micro_batcher_groups_concurrent_requests()
@@ -0,0 +1,55 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import tempfile
+import warnings
+import faiss
+from retrieval.faiss_store import faiss_from_vectors, load_vectorstore, read_index, save_vectorstore
+from retrieval.index_factory import make_index
+from tests.helpers import DOCS, VECTORS, LookupEmbeddings
+
+
+def hits(store, query, k=5):
+    return [(doc.metadata["i"], round(score, 5)) for doc, score in store.similarity_search_with_score(query, k=k)]
+
+
+def test_mapped_index_matches_and_survives_a_save_over_it():
+    for index_type in ("flat", "sq8", "ivf-flat", "hnsw"):
+        store = faiss_from_vectors(DOCS, VECTORS, LookupEmbeddings(), index=make_index(index_type, 64, VECTORS))
+        with tempfile.TemporaryDirectory() as folder:
+            save_vectorstore(store, folder, docstore="sqlite")
+            mapped = load_vectorstore(folder, LookupEmbeddings(), mmap=True)
+            before = hits(mapped, "chunk 42")
+            assert before == hits(store, "chunk 42")
+
+            # Saving renames new files into place; the old mapping stays readable.
+            smaller = faiss_from_vectors(DOCS[:100], VECTORS[:100], LookupEmbeddings())
+            save_vectorstore(smaller, folder)
+            assert hits(mapped, "chunk 42") == before
+            assert load_vectorstore(folder, LookupEmbeddings(), mmap=True).index.ntotal == 100
+
+
+def test_falls_back_to_a_normal_read():
+    def read(path, flags=0):
+        if flags:
+            raise RuntimeError("mmap only supported for File objects")
+        return original(path)
+
+    original = faiss.read_index
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "index.faiss")
+        faiss.write_index(make_index("flat", 64), path)
+        faiss.read_index = read
+        try:
+            with warnings.catch_warnings(record=True) as caught:
+                warnings.simplefilter("always")
+                assert read_index(path, mmap=True).d == 64
+            assert "Could not memory-map" in str(caught[0].message)
+        finally:
+            faiss.read_index = original
+
+
+if __name__ == "__main__":
+    test_mapped_index_matches_and_survives_a_save_over_it()
+    test_falls_back_to_a_normal_read()
+    print("✅ Memory-mapped FAISS loading matches in-memory loading")
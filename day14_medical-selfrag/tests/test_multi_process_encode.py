@@ -0,0 +1,34 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import warnings
+import numpy as np
+import pytest
+
+MODEL_NAME = os.environ.get("MULTI_PROCESS_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+
+TEXTS = [f"Patient {i} has a blood pressure of {110 + 3 * i}/{70 + i} mmHg" + " and headaches" * (i % 4) for i in range(24)]
+
+
+def test_worker_pool_preserves_order():
+    from embeddings.local_embedding_model import LocalEmbeddingModel
+
+    try:
+        embeddings = LocalEmbeddingModel(MODEL_NAME, device="cpu", workers=2, mp_chunk_size=3)
+    except OSError as e:
+        pytest.skip(f"model '{MODEL_NAME}' not available offline: {e}")
+
+    expected = embeddings.model.encode(TEXTS, convert_to_numpy=True)
+    with embeddings, warnings.catch_warnings():
+        # encode_multi_process is deprecated in sentence-transformers 6; the pool goes through encode().
+        warnings.simplefilter("error", DeprecationWarning)
+        actual = embeddings.embed_documents_array(TEXTS)
+    # Eight chunks of three texts, spread over both workers, come back in the caller's order.
+    assert actual.shape == expected.shape
+    assert np.allclose(actual, expected, atol=1e-5)
+    assert not np.allclose(actual[0], actual[1], atol=1e-3)
+
+
+if __name__ == "__main__":
+    test_worker_pool_preserves_order()
+    print("✅ Multi-process encoding preserves input order")
@@ -0,0 +1,41 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import tempfile
+import numpy as np
+import pytest
+
+MODEL_NAME = os.environ.get("ONNX_PARITY_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+MIN_COSINE = {"onnx": 0.999, "onnx-int8": 0.95}
+
+TEXTS = [
+    "What is hypertension?",
+    "Hypertension is commonly defined as a blood pressure reading consistently at or above 130/80 mmHg.",
+    "Primary hypertension has no clear cause and develops over time, while secondary hypertension is caused by other conditions like kidney disease.",
+]
+
+
+def test_onnx_matches_torch():
+    pytest.importorskip("onnxruntime")
+    from sentence_transformers import SentenceTransformer
+    from embeddings.onnx_backend import OnnxEncoder, export_onnx
+
+    try:
+        torch_model = SentenceTransformer(MODEL_NAME, device="cpu")
+    except OSError as e:
+        pytest.skip(f"model '{MODEL_NAME}' not available offline: {e}")
+
+    expected = torch_model.encode(TEXTS, convert_to_numpy=True)
+    with tempfile.TemporaryDirectory() as onnx_dir:
+        directory = export_onnx(MODEL_NAME, onnx_dir, quantize=True)
+        for backend, quantized in (("onnx", False), ("onnx-int8", True)):
+            actual = OnnxEncoder(directory, quantized=quantized).encode(TEXTS)
+            cosine = (expected * actual).sum(axis=1) / (
+                np.linalg.norm(expected, axis=1) * np.linalg.norm(actual, axis=1)
+            )
+            print(f"{backend}: min cosine {cosine.min():.5f}")
+            assert cosine.min() >= MIN_COSINE[backend]
+
+
+if __name__ == "__main__":
+    test_onnx_matches_torch()
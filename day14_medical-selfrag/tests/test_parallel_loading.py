@@ -0,0 +1,39 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import tempfile
+import time
+import ingest.ingest_faiss as ingest_faiss
+
+
+def test_parallel_loading_isolates_failures_and_timeouts():
+    with tempfile.TemporaryDirectory() as folder:
+        good = [os.path.join(folder, f"note{i}.txt") for i in range(4)]
+        for i, path in enumerate(good):
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(f"Note {i} about hypertension.")
+        corrupt = os.path.join(folder, "corrupt.pdf")
+        with open(corrupt, "wb") as f:
+            f.write(b"not a pdf at all")
+        # Opening a FIFO with no writer blocks forever: a stand-in for a hung parse.
+        hung = os.path.join(folder, "hung.txt")
+        os.mkfifo(hung)
+
+        paths = [good[0], corrupt, good[1], hung, good[2], good[3]]
+        timings = []
+        start = time.perf_counter()
+        docs = ingest_faiss.load_documents(paths, workers=3, timeout=1.0, timings=timings)
+
+        assert time.perf_counter() - start < 1.0 + ingest_faiss.LOAD_TIMEOUT_GRACE
+        assert [d.page_content for d in docs] == [f"Note {i} about hypertension." for i in range(4)]
+        assert [t[0] for t in timings] == paths
+        assert ingest_faiss.failed_paths(timings) == {corrupt, hung}
+        assert "Timeout" in dict((t[0], t[3]) for t in timings)[hung]
+
+        serial = ingest_faiss.load_documents([good[0], corrupt], workers=1)
+        assert len(serial) == 1
+
+
+if __name__ == "__main__":
+    test_parallel_loading_isolates_failures_and_timeouts()
+    print("✅ Parallel loading skips corrupt and hung files")
@@ -0,0 +1,61 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import logging
+import numpy as np
+import pytest
+from embeddings.local_embedding_model import LocalEmbeddingModel
+from embeddings.quantization import MIN_CALIBRATION_SAMPLES, dequantize_int8, int8_ranges, quantize_int8
+from tests.helpers import STUB_MODEL
+
+
+def test_round_trip_error_is_within_half_a_step():
+    vectors = np.random.default_rng(0).normal(size=(1000, 16)).astype(np.float32)
+    codes, ranges = quantize_int8(vectors)
+    step = (ranges[1] - ranges[0]) / 255
+    error = np.abs(dequantize_int8(codes, ranges) - vectors)
+    assert (error <= step / 2 + 1e-6).all()
+    assert codes.min() == -128 and codes.max() == 127
+
+
+def test_calibration_rejects_small_and_degenerate_samples():
+    with pytest.raises(ValueError, match="at least"):
+        int8_ranges(np.ones((1, 4), dtype=np.float32))
+    constant = np.random.default_rng(0).normal(size=(MIN_CALIBRATION_SAMPLES, 4)).astype(np.float32)
+    constant[:, 2] = 0.5
+    with pytest.raises(ValueError, match="degenerate"):
+        int8_ranges(constant)
+    with pytest.raises(ValueError, match="degenerate"):
+        quantize_int8(constant[:1], np.stack([constant.min(axis=0), constant.max(axis=0)]))
+
+
+def test_model_batches_share_calibrated_ranges(stub_model, caplog):
+    embeddings = LocalEmbeddingModel(STUB_MODEL, max_batch_tokens=None)
+    with pytest.raises(ValueError, match="at least"):
+        embeddings.embed_documents_array(["one lonely chunk"], precision="int8")
+    assert embeddings.int8_ranges is None
+
+    sample = [f"calibration chunk {i}" for i in range(MIN_CALIBRATION_SAMPLES)]
+    ranges = embeddings.calibrate_int8(sample)
+    # Later batches, however small, reuse the ranges: codes match quantizing everything at once.
+    batches = [[f"later chunk {i}"] for i in range(3)] + [[f"later chunk {i}" for i in range(3, 40)]]
+    with caplog.at_level(logging.WARNING, logger="LocalEmbeddingModel"):
+        codes = np.concatenate([embeddings.embed_documents_array(batch, precision="int8") for batch in batches])
+    texts = [text for batch in batches for text in batch]
+    expected, _ = quantize_int8(embeddings.embed_documents_array(texts), ranges)
+    assert np.array_equal(codes, expected)
+    assert len(np.unique(codes)) > 100
+
+    # Values beyond the calibration sample saturate, and the caller is told.
+    clipped = [record for record in caplog.records if "clipped" in record.getMessage()]
+    vectors = embeddings.embed_documents_array(texts)
+    outside = ((vectors < ranges[0]) | (vectors > ranges[1])).any()
+    assert bool(clipped) == bool(outside)
+    query = embeddings.embed_query_array("later chunk 0", precision="int8")
+    assert np.array_equal(query, codes[0])
+
+
+if __name__ == "__main__":
+    test_round_trip_error_is_within_half_a_step()
+    test_calibration_rejects_small_and_degenerate_samples()
+    print("✅ int8 quantization round-trips within half a step and rejects bad calibration")
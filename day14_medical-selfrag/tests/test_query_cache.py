@@ -0,0 +1,92 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import tempfile
+import time
+from retrieval.faiss_store import faiss_from_vectors
+from retrieval.index_handle import IndexHandle
+from retrieval.query_cache import QueryCache, normalize_query
+from tests.helpers import DOCS, VECTORS, LookupEmbeddings, publish
+
+
+class CountingEmbeddings(LookupEmbeddings):
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def embed_query(self, text):
+        self.calls += 1
+        return super().embed_query(text)
+
+
+def store_of(embeddings, n_docs=200):
+    return faiss_from_vectors(DOCS[:n_docs], VECTORS[:n_docs], embeddings)
+
+
+def test_normalized_repeats_hit_and_skip_the_encoder():
+    assert normalize_query("  Chunk\t5 \n") == "chunk 5"
+    embeddings = CountingEmbeddings()
+    store, cache = store_of(embeddings), QueryCache(max_entries=8, ttl_seconds=60)
+
+    docs, hit = cache.search(store, "v1", "chunk 5", k=3)
+    assert not hit and docs[0].metadata["i"] == 5
+    again, hit = cache.search(store, "v1", " CHUNK   5 ", k=3)
+    assert hit and [d.metadata["i"] for d in again] == [d.metadata["i"] for d in docs]
+    # k and filter are part of the key; the embedding is still reused.
+    assert not cache.search(store, "v1", "chunk 5", k=2)[1]
+    assert not cache.search(store, "v1", "chunk 5", k=3, filter={"i": 5})[1]
+    assert cache.search(store, "v1", "chunk 5", k=3, filter={"i": 5})[1]
+    assert embeddings.calls == 1
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["embedding_hits"]) == (2, 3, 2)
+    assert stats["hit_rate"] == 0.4 and stats["saved_ms"] > 0
+
+
+def test_new_index_version_invalidates_results():
+    embeddings = CountingEmbeddings()
+    cache = QueryCache(max_entries=8, ttl_seconds=60)
+    assert not cache.search(store_of(embeddings, 100), "v1", "chunk 150", k=1)[1]
+    docs, hit = cache.search(store_of(embeddings, 200), "v2", "chunk 150", k=1)
+    assert not hit and docs[0].metadata["i"] == 150
+    assert cache.stats()["entries"] == 1 and embeddings.calls == 1
+
+
+def test_ttl_lru_and_callable_filters():
+    embeddings = CountingEmbeddings()
+    store = store_of(embeddings)
+    cache = QueryCache(max_entries=2, ttl_seconds=0.05)
+    for i in range(3):
+        cache.search(store, "v1", f"chunk {i}", k=1)
+    assert cache.stats()["evictions"] == 1 and not cache.search(store, "v1", "chunk 0", k=1)[1]
+    time.sleep(0.1)
+    assert not cache.search(store, "v1", "chunk 0", k=1)[1]
+    assert cache.stats()["expirations"] == 1
+
+    only_even = lambda metadata: metadata["i"] % 2 == 0
+    for _ in range(2):
+        docs, hit = cache.search(store, "v1", "chunk 7", k=1, filter=only_even)
+        assert not hit and docs[0].metadata["i"] % 2 == 0
+    assert not QueryCache(max_entries=0).search(store, "v1", "chunk 7", k=1)[1]
+
+
+def test_handle_search_goes_through_cache_and_follows_versions():
+    with tempfile.TemporaryDirectory() as root:
+        first = publish(root, 100)
+        handle = IndexHandle(root, LookupEmbeddings, cache=QueryCache(ttl_seconds=60))
+        version, docs, hit = handle.search("chunk 150", k=1)
+        assert version == first and not hit and docs[0].metadata["i"] != 150
+        assert handle.search("chunk 150", k=1)[2]
+
+        second = publish(root, 200)
+        assert handle.reload() == second
+        version, docs, hit = handle.search("chunk 150", k=1)
+        assert version == second and not hit and docs[0].metadata["i"] == 150
+
+
+if __name__ == "__main__":
+    test_normalized_repeats_hit_and_skip_the_encoder()
+    test_new_index_version_invalidates_results()
+    test_ttl_lru_and_callable_filters()
+    test_handle_search_goes_through_cache_and_follows_versions()
+    print("✅ Query cache hits repeats and invalidates on new index versions")
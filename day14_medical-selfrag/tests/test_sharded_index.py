@@ -0,0 +1,68 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import tempfile
+from retrieval.faiss_store import add_vectors, faiss_from_index, faiss_from_vectors, load_vectorstore, save_vectorstore
+from retrieval.sharded import SHARDS_FILE, ShardedFAISS, build_shard_indexes, partition
+from tests.helpers import DOCS, VECTORS, LookupEmbeddings
+
+IDS = [f"id-{i}" for i in range(len(DOCS))]
+
+
+def sharded_store(n_shards, workers=None):
+    parts = partition(IDS, n_shards)
+    indexes = build_shard_indexes([VECTORS[rows] for rows in parts], "flat", workers=workers)
+    shards = [
+        faiss_from_index([DOCS[i] for i in rows], index, LookupEmbeddings(), [IDS[i] for i in rows])
+        for rows, index in zip(parts, indexes)
+    ]
+    return ShardedFAISS(shards, LookupEmbeddings())
+
+
+def hits(store, query, k=5):
+    return [(doc.metadata["i"], round(score, 5)) for doc, score in store.similarity_search_with_score(query, k=k)]
+
+
+def test_merged_results_match_a_single_index():
+    single = faiss_from_vectors(DOCS, VECTORS, LookupEmbeddings(), IDS)
+    store = sharded_store(4, workers=2)
+    assert all(shard.index.ntotal for shard in store.shards) and store.ntotal == 200
+    for query in ("chunk 3", "chunk 77", "chunk 150"):
+        assert hits(store, query) == hits(single, query)
+
+
+def test_save_load_and_update_route_by_id():
+    store = sharded_store(3, workers=1)
+    with tempfile.TemporaryDirectory() as folder:
+        save_vectorstore(store, folder)
+        loaded = load_vectorstore(folder, LookupEmbeddings())
+        assert isinstance(loaded, ShardedFAISS) and len(loaded.shards) == 3
+        assert hits(loaded, "chunk 42") == hits(store, "chunk 42")
+
+        loaded.delete(IDS[:50])
+        assert loaded.ntotal == 150 and hits(loaded, "chunk 10")[0][0] != 10
+        add_vectors(loaded, DOCS[:50], VECTORS[:50], IDS[:50])
+        assert hits(loaded, "chunk 10")[0][0] == 10
+
+        # A single index saved over the shards replaces them.
+        save_vectorstore(faiss_from_vectors(DOCS, VECTORS, LookupEmbeddings()), folder)
+        assert not os.path.exists(os.path.join(folder, SHARDS_FILE))
+        assert not isinstance(load_vectorstore(folder, LookupEmbeddings()), ShardedFAISS)
+
+
+def test_from_texts_embeds_and_partitions_by_id():
+    texts = [doc.page_content for doc in DOCS]
+    store = ShardedFAISS.from_texts(texts, LookupEmbeddings(), [doc.metadata for doc in DOCS], ids=IDS, shards=3)
+    assert len(store.shards) == 3 and store.ntotal == 200
+    for shard, rows in zip(store.shards, partition(IDS, 3)):
+        assert list(shard.index_to_docstore_id.values()) == [IDS[i] for i in rows]
+    single = faiss_from_vectors(DOCS, VECTORS, LookupEmbeddings(), IDS)
+    for query in ("chunk 3", "chunk 77", "chunk 150"):
+        assert hits(store, query) == hits(single, query)
+
+
+if __name__ == "__main__":
+    test_merged_results_match_a_single_index()
+    test_save_load_and_update_route_by_id()
+    test_from_texts_embeds_and_partitions_by_id()
+    print("✅ Sharded FAISS matches a single index and round-trips")
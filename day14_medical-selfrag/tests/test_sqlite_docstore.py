@@ -0,0 +1,67 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import tempfile
+from retrieval.faiss_store import add_vectors, faiss_from_vectors, load_vectorstore, save_vectorstore
+from retrieval.matryoshka import MatryoshkaFAISS, truncate
+from retrieval.sqlite_docstore import DOCSTORE_FILE, PICKLE_FILE, SQLiteDocstore, convert
+from tests.helpers import DOCS, VECTORS, LookupEmbeddings
+
+IDS = [f"id-{i}" for i in range(len(DOCS))]
+
+
+def hits(store, query, k=5):
+    return [(doc.id, doc.metadata["i"], round(score, 5)) for doc, score in store.similarity_search_with_score(query, k=k)]
+
+
+def test_converted_index_answers_like_the_pickled_one():
+    store = faiss_from_vectors(DOCS, VECTORS, LookupEmbeddings(), IDS)
+    with tempfile.TemporaryDirectory() as folder:
+        save_vectorstore(store, folder)
+        pickled = load_vectorstore(folder, LookupEmbeddings())
+        convert(folder)
+        assert os.path.exists(os.path.join(folder, DOCSTORE_FILE))
+        assert not os.path.exists(os.path.join(folder, PICKLE_FILE))
+
+        compact = load_vectorstore(folder, LookupEmbeddings())
+        assert isinstance(compact.docstore, SQLiteDocstore) and len(compact.index_to_docstore_id) == 200
+        for query in ("chunk 3", "chunk 77", "chunk 150"):
+            assert hits(compact, query) == hits(pickled, query)
+
+
+def test_updates_reach_disk_only_on_save():
+    store = faiss_from_vectors(DOCS, VECTORS, LookupEmbeddings(), IDS)
+    with tempfile.TemporaryDirectory() as folder:
+        save_vectorstore(store, folder, docstore="sqlite")
+        compact = load_vectorstore(folder, LookupEmbeddings())
+        compact.delete(IDS[:10])
+        add_vectors(compact, DOCS[:5], VECTORS[:5], [f"new-{i}" for i in range(5)])
+        assert hits(compact, "chunk 3", k=1)[0][0] == "new-3"
+        assert hits(load_vectorstore(folder, LookupEmbeddings()), "chunk 3", k=1)[0][0] == "id-3"
+
+        save_vectorstore(compact, folder)
+        reloaded = load_vectorstore(folder, LookupEmbeddings())
+        assert reloaded.index.ntotal == 195 and hits(reloaded, "chunk 3", k=1)[0][0] == "new-3"
+        assert hits(reloaded, "chunk 7", k=1)[0][1] != 7
+
+        # Back to a pickle: the SQLite file goes.
+        save_vectorstore(reloaded, folder, docstore="pickle")
+        assert not os.path.exists(os.path.join(folder, DOCSTORE_FILE))
+        assert hits(load_vectorstore(folder, LookupEmbeddings()), "chunk 3", k=1)[0][0] == "new-3"
+
+
+def test_matryoshka_store_in_compact_format():
+    store = faiss_from_vectors(DOCS, truncate(VECTORS, 16), LookupEmbeddings(), IDS)
+    store = MatryoshkaFAISS.wrap(store, VECTORS, truncate_dim=16, oversample=50)
+    with tempfile.TemporaryDirectory() as folder:
+        save_vectorstore(store, folder, docstore="sqlite")
+        loaded = load_vectorstore(folder, LookupEmbeddings())
+        assert isinstance(loaded, MatryoshkaFAISS) and isinstance(loaded.docstore, SQLiteDocstore)
+        assert hits(loaded, "chunk 42") == hits(store, "chunk 42")
+
+
+if __name__ == "__main__":
+    test_converted_index_answers_like_the_pickled_one()
+    test_updates_reach_disk_only_on_save()
+    test_matryoshka_store_in_compact_format()
+    print("✅ SQLite docstore matches the pickled one and saves atomically")
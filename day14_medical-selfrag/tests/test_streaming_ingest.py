@@ -0,0 +1,184 @@
+"""
+Memory of the streaming ingest pipeline on a synthetic corpus. After a
+warm-up run (imports, allocator arenas), peak RSS growth is measured on a
+SMALL_CORPUS_MB and a STREAMING_TEST_CORPUS_MB corpus (default 64; e.g. 4096
+for a multi-GB run). The larger corpus may only cost what its extra chunks
+keep in memory (flat index vectors, docstore id map, manifest chunk ids) plus
+SLACK_MB of allocator noise: the pipeline's working set must not grow with the
+corpus. Chunk text must stay out of memory.
+"""
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import gc
+import tempfile
+import threading
+import time
+import numpy as np
+from langchain_core.documents import Document
+import ingest.ingest_faiss as ingest_faiss
+from ingest.streaming import IndexSink, stream_ingest
+from retrieval.index_factory import default_nlist
+from tests.helpers import KeywordEmbeddings
+
+CORPUS_MB = int(os.environ.get("STREAMING_TEST_CORPUS_MB", "64"))
+SMALL_CORPUS_MB = 16
+# Measured difference is ~25 MB at 16 vs 64 MB; the extra 48 MB of text alone would exceed this.
+SLACK_MB = 32
+FILE_MB = 8
+SENTENCE = "Hypertension is persistently elevated arterial blood pressure and raises stroke risk. "
+
+
+def rss_mb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+class PeakRSS(threading.Thread):
+    def __init__(self):
+        super().__init__(daemon=True)
+        self.baseline = self.peak = rss_mb()
+        self.running = True
+
+    def run(self):
+        while self.running:
+            self.peak = max(self.peak, rss_mb())
+            time.sleep(0.01)
+
+
+def synthetic_load(path, timeout=None):
+    """Fabricates FILE_MB of text per 'file' instead of reading from disk."""
+    start = time.perf_counter()
+    text = SENTENCE * (FILE_MB * 2**20 // len(SENTENCE))
+    return path, [Document(page_content=text, metadata={"source": path})], time.perf_counter() - start, None
+
+
+class HashEmbeddings:
+    def embed_documents_array(self, texts):
+        return np.stack([np.frombuffer(t[:32].encode().ljust(32), dtype=np.uint8)[:8].astype(np.float32) for t in texts])
+
+
+def ingest_synthetic(corpus_mb):
+    """Stream a synthetic corpus into a flat IndexSink; returns (peak RSS growth in MB, store, files, timings)."""
+    count = max(2, corpus_mb // FILE_MB)
+    sources = {f"doc{i}.txt": f"synthetic://doc{i}.txt" for i in range(count)}
+    records = {name: {"sha256": f"{i:064x}", "mtime": 0.0, "size": FILE_MB * 2**20} for i, name in enumerate(sources)}
+    # The sink --streaming uses: chunk text goes to its SQLite docstore, not memory.
+    sink = IndexSink(HashEmbeddings(), "flat")
+    gc.collect()
+    monitor = PeakRSS()
+    monitor.start()
+    files, timings = stream_ingest(
+        sources, records, HashEmbeddings(), sink, synthetic_load, ingest_faiss.split_documents, batch_size=512
+    )
+    store = sink.finish()
+    monitor.running = False
+    monitor.join()
+    return monitor.peak - monitor.baseline, store, files, timings
+
+
+def retained_mb(store, files):
+    """What an ingest has to keep in memory per chunk: vectors, the id map and the manifest's chunk ids."""
+    ids = store.index_to_docstore_id
+    vectors = store.index.ntotal * store.index.d * 4
+    id_map = sys.getsizeof(ids) + sum(sys.getsizeof(key) + sys.getsizeof(id_) for key, id_ in ids.items())
+    manifest = sum(sys.getsizeof(entry["chunk_ids"]) + sum(map(sys.getsizeof, entry["chunk_ids"])) for entry in files.values())
+    return (vectors + id_map + manifest) / 2**20
+
+
+def test_streaming_ingest_memory_is_bounded():
+    if not os.path.exists("/proc/self/statm"):
+        print("⏭️ Skipping: needs /proc to sample RSS")
+        return
+    ingest_synthetic(SMALL_CORPUS_MB)  # warm-up
+    small_growth, small, small_files, _ = ingest_synthetic(SMALL_CORPUS_MB)
+    growth, store, files, timings = ingest_synthetic(max(CORPUS_MB, 2 * SMALL_CORPUS_MB))
+
+    chunks = store.index.ntotal
+    budget = retained_mb(store, files) - retained_mb(small, small_files) + SLACK_MB
+    print(f"📈 peak RSS growth {small_growth:.0f} MB for {small.index.ntotal} chunks, "
+          f"{growth:.0f} MB for {chunks} chunks (budget for the difference {budget:.0f} MB)")
+    assert len(files) == len(timings) == max(CORPUS_MB, 2 * SMALL_CORPUS_MB) // FILE_MB
+    assert chunks == sum(len(entry["chunk_ids"]) for entry in files.values())
+    assert store.docstore.search(store.index_to_docstore_id[chunks - 1]).page_content in SENTENCE * 16
+    assert growth - small_growth < budget
+
+
+def test_streaming_load_timeout_skips_a_stuck_file():
+    if not hasattr(os, "mkfifo"):
+        print("⏭️ Skipping: needs a FIFO to block the parser")
+        return
+    with tempfile.TemporaryDirectory() as folder:
+        # Opening a FIFO with no writer blocks forever: a parse that never returns.
+        stuck, ok = os.path.join(folder, "stuck.txt"), os.path.join(folder, "ok.txt")
+        os.mkfifo(stuck)
+        with open(ok, "w") as f:
+            f.write(SENTENCE)
+        sources = {"stuck.txt": stuck, "ok.txt": ok}
+        records = {name: {"sha256": f"{i:064x}", "mtime": 0.0, "size": 0} for i, name in enumerate(sources)}
+        added = []
+        start = time.perf_counter()
+        files, timings = stream_ingest(
+            sources, records, HashEmbeddings(), lambda chunks, vectors, ids: added.extend(ids),
+            ingest_faiss.load_file_timed, ingest_faiss.split_documents, timeout=1.0, timeout_grace=2.0,
+        )
+    assert time.perf_counter() - start < 30
+    assert list(files) == ["ok.txt"] and len(added) == 1
+    assert timings[0][0] == stuck and "TimeoutError" in timings[0][3]
+
+
+def test_index_sink_matches_batch_build():
+    docs = [Document(page_content=f"{w} note {i}", metadata={"source": "x"}) for i, w in
+            enumerate(["hypertension", "diabetes", "stroke", "kidney"] * 5)]
+    vectors = KeywordEmbeddings().embed_documents_array([d.page_content for d in docs])
+    ids = [str(i) for i in range(len(docs))]
+    sink = IndexSink(KeywordEmbeddings(), "sq8", train_size=8, tuning_queries=5, query_chars=40)
+    for i in range(0, len(docs), 3):
+        sink(docs[i:i + 3], vectors[i:i + 3], ids[i:i + 3])
+    store = sink.finish()
+    assert store.index.ntotal == len(docs)
+    assert store.index_to_docstore_id == dict(enumerate(ids))
+    # Each tuning query records the index row of the chunk it was cut from.
+    assert len(sink.query_rows) == 5
+    assert [docs[row].page_content for row in sink.query_rows] == sink.query_texts
+    assert store.similarity_search("kidney", k=1)[0].page_content.startswith("kidney")
+
+    sink = IndexSink(KeywordEmbeddings(), "flat", truncate_dim=2)
+    for i in range(0, len(docs), 3):
+        sink(docs[i:i + 3], vectors[i:i + 3], ids[i:i + 3])
+    store = sink.finish()
+    assert store.index.d == 2 and np.array_equal(store.full_vectors, vectors)
+    assert store.similarity_search("kidney", k=1)[0].page_content.startswith("kidney")
+
+
+def test_index_sink_sizes_nlist_and_m_from_the_corpus_estimate():
+    rng = np.random.default_rng(0)
+
+    def feed(sink, n):
+        for start in range(0, n, 5000):
+            rows = range(start, min(n, start + 5000))
+            sink([Document(page_content=f"chunk {i}") for i in rows], rng.normal(size=(len(rows), 8)).astype(np.float32),
+                 [str(i) for i in rows])
+        return sink.finish().index
+
+    # --streaming sees one 256-row batch before the index exists; M must still follow the corpus.
+    assert feed(IndexSink(HashEmbeddings(), "hnsw", n_total=200_000), 256).hnsw.nb_neighbors(1) == 32
+    assert feed(IndexSink(HashEmbeddings(), "hnsw"), 256).hnsw.nb_neighbors(1) == 16
+
+    # IVF buffers enough vectors to train the nlist the estimate calls for, beyond the default 20k sample.
+    sink = IndexSink(HashEmbeddings(), "ivf-flat", n_total=100_000)
+    index = feed(sink, 50_000)
+    assert sink.train_size == 39 * default_nlist(100_000) and index.nlist == default_nlist(100_000) > 512
+    # An overestimate is corrected when the whole corpus fits in the training buffer.
+    assert feed(IndexSink(HashEmbeddings(), "ivf-flat", n_total=100_000), 3000).nlist == default_nlist(3000)
+
+    records = {"a.txt": {"size": 46_200}, "b.pdf": {"size": 0}}
+    assert ingest_faiss.estimate_chunks(records) == 46_200 // (ingest_faiss.CHUNK_SIZE - ingest_faiss.CHUNK_OVERLAP)
+
+
+if __name__ == "__main__":
+    test_streaming_ingest_memory_is_bounded()
+    test_streaming_load_timeout_skips_a_stuck_file()
+    test_index_sink_matches_batch_build()
+    test_index_sink_sizes_nlist_and_m_from_the_corpus_estimate()
+    print("✅ Streaming ingest memory does not grow with the corpus")
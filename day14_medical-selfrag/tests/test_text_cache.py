@@ -0,0 +1,44 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import shutil
+import tempfile
+import time
+import ingest.ingest_faiss as ingest_faiss
+from ingest.text_cache import TextCache
+
+PDF = os.path.join(ingest_faiss.DATA_DIR, "Hypertension_Info.pdf")
+
+
+def test_pdf_text_is_reused_across_names():
+    with tempfile.TemporaryDirectory() as folder:
+        cache_dir = os.path.join(folder, "cache")
+        parsed = ingest_faiss.load_file(PDF, cache_dir)
+        assert TextCache(cache_dir).stats()["entries"] == 1
+
+        copy = os.path.join(folder, "renamed.pdf")
+        shutil.copy(PDF, copy)
+        cached = ingest_faiss.load_file(copy, cache_dir)
+        assert [d.page_content for d in cached] == [d.page_content for d in parsed]
+        assert {d.metadata["source"] for d in cached} == {copy}
+        assert [d.metadata["page"] for d in cached] == [d.metadata["page"] for d in parsed]
+
+
+def test_eviction_drops_least_recently_used():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = TextCache(cache_dir)
+        docs = ingest_faiss.load_file(PDF)
+        for sha in ("a", "b", "c"):
+            cache.put(sha, docs)
+            time.sleep(0.01)
+        cache.get("a", PDF)  # now the most recently used
+        cache.max_bytes = cache.stats()["bytes"] * 2 // 3
+        assert cache.evict() == 1
+        assert cache.get("b", PDF) is None
+        assert cache.get("a", PDF) is not None and cache.get("c", PDF) is not None
+
+
+if __name__ == "__main__":
+    test_pdf_text_is_reused_across_names()
+    test_eviction_drops_least_recently_used()
+    print("✅ Extracted PDF text is cached by content hash")
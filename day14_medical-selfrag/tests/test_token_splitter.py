@@ -0,0 +1,53 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from langchain_core.documents import Document
+from tokenizers import Tokenizer, models, pre_tokenizers
+from transformers import PreTrainedTokenizerFast
+from ingest.token_splitter import TokenSplitter, token_stats
+
+
+def word_tokenizer():
+    """Fast tokenizer with one token per word or punctuation mark, built in memory."""
+    tokenizer = Tokenizer(models.WordLevel(vocab={"[UNK]": 0}, unk_token="[UNK]"))
+    tokenizer.pre_tokenizer = pre_tokenizers.BertPreTokenizer()
+    return PreTrainedTokenizerFast(tokenizer_object=tokenizer, unk_token="[UNK]")
+
+
+def count(tokenizer, text):
+    return len(tokenizer(text, add_special_tokens=False)["input_ids"])
+
+
+def test_chunks_fit_the_budget_and_overlap():
+    tokenizer = word_tokenizer()
+    sentences = [f"Sentence {i} talks about blood pressure readings." for i in range(60)]
+    doc = Document(page_content=" ".join(sentences), metadata={"source": "a.txt"})
+    splitter = TokenSplitter(tokenizer, max_tokens=40, overlap_tokens=8)
+    chunks = splitter.split_documents([doc, Document(page_content="", metadata={})])
+
+    assert len(chunks) > 1
+    assert all(count(tokenizer, c.page_content) <= 40 for c in chunks)
+    assert all(c.metadata == {"source": "a.txt"} for c in chunks)
+    # Windows end on a sentence when one falls in their last quarter.
+    assert all(c.page_content.endswith(".") for c in chunks)
+    # Consecutive chunks overlap, and together they cover every sentence.
+    for first, second in zip(chunks, chunks[1:]):
+        assert second.page_content.split()[0] in first.page_content.split()[-8:]
+    assert all(any(s in c.page_content for c in chunks) for s in sentences)
+
+    stats = token_stats([c.page_content for c in chunks], tokenizer, max_seq_length=40)
+    assert stats["chunks"] == len(chunks) and stats["truncated"] == 0
+
+
+def test_unbroken_text_is_hard_cut():
+    tokenizer = word_tokenizer()
+    text = " ".join(f"w{i}" for i in range(100))
+    chunks = TokenSplitter(tokenizer, max_tokens=30, overlap_tokens=0).split_documents([Document(page_content=text)])
+    assert [count(tokenizer, c.page_content) for c in chunks] == [30, 30, 30, 10]
+    assert " ".join(c.page_content for c in chunks) == text
+
+
+if __name__ == "__main__":
+    test_chunks_fit_the_budget_and_overlap()
+    test_unbroken_text_is_hard_cut()
+    print("✅ Token splitter packs chunks to the model's budget")
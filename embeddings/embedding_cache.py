@@ -0,0 +1,191 @@
+import atexit
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking
+    fcntl = None
+
+logger = logging.getLogger("LocalEmbeddingModel")
+
+# One record per vector slot: the text digest (all zeros = empty slot) and the
+# tick of its last use, which is all we need to rebuild the LRU order on open.
+INDEX_DTYPE = np.dtype([("digest", np.uint8, (16,)), ("tick", "<u8")])
+
+
+def normalize_text(text: str) -> str:
+    text = unicodedata.normalize("NFC", text)
+    return " ".join(text.split())
+
+
+def text_key(text: str) -> bytes:
+    return hashlib.blake2b(normalize_text(text).encode("utf-8"), digest_size=16).digest()
+
+
+def _model_slug(model_name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]+", "__", model_name)
+
+
+class EmbeddingCache:
+    """
+    Persistent, content-addressed embedding cache for a single model.
+
+    Vectors are stored in a memory-mapped float32 file (`vectors.f32`) next to a
+    memory-mapped index file (`index.bin`) holding each slot's text digest and
+    last-use tick. When `max_entries` slots are in use the least recently used
+    entry is evicted.
+
+    The cache is thread-safe, and several processes may open the same
+    directory: every batch of reads or writes holds an exclusive flock on
+    `lock` in it (POSIX only), and a read checks the slot still holds the
+    requested digest. Each process tracks only the slots it has used, so
+    another process can take over one of them; that shows up as a miss, never
+    as another text's vector.
+    """
+
+    def __init__(self, cache_dir: str, model_name: str, dim: int, max_entries: int = 100_000) -> None:
+        self.model_name = model_name
+        self.dim = dim
+        self.max_entries = max_entries
+        self.directory = os.path.join(cache_dir, _model_slug(model_name))
+        os.makedirs(self.directory, exist_ok=True)
+
+        meta = {"model_name": model_name, "dim": dim, "max_entries": max_entries}
+        meta_path = os.path.join(self.directory, "meta.json")
+        vectors_path = os.path.join(self.directory, "vectors.f32")
+        index_path = os.path.join(self.directory, "index.bin")
+
+        reuse = False
+        if os.path.exists(meta_path) and os.path.exists(vectors_path) and os.path.exists(index_path):
+            with open(meta_path, "r", encoding="utf-8") as f:
+                reuse = json.load(f) == meta
+            if not reuse:
+                logger.info(f"Embedding cache layout changed, resetting {self.directory}")
+
+        mode = "r+" if reuse else "w+"
+        self._vectors = np.memmap(vectors_path, dtype=np.float32, mode=mode, shape=(max_entries, dim))
+        self._index = np.memmap(index_path, dtype=INDEX_DTYPE, mode=mode, shape=(max_entries,))
+        if not reuse:
+            with open(meta_path, "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+
+        self._lock = threading.Lock()
+        self._lock_file = open(os.path.join(self.directory, "lock"), "a+b")
+        self._slots: "OrderedDict[bytes, int]" = OrderedDict()
+        self._free: List[int] = []
+        self._rebuild()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _rebuild(self) -> None:
+        used = self._index["digest"].any(axis=1)
+        used_slots = np.flatnonzero(used)
+        for slot in used_slots[np.argsort(self._index["tick"][used_slots], kind="stable")]:
+            self._slots[self._index["digest"][slot].tobytes()] = int(slot)
+        self._free = np.flatnonzero(~used)[::-1].tolist()
+        self._tick = int(self._index["tick"].max()) if len(self._slots) else 0
+
+    @contextmanager
+    def _locked(self):
+        """The thread lock plus, across processes, an exclusive flock on the directory."""
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    def _holds(self, slot: int, key: bytes) -> bool:
+        return self._index["digest"][slot].tobytes() == key
+
+    def _touch(self, key: bytes, slot: int) -> None:
+        self._tick += 1
+        self._index["tick"][slot] = self._tick
+        self._slots.move_to_end(key)
+
+    def get_many(self, keys: List[bytes]) -> List[Optional[np.ndarray]]:
+        results: List[Optional[np.ndarray]] = []
+        with self._locked():
+            for key in keys:
+                slot = self._slots.get(key)
+                if slot is not None and not self._holds(slot, key):
+                    # Another process reused the slot.
+                    del self._slots[key]
+                    slot = None
+                if slot is None:
+                    self.misses += 1
+                    results.append(None)
+                    continue
+                self.hits += 1
+                self._touch(key, slot)
+                results.append(np.array(self._vectors[slot]))
+        return results
+
+    def put_many(self, keys: List[bytes], vectors: np.ndarray) -> None:
+        with self._locked():
+            for key, vector in zip(keys, vectors):
+                slot = self._slots.get(key)
+                if slot is not None and not self._holds(slot, key):
+                    del self._slots[key]
+                    slot = None
+                if slot is None:
+                    if self._free:
+                        slot = self._free.pop()
+                    else:
+                        _, slot = self._slots.popitem(last=False)
+                        self.evictions += 1
+                    # Write the vector before the digest so a torn write never
+                    # exposes a digest pointing at a half-written vector.
+                    self._index["digest"][slot] = 0
+                    self._vectors[slot] = vector
+                    self._index["digest"][slot] = np.frombuffer(key, dtype=np.uint8)
+                    self._slots[key] = slot
+                self._touch(key, slot)
+
+    def flush(self) -> None:
+        with self._locked():
+            self._vectors.flush()
+            self._index.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._slots),
+                "max_entries": self.max_entries,
+            }
+
+
+_caches: Dict[str, EmbeddingCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(cache_dir: str, model_name: str, dim: int, max_entries: int = 100_000) -> EmbeddingCache:
+    """Return the process-wide cache for (cache_dir, model_name), opening it on first use."""
+    key = os.path.join(os.path.abspath(cache_dir), _model_slug(model_name))
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = EmbeddingCache(cache_dir, model_name, dim, max_entries)
+            _caches[key] = cache
+            atexit.register(cache.flush)
+        return cache
@@ -0,0 +1,136 @@
+import atexit
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+import numpy as np
+
+logger = logging.getLogger("LocalEmbeddingModel")
+
+HISTOGRAM_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+
+def _bucket(value: int) -> str:
+    for bound in HISTOGRAM_BUCKETS:
+        if value <= bound:
+            return f"<={bound}"
+    return f">{HISTOGRAM_BUCKETS[-1]}"
+
+
+class MicroBatcher:
+    """
+    Collects single-text encode requests from many threads (or event loops) and
+    runs them through one batched encode call.
+
+    A batch is dispatched as soon as `max_batch_size` requests are queued or
+    `max_wait_ms` has passed since the first request of the batch arrived.
+    Each caller gets a Future resolving to its own vector.
+    """
+
+    def __init__(
+        self,
+        encode_batch: Callable[[List[str]], np.ndarray],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 2.0,
+    ) -> None:
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._encode_batch = encode_batch
+        self._queue: "queue.Queue[Optional[Tuple[str, Future]]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._batches = 0
+        self._requests = 0
+        self._batch_sizes: Dict[str, int] = {}
+        self._queue_depths: Dict[str, int] = {}
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="embedding-micro-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, text: str) -> Future:
+        if self._closed:
+            raise RuntimeError("MicroBatcher is closed")
+        future: Future = Future()
+        self._queue.put((text, future))
+        return future
+
+    def _collect(self, first: Tuple[str, Future]) -> Tuple[List[Tuple[str, Future]], bool]:
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _record(self, batch_size: int, queue_depth: int) -> None:
+        with self._lock:
+            self._batches += 1
+            self._requests += batch_size
+            size_bucket = _bucket(batch_size)
+            depth_bucket = _bucket(queue_depth) if queue_depth else "0"
+            self._batch_sizes[size_bucket] = self._batch_sizes.get(size_bucket, 0) + 1
+            self._queue_depths[depth_bucket] = self._queue_depths.get(depth_bucket, 0) + 1
+
+    def _run(self) -> None:
+        stop = False
+        while not stop:
+            first = self._queue.get()
+            if first is None:
+                break
+            batch, stop = self._collect(first)
+            self._record(len(batch), self._queue.qsize())
+
+            try:
+                vectors = self._encode_batch([text for text, _ in batch])
+            except BaseException as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            for (_, future), vector in zip(batch, vectors):
+                future.set_result(vector)
+
+    def close(self) -> None:
+        if not self._closed:
+            self._closed = True
+            self._queue.put(None)
+            self._thread.join(timeout=5)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "batches": self._batches,
+                "requests": self._requests,
+                "mean_batch_size": round(self._requests / self._batches, 2) if self._batches else 0.0,
+                "queue_depth": self._queue.qsize(),
+                "batch_size_histogram": dict(self._batch_sizes),
+                "queue_depth_histogram": dict(self._queue_depths),
+            }
+
+
+_batchers: Dict[Hashable, MicroBatcher] = {}
+_batchers_lock = threading.Lock()
+
+
+def get_batcher(
+    key: Hashable,
+    encode_batch: Callable[[List[str]], np.ndarray],
+    max_batch_size: int = 32,
+    max_wait_ms: float = 2.0,
+) -> MicroBatcher:
+    """Return the process-wide batcher for `key`, so every wrapper of one model shares a queue."""
+    with _batchers_lock:
+        batcher = _batchers.get(key)
+        if batcher is None:
+            batcher = MicroBatcher(encode_batch, max_batch_size, max_wait_ms)
+            _batchers[key] = batcher
+            atexit.register(batcher.close)
+        return batcher
@@ -0,0 +1,106 @@
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger("LocalEmbeddingModel")
+
+ModelKey = Tuple[str, str, str]
+
+# torch: SentenceTransformer; onnx / onnx-int8: an offline-exported ONNX Runtime graph.
+BACKENDS = ("torch", "onnx", "onnx-int8")
+
+
+class ModelRegistry:
+    """
+    Process-wide registry of loaded SentenceTransformer models.
+    Each (model_name, device, backend) is loaded lazily on first request and
+    then shared by every LocalEmbeddingModel in the process.
+    """
+
+    def __init__(self) -> None:
+        self._models: Dict[ModelKey, Any] = {}
+        self._load_locks: Dict[ModelKey, threading.Lock] = {}
+        self._load_seconds: Dict[ModelKey, float] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    @staticmethod
+    def _key(model_name: str, device: Optional[str], backend: str) -> ModelKey:
+        return (model_name, device or "auto", backend)
+
+    @staticmethod
+    def _load(model_name: str, device: Optional[str], backend: str) -> Any:
+        # Imported here so importing the embeddings package doesn't pull in torch.
+        if backend == "torch":
+            from sentence_transformers import SentenceTransformer
+            return SentenceTransformer(model_name, device=device)
+        if backend in ("onnx", "onnx-int8"):
+            from embeddings.onnx_backend import OnnxEncoder
+            return OnnxEncoder.from_exported(model_name, quantized=backend == "onnx-int8")
+        raise ValueError(f"Unknown backend '{backend}', expected one of {BACKENDS}")
+
+    def get(self, model_name: str, device: Optional[str] = None, backend: str = "torch") -> Any:
+        key = self._key(model_name, device, backend)
+
+        model = self._models.get(key)
+        if model is not None:
+            with self._lock:
+                self._hits += 1
+            return model
+
+        with self._lock:
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        # Only one thread loads a given model; the others wait and then hit.
+        with load_lock:
+            model = self._models.get(key)
+            if model is not None:
+                with self._lock:
+                    self._hits += 1
+                return model
+
+            logger.info(f"Loading local model '{model_name}' (device={key[1]}, backend={backend})...")
+            start = time.perf_counter()
+            model = self._load(model_name, device, backend)
+            elapsed = time.perf_counter() - start
+
+            with self._lock:
+                self._models[key] = model
+                self._load_seconds[key] = elapsed
+                self._misses += 1
+            logger.info(f"Model '{model_name}' loaded successfully in {elapsed:.2f}s.")
+            return model
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "loaded_models": len(self._models),
+                "load_seconds_total": round(sum(self._load_seconds.values()), 4),
+                "load_seconds": {
+                    f"{name}@{device}/{backend}": round(seconds, 4)
+                    for (name, device, backend), seconds in self._load_seconds.items()
+                },
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._models.clear()
+            self._load_locks.clear()
+            self._load_seconds.clear()
+            self._hits = 0
+            self._misses = 0
+
+
+_registry = ModelRegistry()
+
+
+def get_model(model_name: str, device: Optional[str] = None, backend: str = "torch") -> Any:
+    return _registry.get(model_name, device, backend)
+
+
+def registry_stats() -> Dict[str, Any]:
+    return _registry.stats()
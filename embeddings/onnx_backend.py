@@ -0,0 +1,175 @@
+"""
+ONNX Runtime backend for LocalEmbeddingModel.
+
+The transformer of a sentence-transformers model is exported once, offline,
+to a local directory (optionally with an int8 dynamically quantized copy):
+
+    python -m embeddings.onnx_backend --model sentence-transformers/all-MiniLM-L6-v2 --quantize
+
+At runtime OnnxEncoder only needs onnxruntime and the saved tokenizer; pooling
+and normalization are replayed in NumPy.
+"""
+import argparse
+import inspect
+import json
+import logging
+import os
+import re
+from typing import Any, List, Optional, Union
+import numpy as np
+
+logger = logging.getLogger("LocalEmbeddingModel")
+
+ONNX_DIR_ENV = "LOCAL_EMBEDDING_ONNX_DIR"
+DEFAULT_ONNX_DIR = os.path.join(os.path.expanduser("~"), ".cache", "local_embeddings", "onnx")
+MODEL_FILE = "model.onnx"
+QUANTIZED_MODEL_FILE = "model.int8.onnx"
+
+
+def export_dir(model_name: str, onnx_dir: Optional[str] = None) -> str:
+    root = onnx_dir or os.environ.get(ONNX_DIR_ENV) or DEFAULT_ONNX_DIR
+    return os.path.join(root, re.sub(r"[^A-Za-z0-9_.-]+", "__", model_name))
+
+
+def export_onnx(model_name: str, onnx_dir: Optional[str] = None, quantize: bool = False, opset: int = 17) -> str:
+    """Export `model_name` to ONNX (and int8 if `quantize`); returns the export directory."""
+    import torch
+    from sentence_transformers import SentenceTransformer
+    from sentence_transformers.models import Normalize, Pooling
+
+    st_model = SentenceTransformer(model_name, device="cpu")
+    transformer = st_model[0].auto_model.eval()
+    tokenizer = st_model.tokenizer
+    out_dir = export_dir(model_name, onnx_dir)
+    os.makedirs(out_dir, exist_ok=True)
+
+    sample = tokenizer(["export sample"], return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+
+    class TokenEmbeddings(torch.nn.Module):
+        def __init__(self, model):
+            super().__init__()
+            self.model = model
+
+        def forward(self, *inputs):
+            return self.model(**dict(zip(input_names, inputs)))[0]
+
+    kwargs = {"dynamo": False} if "dynamo" in inspect.signature(torch.onnx.export).parameters else {}
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["token_embeddings"] = {0: "batch", 1: "sequence"}
+    model_path = os.path.join(out_dir, MODEL_FILE)
+    logger.info(f"Exporting '{model_name}' to {model_path}...")
+    torch.onnx.export(
+        TokenEmbeddings(transformer),
+        tuple(sample[name] for name in input_names),
+        model_path,
+        input_names=input_names,
+        output_names=["token_embeddings"],
+        dynamic_axes=dynamic_axes,
+        opset_version=opset,
+        **kwargs,
+    )
+
+    pooling = next((m for m in st_model if isinstance(m, Pooling)), None)
+    pooling_config = pooling.get_config_dict() if pooling is not None else {}
+    # Newer sentence-transformers store a single "pooling_mode", older ones one flag per mode.
+    pooling_mode = pooling_config.get("pooling_mode") or ("cls" if pooling_config.get("pooling_mode_cls_token") else "mean")
+    if pooling_mode not in ("cls", "mean"):
+        raise ValueError(f"Pooling mode '{pooling_mode}' is not supported by the ONNX backend")
+    config = {
+        "model_name": model_name,
+        "input_names": input_names,
+        "max_seq_length": st_model.max_seq_length,
+        "dim": st_model.get_sentence_embedding_dimension(),
+        "pooling": pooling_mode,
+        "normalize": any(isinstance(m, Normalize) for m in st_model),
+    }
+    tokenizer.save_pretrained(out_dir)
+    with open(os.path.join(out_dir, "onnx_config.json"), "w", encoding="utf-8") as f:
+        json.dump(config, f, indent=2)
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        quantize_dynamic(model_path, os.path.join(out_dir, QUANTIZED_MODEL_FILE), weight_type=QuantType.QInt8)
+    logger.info(f"Exported '{model_name}' to {out_dir}.")
+    return out_dir
+
+
+class OnnxEncoder:
+    """
+    Runs an exported model through ONNX Runtime on CPU. Exposes the subset of
+    the SentenceTransformer API that LocalEmbeddingModel relies on (encode,
+    tokenizer, max_seq_length, get_sentence_embedding_dimension).
+    """
+
+    def __init__(self, directory: str, quantized: bool = False, intra_op_threads: Optional[int] = None) -> None:
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        model_path = os.path.join(directory, QUANTIZED_MODEL_FILE if quantized else MODEL_FILE)
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(
+                f"No exported ONNX model at {model_path}. Export it offline first: "
+                f"python -m embeddings.onnx_backend --model <model_name>{' --quantize' if quantized else ''}"
+            )
+        with open(os.path.join(directory, "onnx_config.json"), "r", encoding="utf-8") as f:
+            self.config = json.load(f)
+
+        options = ort.SessionOptions()
+        if intra_op_threads:
+            options.intra_op_num_threads = intra_op_threads
+        self.session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self.tokenizer = AutoTokenizer.from_pretrained(directory)
+        self.max_seq_length = self.config["max_seq_length"]
+        self.input_names = self.config["input_names"]
+
+    @classmethod
+    def from_exported(cls, model_name: str, quantized: bool = False, onnx_dir: Optional[str] = None) -> "OnnxEncoder":
+        return cls(export_dir(model_name, onnx_dir), quantized=quantized)
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.config["dim"]
+
+    def _pool(self, token_embeddings: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+        if self.config["pooling"] == "cls":
+            pooled = token_embeddings[:, 0]
+        else:
+            mask = attention_mask[..., None].astype(np.float32)
+            pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        if self.config["normalize"]:
+            pooled = pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+        return pooled.astype(np.float32)
+
+    def encode(self, sentences: Union[str, List[str]], batch_size: int = 32, **kwargs: Any) -> np.ndarray:
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        result = np.empty((len(texts), self.get_sentence_embedding_dimension()), dtype=np.float32)
+
+        # Like SentenceTransformer.encode: sort by length so batches pad less.
+        order = np.argsort([-len(text) for text in texts], kind="stable")
+        for start in range(0, len(texts), batch_size):
+            batch = order[start:start + batch_size]
+            encoded = self.tokenizer(
+                [texts[i] for i in batch],
+                padding=True,
+                truncation=True,
+                max_length=self.max_seq_length,
+                return_tensors="np",
+            )
+            feeds = {name: encoded[name].astype(np.int64) for name in self.input_names}
+            token_embeddings = self.session.run(None, feeds)[0]
+            result[batch] = self._pool(token_embeddings, encoded["attention_mask"])
+        return result[0] if single else result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export a sentence-transformers model to ONNX")
+    parser.add_argument("--model", type=str, default="sentence-transformers/all-MiniLM-L6-v2")
+    parser.add_argument("--onnx-dir", type=str, default=None, help=f"Export root (default ${ONNX_DIR_ENV} or {DEFAULT_ONNX_DIR})")
+    parser.add_argument("--quantize", action="store_true", help="Also write an int8 dynamically quantized model")
+    args = parser.parse_args()
+    print(f"✅ Exported to {export_onnx(args.model, args.onnx_dir, args.quantize)}")
+
+
+if __name__ == "__main__":
+    main()